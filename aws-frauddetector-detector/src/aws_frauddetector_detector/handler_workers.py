@@ -1,4 +1,5 @@
 import logging
+import time
 from cloudformation_cli_python_lib import (
     OperationStatus,
     exceptions,
@@ -28,7 +29,13 @@ LOG.setLevel(logging.DEBUG)
 
 DRAFT_STATUS = "DRAFT"
 
+# Updates stop starting new steps after this many seconds and resume in a callback, as the handler times out at 180 s
+UPDATE_TIME_BUDGET_SECONDS = 120
+UPDATE_CALLBACK_DELAY_SECONDS = 1
 
+
+@api_helpers.request_scoped_consistency_waiter
+@api_helpers.request_scoped_api_call_cache
 def execute_create_detector_handler_work(session: SessionProxy, model: models.ResourceModel, progress: ProgressEvent):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -62,8 +69,10 @@ def execute_create_detector_handler_work(session: SessionProxy, model: models.Re
             status=model.DetectorVersionStatus,
         )
 
-    # after satisfying all contract tests and AFD requirements, get the resulting model
-    model = read_worker_helpers.validate_detector_exists_and_return_detector_resource_model(afd_client, model)
+    # after satisfying all contract tests and AFD requirements, build the resulting model from what was just written
+    model = model_helpers.get_model_for_written_detector(
+        afd_client, model, detector_version_response.get("detectorVersionId", "1"), rule_dicts
+    )
     progress.resourceModel = model
     progress.status = OperationStatus.SUCCESS
 
@@ -71,91 +80,26 @@ def execute_create_detector_handler_work(session: SessionProxy, model: models.Re
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
+@api_helpers.request_scoped_api_call_cache
 def execute_update_detector_handler_work(
-    session: SessionProxy, model: models.ResourceModel, progress: ProgressEvent, request
+    session: SessionProxy, model: models.ResourceModel, progress: ProgressEvent, request, callback_context=None
 ):
     afd_client = client_helpers.get_afd_client(session)
+    deadline = time.monotonic() + UPDATE_TIME_BUDGET_SECONDS
 
     previous_resource_state: models.ResourceModel = request.previousResourceState
 
-    # For contract_update_create_only_property, we need to fail if trying to set DetectorId to something different
-    if model.DetectorId != previous_resource_state.DetectorId:
-        raise exceptions.NotUpdatable(f"Error occurred: cannot update create-only property 'DetectorId'")
-
-    # For contract_update_non_existent_resource, we need to fail if the resource DNE
-    get_detectors_works, _ = validation_helpers.check_if_get_detectors_succeeds(afd_client, model.DetectorId)
-    if not get_detectors_works:
-        raise exceptions.NotFound("detector", model.DetectorId)
-
-    # Validate existence of dependencies for update (just eventtype for now)
-    LOG.debug(f"validating dependencies for update ...")
-    update_worker_helpers.validate_dependencies_for_detector_update(afd_client, model, previous_resource_state)
-
-    # Update inline event type and inline event type dependencies
-    if model.EventType.Inline:
-        LOG.info(f"Event type is inline, validating and updating inline event type.")
-        update_worker_helpers.validate_dependencies_for_inline_event_type_update(
-            afd_client=afd_client,
-            event_type_model=model.EventType,
-            previous_event_type_model=previous_resource_state.EventType,
-        )
-        update_worker_helpers.update_inline_event_type(
-            afd_client=afd_client,
-            event_type_model=model.EventType,
-            previous_event_type_model=previous_resource_state.EventType,
-        )
-
-    # Create/Update rules and inline outcomes
-    LOG.info(f"Creating / Updating rules and inline outcomes")
-    (
-        rule_versions_to_delete,
-        outcomes_to_delete,
-    ) = update_worker_helpers.update_rules_and_inline_outcomes_for_detector_update(
-        afd_client=afd_client, model=model, previous_model=previous_resource_state
-    )
-
-    # Create/Update DV, set active if desired status is active
-    LOG.info(f"Creating / Updating detector versions")
-    detector_versions_to_delete = update_worker_helpers.update_detector_version_for_detector_update(
-        afd_client=afd_client, model=model, previous_model=previous_resource_state
-    )
-
-    # Delete old DVs
-    LOG.info(f"Deleting old detector versions: {detector_versions_to_delete}")
-    update_worker_helpers.delete_unused_detector_versions_for_detector_update(
-        afd_client=afd_client, unused_detector_versions=detector_versions_to_delete
-    )
-
-    # Delete old rules that are no longer used
-    LOG.info(f"Deleting old rules: {rule_versions_to_delete}")
-    update_worker_helpers.delete_unused_rules_for_detector_update(
-        afd_client=afd_client,
-        detector_id=model.DetectorId,
-        unused_rule_versions=rule_versions_to_delete,
-    )
-
-    # Delete old inline outcomes that are no longer present in the rules
-    LOG.info(f"Deleting no-longer-used inline outcomes: {outcomes_to_delete}")
-    update_worker_helpers.delete_unused_inline_outcomes_for_detector_update(
-        afd_client=afd_client, unused_inline_outcome_names=outcomes_to_delete
-    )
-
-    # Put detector (for description update)
-    if model.EventType.Name:
-        event_type_name = model.EventType.Name
-    else:
-        event_type_name = util.extract_name_from_arn(model.EventType.Arn)
-    LOG.info(f"Calling put detector for description update")
-    api_helpers.call_put_detector(
-        frauddetector_client=afd_client,
-        detector_id=model.DetectorId,
-        detector_event_type_name=event_type_name,
-        detector_description=model.Description,
-    )
-
-    LOG.debug(f"updating tags for model ...")
-    # since put on update does not update tags, update tags separately
-    common_helpers.update_tags(afd_client, afd_resource_arn=model.Arn, new_tags=model.Tags)
+    # Validate, update rules, outcomes and detector versions, clean up, put detector and tags, as resumable steps
+    checkpoint = update_worker_helpers.DetectorUpdateCheckpoint(callback_context)
+    if not update_worker_helpers.run_detector_update_steps(
+        afd_client, model, previous_resource_state, checkpoint, deadline
+    ):
+        # out of time, continue from the checkpoint in the next invocation
+        progress.callbackContext = checkpoint.to_callback_context()
+        progress.callbackDelaySeconds = UPDATE_CALLBACK_DELAY_SECONDS
+        LOG.info(f"Returning Progress with status: {progress.status}")
+        return progress
 
     # after satisfying all contract tests and AFD requirements, get the resulting model
     LOG.info(f"Done updating, validating and generating result model")
@@ -167,6 +111,8 @@ def execute_update_detector_handler_work(
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
+@api_helpers.request_scoped_api_call_cache
 def execute_delete_detector_handler_work(session: SessionProxy, model: models.ResourceModel, progress: ProgressEvent):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -176,17 +122,8 @@ def execute_delete_detector_handler_work(session: SessionProxy, model: models.Re
         raise exceptions.NotFound("detector", model.DetectorId)
 
     try:
-        LOG.debug("deleting DVs")
-        delete_worker_helpers.deactivate_and_delete_detector_versions_for_detector_model(afd_client, model)
-
-        LOG.debug("deleting Rules (+ outcomes)")
-        delete_worker_helpers.delete_rules_and_inline_outcomes_for_detector_model(afd_client, model)
-
-        LOG.debug("deleting detector")
-        delete_worker_helpers.delete_detector_for_detector_model(afd_client, model)
-
-        LOG.debug("deleting inline dependencies (event type: entity types, labels, event variables)")
-        delete_worker_helpers.delete_inline_dependencies_for_detector_model(afd_client, model)
+        LOG.debug("deleting DVs, rules (+ outcomes), detector and inline dependencies (event type: ...)")
+        delete_worker_helpers.delete_detector_and_dependencies_for_detector_model(afd_client, model)
 
         progress.resourceModel = None
         progress.status = OperationStatus.SUCCESS
@@ -196,6 +133,8 @@ def execute_delete_detector_handler_work(session: SessionProxy, model: models.Re
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
+@api_helpers.request_scoped_api_call_cache
 def execute_read_detector_handler_work(session: SessionProxy, model: models.ResourceModel, progress: ProgressEvent):
     afd_client = client_helpers.get_afd_client(session)
     # read requests only include primary identifier (Arn). Extract DetectorId from Arn
@@ -210,13 +149,18 @@ def execute_read_detector_handler_work(session: SessionProxy, model: models.Reso
     return progress
 
 
-def execute_list_detector_handler_work(session: SessionProxy, model: models.ResourceModel, progress: ProgressEvent):
+@api_helpers.request_scoped_consistency_waiter
+@api_helpers.request_scoped_api_call_cache
+def execute_list_detector_handler_work(
+    session: SessionProxy, model: models.ResourceModel, progress: ProgressEvent, next_token: str = None
+):
     afd_client = client_helpers.get_afd_client(session)
     try:
-        detector_models = list_worker_helpers.list_detector_models(afd_client)
+        detector_models, next_token = list_worker_helpers.list_detector_models(afd_client, next_token)
     except RuntimeError as e:
         raise exceptions.InternalFailure(f"Error occurred: {e}")
     progress.resourceModels = detector_models
+    progress.nextToken = next_token
     progress.status = OperationStatus.SUCCESS
     LOG.info(f"Returning Progress with status: {progress.status}")
     return progress
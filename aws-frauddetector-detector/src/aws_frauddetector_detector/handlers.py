@@ -51,7 +51,7 @@ def update_handler(
         resourceModel=model,
     )
     LOG.info(f"calling update with the following request: {request}")
-    return handler_workers.execute_update_detector_handler_work(session, model, progress, request)
+    return handler_workers.execute_update_detector_handler_work(session, model, progress, request, callback_context)
 
 
 @resource.handler(Action.DELETE)
@@ -96,4 +96,4 @@ def list_handler(
         resourceModel=model,
     )
     LOG.info(f"calling list with the following request: {request}")
-    return handler_workers.execute_list_detector_handler_work(session, model, progress)
+    return handler_workers.execute_list_detector_handler_work(session, model, progress, request.nextToken)
@@ -1,20 +1,124 @@
 from typing import List
-from . import validation_helpers
+from . import validation_helpers, util
 
+import copy
+import contextlib
 import functools
+import inspect
 import logging
+import random
+import threading
 import time
 
 # Use this logger to forward log messages to CloudWatch Logs.
 LOG = logging.getLogger(__name__)
 LOG.setLevel(level=logging.INFO)
 
+# Page size for list handler pages of detectors, the maximum allowed by get_detectors
+DETECTORS_PAGE_SIZE = 10
+
 # Maximum number of pages to get for paginated calls
 # for page size of 100, 100 pages is 10,000 resources, which is twice the largest default service limit
 MAXIMUM_NUMBER_OF_PAGES = 100
 
-# Number of seconds to wait for eventually consistency for `retry_not_found_exceptions` decorator
-CONSISTENCY_SLEEP_TIME = 1.0
+# Maximum number of request items per call for batch APIs, e.g. batch_get_variable
+BATCH_CALL_LIMIT = 100
+
+# Waits for eventual consistency in `retry_not_found_exceptions` back off exponentially (with jitter),
+# from CONSISTENCY_BASE_DELAY seconds up to CONSISTENCY_MAX_DELAY seconds
+CONSISTENCY_BASE_DELAY = 0.25
+CONSISTENCY_MAX_DELAY = 3.0
+
+# Maximum number of attempts of a single api call that keeps raising a resource not found exception
+CONSISTENCY_MAX_ATTEMPTS = 4
+
+# Maximum number of attempts of an existence check, which expects a resource not found exception, see `existence_check`
+EXISTENCE_CHECK_MAX_ATTEMPTS = 2
+
+# Maximum number of seconds a handler invocation spends sleeping for consistency, across all of its api calls.
+# Only the sleeps count against it, and the first retry of an api call is always allowed.
+CONSISTENCY_WAIT_BUDGET = 20.0
+
+# Consistency waiter shared by the api calls of a handler, only set while a `request_scoped_consistency_waiter`
+# function runs
+_consistency_waiter = None
+_consistency_waiter_lock = threading.Lock()
+
+# Set in the threads that are within an `existence_check` context
+_existence_check_state = threading.local()
+
+# Resource types used to scope cached reads and write invalidation, see `cached_api_call`
+DETECTORS = "detectors"
+DETECTOR_VERSIONS = "detector_versions"
+RULES = "rules"
+OUTCOMES = "outcomes"
+VARIABLES = "variables"
+LABELS = "labels"
+ENTITY_TYPES = "entity_types"
+EVENT_TYPES = "event_types"
+EXTERNAL_MODELS = "external_models"
+MODEL_VERSIONS = "model_versions"
+TAGS = "tags"
+
+# Request-scoped cache for get/list api calls, only set while a `request_scoped_api_call_cache` function runs
+_api_call_cache = None
+_api_call_cache_lock = threading.Lock()
+
+
+class ApiCallCache:
+    """
+    Read-through cache for the responses of get/list api calls made during a single handler invocation.
+    Entries are keyed on the api call and its arguments, and are tagged with a resource type and identifier
+    (e.g. outcomes, outcome name) so that writes can invalidate every cached read they might have changed.
+    Every invalidation also bumps a generation counter of the resource type. Reads take the generation before calling
+    the api, and their response is not stored if the generation moved meanwhile: a concurrent write may have made it
+    stale after the invalidation already ran.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            _, _, value = self._entries[key]
+        # hand out copies, so callers can never modify a cached response
+        return True, copy.deepcopy(value)
+
+    def get_generation(self, resource_type: str) -> int:
+        with self._lock:
+            return self._generations.get(resource_type, 0)
+
+    def put(self, key, resource_type: str, identifier, value, generation: int):
+        value = copy.deepcopy(value)
+        with self._lock:
+            if self._generations.get(resource_type, 0) != generation:
+                LOG.debug(f"not caching a {resource_type} read that started before a write of {resource_type}")
+                return
+            self._entries[key] = (resource_type, identifier, value)
+
+    def invalidate(self, resource_type: str, identifier=None):
+        """
+        Drop cached reads for the given resource type. If an identifier is given, only reads of that identifier and
+        reads of all resources of that type (identifier None, e.g. get_outcomes without a name) are dropped.
+        """
+        with self._lock:
+            self._generations[resource_type] = self._generations.get(resource_type, 0) + 1
+            keys_to_remove = [
+                key
+                for key, (entry_resource_type, entry_identifier, _) in self._entries.items()
+                if entry_resource_type == resource_type
+                and (identifier is None or entry_identifier is None or entry_identifier == identifier)
+            ]
+            for key in keys_to_remove:
+                del self._entries[key]
 
 
 # Wrapper/decorator
@@ -35,9 +139,86 @@ def api_call_with_debug_logs(func):
     return log_wrapper
 
 
+class ConsistencyWaiter:
+    """
+    Retries api calls that raise a resource not found exception, to wait for eventually consistent reads.
+    Waits back off exponentially with full jitter, each api call gets at most `max_attempts` attempts,
+    and all sleeps share a total budget of `wait_budget` seconds. The first retry of an api call does not need any
+    budget left. Counts and durations of the waits are kept for logging.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = CONSISTENCY_BASE_DELAY,
+        max_delay: float = CONSISTENCY_MAX_DELAY,
+        max_attempts: int = CONSISTENCY_MAX_ATTEMPTS,
+        wait_budget: float = CONSISTENCY_WAIT_BUDGET,
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.remaining_wait_budget = wait_budget
+        self._lock = threading.Lock()
+        self.wait_count = 0
+        self.give_up_count = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def get_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, not_found_exception, func, *args, **kwargs):
+        return self.call_with_max_attempts(self.max_attempts, not_found_exception, func, *args, **kwargs)
+
+    def call_with_max_attempts(self, max_attempts: int, not_found_exception, func, *args, **kwargs):
+        first_not_found_at = None
+        for attempt in range(1, max_attempts + 1):
+            try:
+                response = func(*args, **kwargs)
+            except not_found_exception:
+                if first_not_found_at is None:
+                    first_not_found_at = time.monotonic()
+                delay = self.get_delay(attempt)
+                if attempt == max_attempts or not self._take_from_wait_budget(delay, is_first_retry=attempt == 1):
+                    LOG.warning(f"giving up waiting for consistency after {attempt} attempts")
+                    self._record_wait(time.monotonic() - first_not_found_at, gave_up=True)
+                    raise
+                LOG.warning(
+                    f"caught a resource not found exception."
+                    f" sleeping {delay:.2f} seconds and retrying api call for consistency..."
+                )
+                time.sleep(delay)
+            else:
+                if first_not_found_at is not None:
+                    self._record_wait(time.monotonic() - first_not_found_at, gave_up=False)
+                return response
+
+    def _take_from_wait_budget(self, delay: float, is_first_retry: bool) -> bool:
+        with self._lock:
+            if delay > self.remaining_wait_budget and not is_first_retry:
+                return False
+            self.remaining_wait_budget -= delay
+            return True
+
+    def _record_wait(self, wait_time: float, gave_up: bool):
+        with self._lock:
+            self.wait_count += 1
+            if gave_up:
+                self.give_up_count += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def __str__(self):
+        return (
+            f"{self.wait_count} waits took {self.total_wait_time:.2f} seconds"
+            f" (longest {self.max_wait_time:.2f} seconds), {self.give_up_count} gave up"
+        )
+
+
 def retry_not_found_exceptions(func):
     """
-    Retries boto3 not found exception for the decorated function.
+    Retries boto3 not found exception for the decorated function, with the consistency waiter of the
+    current `request_scoped_consistency_waiter` function (or a new one outside of it).
     """
 
     @functools.wraps(func)
@@ -54,65 +235,353 @@ def retry_not_found_exceptions(func):
                     "Perhaps the decorator was added to a method that is not supported?"
                 )
                 return func(*args, **kwargs)
+        consistency_waiter = _consistency_waiter or ConsistencyWaiter()
+        if getattr(_existence_check_state, "is_active", False):
+            max_attempts = min(consistency_waiter.max_attempts, EXISTENCE_CHECK_MAX_ATTEMPTS)
+        else:
+            max_attempts = consistency_waiter.max_attempts
+        return consistency_waiter.call_with_max_attempts(
+            max_attempts, afd_client.exceptions.ResourceNotFoundException, func, *args, **kwargs
+        )
+
+    return retry_not_found_exceptions_wrapper
+
+
+@contextlib.contextmanager
+def existence_check():
+    """
+    Limits the `retry_not_found_exceptions` api calls made in the current thread within this context to
+    EXISTENCE_CHECK_MAX_ATTEMPTS attempts each. Meant for checks where a resource not found exception is an expected
+    result, rather than a read after a write that needs waiting for.
+    """
+    was_active = getattr(_existence_check_state, "is_active", False)
+    _existence_check_state.is_active = True
+    try:
+        yield
+    finally:
+        _existence_check_state.is_active = was_active
+
+
+def request_scoped_consistency_waiter(func):
+    """
+    Share one consistency waiter (and its wait budget) between all `retry_not_found_exceptions` api calls made
+    during the decorated function (e.g. a handler), and log its wait metrics when it finishes.
+    Nested uses reuse the waiter of the outermost function.
+    """
+
+    @functools.wraps(func)
+    def request_scoped_consistency_waiter_wrapper(*args, **kwargs):
+        global _consistency_waiter
+        with _consistency_waiter_lock:
+            if _consistency_waiter is not None:
+                is_outermost_scope = False
+            else:
+                is_outermost_scope = True
+                _consistency_waiter = ConsistencyWaiter()
+            consistency_waiter = _consistency_waiter
         try:
             return func(*args, **kwargs)
-        except afd_client.exceptions.ResourceNotFoundException:
-            LOG.warning(
-                f"caught a resource not found exception."
-                f" sleeping {CONSISTENCY_SLEEP_TIME} seconds and retrying api call for consistency..."
-            )
-            time.sleep(CONSISTENCY_SLEEP_TIME)
+        finally:
+            if is_outermost_scope:
+                with _consistency_waiter_lock:
+                    _consistency_waiter = None
+                LOG.info(f"consistency waits for {func.__name__!r}: {consistency_waiter}")
+
+    return request_scoped_consistency_waiter_wrapper
+
+
+def request_scoped_api_call_cache(func):
+    """
+    Enable the api call cache for the duration of the decorated function (e.g. a handler), and log the cache
+    hit and miss counters when it finishes. Nested uses reuse the cache of the outermost function.
+    """
+
+    @functools.wraps(func)
+    def request_scoped_api_call_cache_wrapper(*args, **kwargs):
+        global _api_call_cache
+        with _api_call_cache_lock:
+            if _api_call_cache is not None:
+                is_outermost_scope = False
+            else:
+                is_outermost_scope = True
+                _api_call_cache = ApiCallCache()
+            cache = _api_call_cache
+        try:
             return func(*args, **kwargs)
+        finally:
+            if is_outermost_scope:
+                with _api_call_cache_lock:
+                    _api_call_cache = None
+                LOG.info(f"api call cache for {func.__name__!r}: {cache.hits} hits, {cache.misses} misses")
 
-    return retry_not_found_exceptions_wrapper
+    return request_scoped_api_call_cache_wrapper
+
+
+def cached_api_call(resource_type: str, identifier_arg: str = None):
+    """
+    Serve repeated calls of the decorated get/list api call from the request-scoped api call cache.
+    Outside of a `request_scoped_api_call_cache` function, the api is always called.
+    Exceptions (e.g. ResourceNotFoundException) are never cached.
+    :param resource_type: the type of resource the api call reads, used for invalidation
+    :param identifier_arg: name of the argument that identifies the resource read, used for invalidation
+    :return: the cached or newly fetched api response
+    """
+
+    def cached_api_call_decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def cached_api_call_wrapper(*args, **kwargs):
+            cache = _api_call_cache
+            if cache is None:
+                return func(*args, **kwargs)
+            bound_arguments = signature.bind(*args, **kwargs)
+            bound_arguments.apply_defaults()
+            call_arguments = tuple(
+                (name, value) for name, value in bound_arguments.arguments.items() if name != "frauddetector_client"
+            )
+            key = (func.__name__, call_arguments)
+            found, value = cache.get(key)
+            if found:
+                LOG.debug(f"api call cache hit for {func.__name__!r} with arguments {call_arguments}")
+                return value
+            generation = cache.get_generation(resource_type)
+            value = func(*args, **kwargs)
+            cache.put(key, resource_type, bound_arguments.arguments.get(identifier_arg), value, generation)
+            return value
+
+        return cached_api_call_wrapper
+
+    return cached_api_call_decorator
+
+
+def invalidates_cached_api_calls(resource_type: str, identifier_arg: str = None, invalidates_tags: bool = False):
+    """
+    Invalidate cached reads that the decorated write api call might have changed, once the call finishes.
+    :param resource_type: the type of resource the api call writes
+    :param identifier_arg: name of the argument that identifies the written resource (default is all resources)
+    :param invalidates_tags: whether the write can change tags, e.g. put with tags or delete
+    :return: API response of the decorated function
+    """
+
+    def invalidates_cached_api_calls_decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def invalidates_cached_api_calls_wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cache = _api_call_cache
+                if cache is not None:
+                    identifier = None
+                    if identifier_arg:
+                        identifier = signature.bind(*args, **kwargs).arguments.get(identifier_arg)
+                    cache.invalidate(resource_type, identifier)
+                    if invalidates_tags:
+                        cache.invalidate(TAGS)
+
+        return invalidates_cached_api_calls_wrapper
+
+    return invalidates_cached_api_calls_decorator
+
+
+class PaginationBudgetExceeded(RuntimeError):
+    """
+    Raised when iterating a paginated API call runs out of pages before the API runs out of items.
+    `next_token` can be passed back to the paginated call (as `nextToken`) to continue where it stopped.
+    """
+
+    def __init__(self, item_to_collect: str, max_pages: int, next_token: str):
+        super().__init__(f"stopped collecting {item_to_collect} after {max_pages} pages, more pages remain")
+        self.item_to_collect = item_to_collect
+        self.max_pages = max_pages
+        self.next_token = next_token
 
 
 def paginated_api_call(
     item_to_collect,
-    criteria_to_keep=lambda x, y: True,
+    criteria_to_keep=None,
     max_pages=MAXIMUM_NUMBER_OF_PAGES,
+    max_results=None,
+    unique_key=None,
 ):
     """
     For a method that calls a paginated API (returns an object w/ 'nextToken' key),
     decorate with @paginated_api_call to get an exhaustive list returned,
-    stopping at the maximum number of pages
+    stopping at the maximum number of pages.
+    If pages remain when the maximum number of pages is reached, the returned response keeps its 'nextToken',
+    which can be passed back as `nextToken` to continue collecting items.
+    The decorated method also gets an `iterate` attribute, which yields items page by page so callers can stop early,
+    and raises PaginationBudgetExceeded instead of stopping silently when pages remain.
+    `iterate` calls the API directly, it is not affected by decorators applied on top of this one (caching, retries).
+    The decorated method also gets a `max_results` attribute, holding the requested page size.
+    The decorated method must accept `nextToken` and `maxResults` keyword arguments.
     :param item_to_collect: string representing the key of the object that should be accumulated
-    :param criteria_to_keep: function to determine if items should be kept - item_list, item -> bool
+    :param criteria_to_keep: function to determine if items should be kept - item_list, item -> bool (default keeps all)
     :param max_pages: maximum number of pages allowed
+    :param max_results: page size to request from the API, usually the largest one it allows (default is service's)
+    :param unique_key: function to get a hashable key of an item - items with a key already seen are dropped
     :return: an exhaustive list, containing the accumulated items from all pages from the API call
     """
 
     def paginated_api_call_decorator(func):
+        def get_pages(*args, **kwargs):
+            next_token = kwargs.pop("nextToken", None)
+            if max_results is not None:
+                kwargs["maxResults"] = max_results
+            response = func(*args, nextToken=next_token, **kwargs)
+            yield response
+            count = 1
+            while "nextToken" in response and count < max_pages:
+                response = func(*args, nextToken=response["nextToken"], **kwargs)
+                yield response
+                count += 1
+
+        def get_items_of_interest(response, collected_items, seen_keys):
+            for item_of_interest in response.get(item_to_collect, []):
+                if unique_key is not None:
+                    key = unique_key(item_of_interest)
+                    if key in seen_keys:
+                        continue
+                    seen_keys.add(key)
+                if criteria_to_keep is None or criteria_to_keep(collected_items, item_of_interest):
+                    yield item_of_interest
+
         @functools.wraps(func)
         def api_call_wrapper(*args, **kwargs):
             collected_items = []
-            response = func(*args, **kwargs)
+            seen_keys = set()
+            response = {}
+            for response in get_pages(*args, **kwargs):
+                for item_of_interest in get_items_of_interest(response, collected_items, seen_keys):
+                    collected_items.append(item_of_interest)
+
+            if "nextToken" in response:
+                LOG.warning(f"stopped collecting {item_to_collect} after {max_pages} pages, more pages remain")
+            response[item_to_collect] = collected_items
+            return response
 
-            def collect_items_of_interest_from_current_response():
-                for item_of_interest in response.get(item_to_collect, []):
-                    if criteria_to_keep(collected_items, item_of_interest):
+        def iterate(*args, **kwargs):
+            # only hold on to the yielded items if criteria_to_keep needs to look at them
+            collected_items = []
+            seen_keys = set()
+            response = {}
+            for response in get_pages(*args, **kwargs):
+                for item_of_interest in get_items_of_interest(response, collected_items, seen_keys):
+                    if criteria_to_keep is not None:
                         collected_items.append(item_of_interest)
+                    yield item_of_interest
 
-            collect_items_of_interest_from_current_response()
-            count = 1
+            if "nextToken" in response:
+                raise PaginationBudgetExceeded(item_to_collect, max_pages, response["nextToken"])
 
-            while "nextToken" in response and count < max_pages:
-                next_token = response["nextToken"]
-                response = func(*args, nextToken=next_token, **kwargs)
-                collect_items_of_interest_from_current_response()
-                count += 1
+        api_call_wrapper.iterate = iterate
+        # exposed so the page size can be checked against the limits of the API
+        api_call_wrapper.max_results = max_results
+        return api_call_wrapper
 
-            response[item_to_collect] = collected_items
-            return response
+    return paginated_api_call_decorator
+
+
+def batch_call_limit(
+    request_attribute_to_split: str, response_items_to_collect: List[str], limit: int = BATCH_CALL_LIMIT
+):
+    """
+    For a method that calls a batch API with a request limit of 100,
+    decorate with @batch_call_limit to get an exhaustive list returned,
+    automatically separating the request into chunks of 100 that are sent concurrently.
+    :param request_attribute_to_split: string representing the key of the request attribute that needs to be
+            limited to the specified limit.
+    :param response_items_to_collect: strings representing the keys of the response that should be accumulated.
+            The response attributes for these keys should be arrays.
+    :param limit: the maximum number of request attributes per request. Default is 100.
+    :return: an exhaustive list, containing the accumulated items from all of the batch API calls, in chunk order
+    """
+
+    def batch_call_limit_decorator(func):
+        @functools.wraps(func)
+        def api_call_wrapper(*args, **kwargs):
+            if request_attribute_to_split not in kwargs:
+                LOG.warning(
+                    f"request item {request_attribute_to_split} was not found in kwargs: {kwargs}. "
+                    "This might be a bug!"
+                )
+            all_request_keys = list(kwargs.get(request_attribute_to_split, []))
+            request_chunks = list(util.split_array_into_chunks(all_request_keys, limit))
+
+            def call_for_request_chunk(request_chunk):
+                chunk_kwargs = dict(kwargs, **{request_attribute_to_split: request_chunk})
+                LOG.debug(f"batch call chunk kwargs: {chunk_kwargs}")
+                return func(*args, **chunk_kwargs)
+
+            full_response = {key: [] for key in response_items_to_collect}
+            for response in util.map_concurrently(call_for_request_chunk, request_chunks):
+                for item_key in response_items_to_collect:
+                    full_response[item_key].extend(response.get(item_key, []))
+            LOG.debug(f"full batch call response: {full_response}")
+            return full_response
 
         return api_call_wrapper
 
-    return paginated_api_call_decorator
+    return batch_call_limit_decorator
+
+
+class BatchItemsNotFound(Exception):
+    """
+    Raised (and caught) by `retry_batch_errors_as_not_found` while a batch get call still reports items in its
+    'errors', so the consistency waiter retries them like a resource not found exception.
+    """
+
+    def __init__(self, errors: List[dict]):
+        super().__init__(f"{len(errors)} items of the batch call were not found")
+        self.errors = errors
+
+
+def retry_batch_errors_as_not_found(request_attribute_to_retry: str, response_items_to_collect: List[str]):
+    """
+    For a method that calls a batch get API, which reports missing items in the 'errors' of its response instead of
+    raising a resource not found exception, decorate with @retry_batch_errors_as_not_found to retry the names in
+    'errors' with the consistency waiter of the current `request_scoped_consistency_waiter` function (or a new one
+    outside of it).
+    :param request_attribute_to_retry: string representing the key of the request attribute holding the names to get
+    :param response_items_to_collect: strings representing the keys of the response that should be accumulated
+            across attempts. The response attributes for these keys should be arrays.
+    :return: the accumulated items of all attempts, and the 'errors' of the last attempt
+    """
+
+    def retry_batch_errors_as_not_found_decorator(func):
+        @functools.wraps(func)
+        def retry_batch_errors_wrapper(*args, **kwargs):
+            full_response = {key: [] for key in response_items_to_collect}
+            attempt_kwargs = dict(kwargs)
+
+            def call_for_remaining_names():
+                response = func(*args, **attempt_kwargs)
+                for item_key in response_items_to_collect:
+                    full_response[item_key].extend(response.get(item_key, []))
+                errors = response.get("errors", [])
+                if errors:
+                    attempt_kwargs[request_attribute_to_retry] = [error.get("name") for error in errors]
+                    raise BatchItemsNotFound(errors)
+                return errors
+
+            consistency_waiter = _consistency_waiter or ConsistencyWaiter()
+            try:
+                full_response["errors"] = consistency_waiter.call(BatchItemsNotFound, call_for_remaining_names)
+            except BatchItemsNotFound as e:
+                full_response["errors"] = e.errors
+            return full_response
+
+        return retry_batch_errors_wrapper
+
+    return retry_batch_errors_as_not_found_decorator
 
 
 # Put APIs
 
 
+@invalidates_cached_api_calls(DETECTORS, "detector_id", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_put_detector(
     frauddetector_client,
@@ -140,6 +609,7 @@ def call_put_detector(
     return frauddetector_client.put_detector(**args)
 
 
+@invalidates_cached_api_calls(OUTCOMES, "outcome_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_put_outcome(
     frauddetector_client,
@@ -164,6 +634,7 @@ def call_put_outcome(
     return frauddetector_client.put_outcome(**args)
 
 
+@invalidates_cached_api_calls(LABELS, "label_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_put_label(
     frauddetector_client,
@@ -184,6 +655,7 @@ def call_put_label(
     return frauddetector_client.put_label(**args)
 
 
+@invalidates_cached_api_calls(ENTITY_TYPES, "entity_type_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_put_entity_type(
     frauddetector_client,
@@ -208,6 +680,7 @@ def call_put_entity_type(
     return frauddetector_client.put_entity_type(**args)
 
 
+@invalidates_cached_api_calls(EVENT_TYPES, "event_type_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_put_event_type(
     frauddetector_client,
@@ -244,6 +717,7 @@ def call_put_event_type(
 # Create APIs
 
 
+@invalidates_cached_api_calls(VARIABLES, "variable_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_create_variable(
     frauddetector_client,
@@ -268,6 +742,7 @@ def call_create_variable(
     return frauddetector_client.create_variable(**args)
 
 
+@invalidates_cached_api_calls(RULES, "detector_id", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_create_rule(
     frauddetector_client,
@@ -292,6 +767,7 @@ def call_create_rule(
     return frauddetector_client.create_rule(**args)
 
 
+@invalidates_cached_api_calls(DETECTOR_VERSIONS, "detector_id", invalidates_tags=True)
 @retry_not_found_exceptions
 @api_call_with_debug_logs
 def call_create_detector_version(
@@ -320,6 +796,7 @@ def call_create_detector_version(
 # Update APIs
 
 
+@invalidates_cached_api_calls(VARIABLES, "variable_name")
 @retry_not_found_exceptions
 @api_call_with_debug_logs
 def call_update_variable(
@@ -349,6 +826,7 @@ def call_update_variable(
     return frauddetector_client.update_variable(**args)
 
 
+@invalidates_cached_api_calls(RULES, "detector_id", invalidates_tags=True)
 @retry_not_found_exceptions
 @api_call_with_debug_logs
 def call_update_rule_version(
@@ -383,6 +861,7 @@ def call_update_rule_version(
     return frauddetector_client.update_rule_version(**args)
 
 
+@invalidates_cached_api_calls(DETECTOR_VERSIONS, "detector_id")
 @retry_not_found_exceptions
 @api_call_with_debug_logs
 def call_update_detector_version(
@@ -408,6 +887,7 @@ def call_update_detector_version(
     return frauddetector_client.update_detector_version(**args)
 
 
+@invalidates_cached_api_calls(DETECTOR_VERSIONS, "detector_id")
 @retry_not_found_exceptions
 @api_call_with_debug_logs
 def call_update_detector_version_status(frauddetector_client, detector_id: str, detector_version_id: str, status: str):
@@ -431,23 +911,26 @@ def call_update_detector_version_status(frauddetector_client, detector_id: str,
 # Describe APIs
 
 
+@cached_api_call(DETECTOR_VERSIONS, "detector_id")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="detectorVersionSummaries")
+@paginated_api_call(item_to_collect="detectorVersionSummaries", max_results=2500)
 @api_call_with_debug_logs
-def call_describe_detector(frauddetector_client, detector_id):
+def call_describe_detector(frauddetector_client, detector_id, nextToken: str = None, maxResults: int = None):
     """
     Call describe_detector with the given frauddetector client and the given arguments.
     :param frauddetector_client: boto3 frauddetector client to use to make the call
     :param detector_id: id of the detector to describe
     :return: return detector version summaries for the given detector_id
     """
-    args = {"detectorId": detector_id}
+    args = {"detectorId": detector_id, "nextToken": nextToken, "maxResults": maxResults}
+    validation_helpers.remove_none_arguments(args)
     return frauddetector_client.describe_detector(**args)
 
 
 # Get APIs
 
 
+@cached_api_call(DETECTOR_VERSIONS, "detector_id")
 @retry_not_found_exceptions
 @api_call_with_debug_logs
 def call_get_detector_version(frauddetector_client, detector_id: str, detector_version_id: str):
@@ -462,109 +945,164 @@ def call_get_detector_version(frauddetector_client, detector_id: str, detector_v
     return frauddetector_client.get_detector_version(**args)
 
 
+@cached_api_call(DETECTORS, "detector_id")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="detectors")
+@paginated_api_call(item_to_collect="detectors", max_results=10)
 @api_call_with_debug_logs
-def call_get_detectors(frauddetector_client, detector_id: str = None):
+def call_get_detectors(frauddetector_client, detector_id: str = None, nextToken: str = None, maxResults: int = None):
     """
     Call get_detectors with the given frauddetector client and the given arguments.
     :param frauddetector_client: boto3 frauddetector client to use to make the call
     :param detector_id: id of the detector to get (default is None)
     :return: get a single detector if detector_id is specified, otherwise get all detectors
     """
-    args = {"detectorId": detector_id}
+    args = {"detectorId": detector_id, "nextToken": nextToken, "maxResults": maxResults}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_detectors(**args)
 
 
+@api_call_with_debug_logs
+def call_get_detectors_page(frauddetector_client, next_token: str = None, max_results: int = DETECTORS_PAGE_SIZE):
+    """
+    Call get_detectors for a single page of detectors with the given frauddetector client.
+    :param frauddetector_client: boto3 frauddetector client to use to make the call
+    :param next_token: token of the page to get, from a previous response (default is the first page)
+    :param max_results: maximum number of detectors to return in the page
+    :return: a single page of detectors, with a 'nextToken' if there are more pages
+    """
+    args = {"nextToken": next_token, "maxResults": max_results}
+    validation_helpers.remove_none_arguments(args)
+    return frauddetector_client.get_detectors(**args)
+
+
+@cached_api_call(RULES, "detector_id")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="ruleDetails")
+@paginated_api_call(item_to_collect="ruleDetails", max_results=100)
 @api_call_with_debug_logs
 def call_get_rules(
     frauddetector_client,
     detector_id: str,
     rule_id: str = None,
     rule_version: str = None,
+    nextToken: str = None,
+    maxResults: int = None,
 ):
     """
-    Call get_detectors with the given frauddetector client and the given arguments.
+    Call get_rules with the given frauddetector client and the given arguments.
     :param frauddetector_client: boto3 frauddetector client to use to make the call
     :param detector_id: id of the detector to get rules for
     :param rule_id: id of the specific rule to get (Default is none)
     :param rule_version: version of the specific rule to get (Default is none)
-
-    :return: get a single detector if detector_id is specified, otherwise get all detectors
+    :param nextToken: token of the page to get, passed by `paginated_api_call` (Default is none)
+    :param maxResults: size of the page to get, passed by `paginated_api_call` (Default is none)
+    :return: get a single rule version if rule_id and rule_version are specified, otherwise get all matching rules
     """
-    args = {"detectorId": detector_id, "ruleId": rule_id, "ruleVersion": rule_version}
+    args = {
+        "detectorId": detector_id,
+        "ruleId": rule_id,
+        "ruleVersion": rule_version,
+        "nextToken": nextToken,
+        "maxResults": maxResults,
+    }
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_rules(**args)
 
 
+@cached_api_call(OUTCOMES, "outcome_name")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="outcomes")
+@paginated_api_call(item_to_collect="outcomes", max_results=100)
 @api_call_with_debug_logs
-def call_get_outcomes(frauddetector_client, outcome_name: str = None):
+def call_get_outcomes(frauddetector_client, outcome_name: str = None, nextToken: str = None, maxResults: int = None):
     """
     Call get_outcomes with the given frauddetector client and the given arguments.
     :param frauddetector_client: boto3 frauddetector client to use to make the call
     :param outcome_name: name of the outcome to get (default is None)
     :return: get a single outcome if outcome_name is specified, otherwise get all outcomes
     """
-    args = {"name": outcome_name}
+    args = {"name": outcome_name, "nextToken": nextToken, "maxResults": maxResults}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_outcomes(**args)
 
 
+@cached_api_call(VARIABLES, "variable_name")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="variables")
+@paginated_api_call(item_to_collect="variables", max_results=100)
 @api_call_with_debug_logs
-def call_get_variables(frauddetector_client, variable_name: str = None):
+def call_get_variables(frauddetector_client, variable_name: str = None, nextToken: str = None, maxResults: int = None):
     """
     Call get_variables with the given frauddetector client and the given arguments.
     :param frauddetector_client: boto3 frauddetector client to use to make the call
     :param variable_name: name of the variable to get (default is None)
     :return: get a single variable if variable_name is specified, otherwise get all variables
     """
-    args = {"name": variable_name}
+    args = {"name": variable_name, "nextToken": nextToken, "maxResults": maxResults}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_variables(**args)
 
 
+@retry_batch_errors_as_not_found(request_attribute_to_retry="names", response_items_to_collect=["variables"])
+@batch_call_limit(request_attribute_to_split="names", response_items_to_collect=["errors", "variables"])
+@api_call_with_debug_logs
+def call_batch_get_variable(frauddetector_client, names: List[str]):
+    """
+    Call batch_get_variable with the given frauddetector client and the given variable names.
+    Any number of names can be given, requests are split into chunks of BATCH_CALL_LIMIT names.
+    Names reported in 'errors' are retried for consistency, e.g. for variables that were just created.
+    :param frauddetector_client: boto3 frauddetector client to use to make the call
+    :param names: names of the variables to get, must be passed as a keyword argument
+    :return: the variables of all batch_get_variable calls, not in request order, and the errors left after retries
+    """
+    args = {"names": names}
+    validation_helpers.remove_none_arguments(args)
+    return frauddetector_client.batch_get_variable(**args)
+
+
+@cached_api_call(LABELS, "label_name")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="labels")
+@paginated_api_call(item_to_collect="labels", max_results=50)
 @api_call_with_debug_logs
-def call_get_labels(frauddetector_client, label_name: str = None):
-    args = {"name": label_name}
+def call_get_labels(frauddetector_client, label_name: str = None, nextToken: str = None, maxResults: int = None):
+    args = {"name": label_name, "nextToken": nextToken, "maxResults": maxResults}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_labels(**args)
 
 
+@cached_api_call(ENTITY_TYPES, "entity_type_name")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="entityTypes")
+@paginated_api_call(item_to_collect="entityTypes", max_results=10)
 @api_call_with_debug_logs
-def call_get_entity_types(frauddetector_client, entity_type_name: str = None):
-    args = {"name": entity_type_name}
+def call_get_entity_types(
+    frauddetector_client, entity_type_name: str = None, nextToken: str = None, maxResults: int = None
+):
+    args = {"name": entity_type_name, "nextToken": nextToken, "maxResults": maxResults}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_entity_types(**args)
 
 
+@cached_api_call(EVENT_TYPES, "event_type_name")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="eventTypes")
+@paginated_api_call(item_to_collect="eventTypes", max_results=10)
 @api_call_with_debug_logs
-def call_get_event_types(frauddetector_client, event_type_name: str = None):
-    args = {"name": event_type_name}
+def call_get_event_types(
+    frauddetector_client, event_type_name: str = None, nextToken: str = None, maxResults: int = None
+):
+    args = {"name": event_type_name, "nextToken": nextToken, "maxResults": maxResults}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_event_types(**args)
 
 
-@paginated_api_call(item_to_collect="externalModels")
+@cached_api_call(EXTERNAL_MODELS, "model_endpoint")
+@paginated_api_call(item_to_collect="externalModels", max_results=10)
 @api_call_with_debug_logs
-def call_get_external_models(frauddetector_client, model_endpoint: str = None):
-    args = {"modelEndpoint": model_endpoint}
+def call_get_external_models(
+    frauddetector_client, model_endpoint: str = None, nextToken: str = None, maxResults: int = None
+):
+    args = {"modelEndpoint": model_endpoint, "nextToken": nextToken, "maxResults": maxResults}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_external_models(**args)
 
 
+@cached_api_call(MODEL_VERSIONS)
 @api_call_with_debug_logs
 def call_get_model_version(frauddetector_client, model_id: str, model_type: str, model_version_number: str):
     args = {"modelId": model_id, "modelType": model_type, "modelVersionNumber": model_version_number}
@@ -574,6 +1112,7 @@ def call_get_model_version(frauddetector_client, model_id: str, model_type: str,
 # Delete APIs
 
 
+@invalidates_cached_api_calls(OUTCOMES, "outcome_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_delete_outcome(frauddetector_client, outcome_name: str):
     """
@@ -585,36 +1124,43 @@ def call_delete_outcome(frauddetector_client, outcome_name: str):
     return frauddetector_client.delete_outcome(name=outcome_name)
 
 
+@invalidates_cached_api_calls(VARIABLES, "variable_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_delete_variable(frauddetector_client, variable_name: str):
     return frauddetector_client.delete_variable(name=variable_name)
 
 
+@invalidates_cached_api_calls(EVENT_TYPES, "event_type_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_delete_event_type(frauddetector_client, event_type_name: str):
     return frauddetector_client.delete_event_type(name=event_type_name)
 
 
+@invalidates_cached_api_calls(ENTITY_TYPES, "entity_type_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_delete_entity_type(frauddetector_client, entity_type_name: str):
     return frauddetector_client.delete_entity_type(name=entity_type_name)
 
 
+@invalidates_cached_api_calls(LABELS, "label_name", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_delete_label(frauddetector_client, label_name: str):
     return frauddetector_client.delete_label(name=label_name)
 
 
+@invalidates_cached_api_calls(DETECTORS, "detector_id", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_delete_detector(frauddetector_client, detector_id: str):
     return frauddetector_client.delete_detector(detectorId=detector_id)
 
 
+@invalidates_cached_api_calls(DETECTOR_VERSIONS, "detector_id", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_delete_detector_version(frauddetector_client, detector_id: str, detector_version_id: str):
     return frauddetector_client.delete_detector_version(detectorId=detector_id, detectorVersionId=detector_version_id)
 
 
+@invalidates_cached_api_calls(RULES, "detector_id", invalidates_tags=True)
 @api_call_with_debug_logs
 def call_delete_rule(frauddetector_client, detector_id: str, rule_id: str, rule_version: str):
     rule = {"detectorId": detector_id, "ruleId": rule_id, "ruleVersion": rule_version}
@@ -624,19 +1170,23 @@ def call_delete_rule(frauddetector_client, detector_id: str, rule_id: str, rule_
 # Tagging
 
 
+@cached_api_call(TAGS, "resource_arn")
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="tags")
+@paginated_api_call(item_to_collect="tags", max_results=50)
 @api_call_with_debug_logs
-def call_list_tags_for_resource(frauddetector_client, resource_arn: str):
+def call_list_tags_for_resource(frauddetector_client, resource_arn: str, nextToken: str = None, maxResults: int = None):
     """
     Call list_tags_for_resource for a given ARN with the given frauddetector client.
     :param frauddetector_client: boto3 frauddetector client to use to make the call
     :param resource_arn: ARN of the resource to get tags for
     :return: result has an exhaustive list of tags attached to the resource
     """
-    return frauddetector_client.list_tags_for_resource(resourceARN=resource_arn)
+    args = {"resourceARN": resource_arn, "nextToken": nextToken, "maxResults": maxResults}
+    validation_helpers.remove_none_arguments(args)
+    return frauddetector_client.list_tags_for_resource(**args)
 
 
+@invalidates_cached_api_calls(TAGS, "resource_arn")
 @retry_not_found_exceptions
 @api_call_with_debug_logs
 def call_tag_resource(frauddetector_client, resource_arn: str, tags: List[dict]):
@@ -650,6 +1200,7 @@ def call_tag_resource(frauddetector_client, resource_arn: str, tags: List[dict])
     return frauddetector_client.tag_resource(resourceARN=resource_arn, tags=tags)
 
 
+@invalidates_cached_api_calls(TAGS, "resource_arn")
 @retry_not_found_exceptions
 @api_call_with_debug_logs
 def call_untag_resource(frauddetector_client, resource_arn: str, tag_keys: List[str]):
@@ -1,17 +1,207 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
 from botocore.config import Config
 from cloudformation_cli_python_lib import (
     SessionProxy,
     exceptions,
 )
 
+from . import util
+
+LOG = logging.getLogger(__name__)
 
-BOTO3_CLIENT_CONFIG_WITH_STANDARD_RETRIES = Config(retries={"total_max_attempts": 3, "mode": "standard"})
+# Size of the HTTP connection pool of a client, large enough for the api calls a handler makes concurrently
+# (concurrent api calls nest one level, e.g. batch calls made within a concurrent read)
+MAX_POOL_CONNECTIONS = 2 * util.MAX_CONCURRENT_API_CALLS
+
+BOTO3_CLIENT_CONFIG_WITH_STANDARD_RETRIES = Config(
+    retries={"total_max_attempts": 3, "mode": "standard"},
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+)
+
+# Clients are cached per region and credentials, so warm invocations in the same container reuse the client
+# (and its warm connection pool). Credentials rotate, so only the most recently used clients are kept.
+MAX_CACHED_CLIENTS = 4
+
+_afd_clients = OrderedDict()
+_afd_clients_lock = threading.Lock()
 
 
 def get_afd_client(session):
     if isinstance(session, SessionProxy):
-        return session.client(
-            service_name="frauddetector",
-            config=BOTO3_CLIENT_CONFIG_WITH_STANDARD_RETRIES,
-        )
+        client_key = _get_client_key(session)
+        with _afd_clients_lock:
+            if client_key in _afd_clients:
+                _afd_clients.move_to_end(client_key)
+                return _afd_clients[client_key]
+            afd_client = session.client(
+                service_name="frauddetector",
+                config=BOTO3_CLIENT_CONFIG_WITH_STANDARD_RETRIES,
+            )
+            api_rate_limiter.register(afd_client)
+            _afd_clients[client_key] = afd_client
+            if len(_afd_clients) > MAX_CACHED_CLIENTS:
+                _afd_clients.popitem(last=False)
+            return afd_client
     raise exceptions.InternalFailure(f"Error: failed to get frauddetector client.")
+
+
+def _get_client_key(session: SessionProxy):
+    # the secret key and session token are only kept as a digest, so the cache does not hold them across invocations
+    credentials = session.session.get_credentials()
+    if credentials is None:
+        return session.session.region_name, None, None
+    frozen_credentials = credentials.get_frozen_credentials()
+    secret_digest = hashlib.sha256()
+    for secret in (frozen_credentials.secret_key, frozen_credentials.token):
+        secret_digest.update((secret or "").encode("utf-8"))
+        secret_digest.update(b"\0")
+    return session.session.region_name, frozen_credentials.access_key, secret_digest.hexdigest()
+
+
+# Client-side rate limits, in requests per second, of the frauddetector operations the handlers call.
+# These are kept at or below AFD's default per-API TPS quotas, other operations use DEFAULT_API_RATE_LIMIT.
+API_RATE_LIMITS = {
+    "BatchCreateVariable": 5,
+    "BatchGetVariable": 5,
+    "CreateDetectorVersion": 5,
+    "CreateList": 5,
+    "CreateRule": 5,
+    "CreateVariable": 5,
+    "DeleteDetector": 5,
+    "DeleteDetectorVersion": 5,
+    "DeleteEntityType": 5,
+    "DeleteEventType": 5,
+    "DeleteLabel": 5,
+    "DeleteList": 5,
+    "DeleteOutcome": 5,
+    "DeleteRule": 5,
+    "DeleteVariable": 5,
+    "DescribeDetector": 10,
+    "GetDetectorVersion": 10,
+    "GetDetectors": 10,
+    "GetEntityTypes": 10,
+    "GetEventTypes": 10,
+    "GetExternalModels": 10,
+    "GetLabels": 10,
+    "GetListElements": 10,
+    "GetListsMetadata": 10,
+    "GetModelVersion": 10,
+    "GetOutcomes": 10,
+    "GetRules": 10,
+    "GetVariables": 10,
+    "ListTagsForResource": 10,
+    "PutDetector": 5,
+    "PutEntityType": 5,
+    "PutEventType": 5,
+    "PutLabel": 5,
+    "PutOutcome": 5,
+    "TagResource": 5,
+    "UntagResource": 5,
+    "UpdateDetectorVersion": 5,
+    "UpdateDetectorVersionStatus": 5,
+    "UpdateList": 5,
+    "UpdateRuleVersion": 5,
+    "UpdateVariable": 5,
+}
+DEFAULT_API_RATE_LIMIT = 5
+
+# After a throttling response, the rate of the operation is multiplied by THROTTLED_RATE_FACTOR (down to
+# MINIMUM_API_RATE_LIMIT), and every successful response recovers RATE_RECOVERY_FRACTION of its rate limit
+THROTTLED_RATE_FACTOR = 0.5
+MINIMUM_API_RATE_LIMIT = 0.5
+RATE_RECOVERY_FRACTION = 0.1
+
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException", "Throttling"}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing `rate_limit` requests per second, with bursts of up to `rate_limit` requests.
+    The current rate drops after throttling responses and recovers towards `rate_limit` after successful ones.
+    """
+
+    def __init__(self, rate_limit: float):
+        self.rate_limit = rate_limit
+        self.rate = rate_limit
+        self.capacity = max(1.0, rate_limit)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take a token, sleeping until it is available.
+        :return: number of seconds slept
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            # a missing token is reserved right away, so concurrent callers queue up behind each other
+            self._tokens -= 1
+            wait_time = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    def on_throttled(self):
+        with self._lock:
+            self.rate = max(MINIMUM_API_RATE_LIMIT, self.rate * THROTTLED_RATE_FACTOR)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.rate_limit, self.rate + self.rate_limit * RATE_RECOVERY_FRACTION)
+
+
+class ApiRateLimiter:
+    """
+    Rate limits the requests of frauddetector clients with one token bucket per operation, see API_RATE_LIMITS.
+    Hooks into the client's events, so every attempt (including botocore retries) of every api call takes a token.
+    """
+
+    def __init__(self, rate_limits: dict = None, default_rate_limit: float = DEFAULT_API_RATE_LIMIT):
+        self.rate_limits = API_RATE_LIMITS if rate_limits is None else rate_limits
+        self.default_rate_limit = default_rate_limit
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, operation_name: str) -> TokenBucket:
+        with self._lock:
+            if operation_name not in self._buckets:
+                rate_limit = self.rate_limits.get(operation_name, self.default_rate_limit)
+                self._buckets[operation_name] = TokenBucket(rate_limit)
+            return self._buckets[operation_name]
+
+    def register(self, afd_client):
+        afd_client.meta.events.register("before-sign.frauddetector", self._before_sign)
+        afd_client.meta.events.register("needs-retry.frauddetector", self._on_response)
+
+    def _before_sign(self, operation_name=None, **kwargs):
+        if operation_name is None:
+            return
+        wait_time = self.get_bucket(operation_name).acquire()
+        if wait_time > 0:
+            LOG.debug(f"rate limited {operation_name} for {wait_time:.2f} seconds")
+
+    def _on_response(self, response=None, operation=None, **kwargs):
+        if response is None or operation is None:
+            return None
+        _, parsed_response = response
+        error_code = parsed_response.get("Error", {}).get("Code")
+        bucket = self.get_bucket(operation.name)
+        if error_code in THROTTLING_ERROR_CODES:
+            bucket.on_throttled()
+            LOG.warning(f"{operation.name} was throttled, slowing down to {bucket.rate} requests per second")
+        elif error_code is None:
+            bucket.on_success()
+        # never decide on retries here, that is left to the retry handler
+        return None
+
+
+# Shared by all clients, so concurrent api calls and cached clients all count towards the same rates
+api_rate_limiter = ApiRateLimiter()
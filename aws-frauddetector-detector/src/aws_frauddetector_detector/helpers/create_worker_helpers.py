@@ -1,11 +1,11 @@
 import logging
-from typing import List
+from typing import Dict, List
 
 from cloudformation_cli_python_lib import (
     exceptions,
 )
 
-from . import validation_helpers, common_helpers, model_helpers, api_helpers, util
+from . import validation_helpers, common_helpers, model_helpers, api_helpers, index_helpers, util
 from .. import models
 
 # Use this logger to forward log messages to CloudWatch Logs.
@@ -47,29 +47,6 @@ def create_detector_version_for_detector_resource(
     )
 
 
-def _validate_outcomes_for_rule(afd_client, rule_model: models.Rule):
-    for outcome_model in rule_model.Outcomes:
-        if outcome_model.Inline:
-            _create_inline_outcome(afd_client, outcome_model)
-        else:
-            outcome_name = util.extract_name_from_arn(outcome_model.Arn)
-            get_outcomes_worked, _ = validation_helpers.check_if_get_outcomes_succeeds(
-                frauddetector_client=afd_client, outcome_name=outcome_name
-            )
-            if not get_outcomes_worked:
-                raise exceptions.NotFound("non-inline outcome", outcome_name)
-
-
-def _create_inline_outcome(afd_client, outcome_model: models.Outcome):
-    tags = model_helpers.get_tags_from_tag_models(outcome_model.Tags)
-    api_helpers.call_put_outcome(
-        frauddetector_client=afd_client,
-        outcome_name=outcome_model.Name,
-        outcome_tags=tags,
-        outcome_description=outcome_model.Description,
-    )
-
-
 def _validate_event_type_for_detector_create(afd_client, model: models.ResourceModel):
     event_type_model = model.EventType
     if event_type_model.Inline:
@@ -89,15 +66,30 @@ def _validate_referenced_event_type(afd_client, event_type_model: models.EventTy
 
 def _validate_rules_for_detector_create(afd_client, model: models.ResourceModel):
     for rule in model.Rules:
-        _validate_rule_for_detector_create(afd_client, model, rule)
-
-
-def _validate_rule_for_detector_create(afd_client, model: models.ResourceModel, rule: models.Rule):
+        _validate_rule_for_detector_create(model, rule)
+
+    # check existence of all referenced outcomes at once, rather than once per rule
+    referenced_outcome_names = {
+        util.extract_name_from_arn(outcome.Arn)
+        for rule in model.Rules
+        for outcome in rule.Outcomes
+        if not outcome.Inline
+    }
+    outcome_index = index_helpers.build_outcome_index(afd_client, referenced_outcome_names)
+    missing_outcome_names = sorted(referenced_outcome_names - outcome_index.keys())
+    if missing_outcome_names:
+        raise exceptions.NotFound("non-inline outcome", missing_outcome_names[0])
+
+    # put each inline outcome once, no matter how many rules share it
+    inline_outcome_models_by_name = model_helpers.get_inline_outcome_models_by_name(model.Rules)
+    model_helpers.put_inline_outcomes_for_outcome_models(afd_client, inline_outcome_models_by_name.values())
+
+
+def _validate_rule_for_detector_create(model: models.ResourceModel, rule: models.Rule):
     if model.DetectorId != rule.DetectorId:
         raise exceptions.InvalidRequest(
             f"Rule {rule.RuleId} detector id {rule.DetectorId} does not match detector id {model.DetectorId}!"
         )
-    _validate_outcomes_for_rule(afd_client, rule)
 
 
 def _validate_dependencies_for_inline_event_type_create(afd_client, event_type_model: models.EventType):
@@ -1,6 +1,8 @@
 import logging
+from functools import partial
+from typing import List, Tuple
 
-from . import api_helpers, model_helpers
+from . import api_helpers, model_helpers, util
 from .. import models
 
 # Use this logger to forward log messages to CloudWatch Logs.
@@ -11,27 +13,45 @@ ACTIVE_STATUS = "ACTIVE"
 INACTIVE_STATUS = "INACTIVE"
 
 
-def deactivate_and_delete_detector_versions_for_detector_model(afd_client, detector_model: models.ResourceModel):
+def delete_detector_and_dependencies_for_detector_model(afd_client, detector_model: models.ResourceModel):
+    # every tier runs concurrently, and only starts once the tier it depends on is done
+    util.run_tiers(
+        _get_detector_version_tiers(afd_client, detector_model)
+        + _get_rule_and_inline_outcome_tiers(afd_client, detector_model)
+        + _get_detector_tiers(afd_client, detector_model)
+        + _get_inline_dependency_tiers(afd_client, detector_model)
+    )
+
+
+def _get_detector_version_tiers(afd_client, detector_model: models.ResourceModel) -> List[Tuple[str, list]]:
     describe_detector_response = api_helpers.call_describe_detector(
         frauddetector_client=afd_client, detector_id=detector_model.DetectorId
     )
     dv_summaries = describe_detector_response.get("detectorVersionSummaries", [])
-    for dv in dv_summaries:
-        if dv.get("status", "") == ACTIVE_STATUS:
-            api_helpers.call_update_detector_version_status(
-                frauddetector_client=afd_client,
-                detector_id=detector_model.DetectorId,
-                detector_version_id=dv.get("detectorVersionId", "-1"),
-                status=INACTIVE_STATUS,
-            )
-        api_helpers.call_delete_detector_version(
+    deactivate_tasks = [
+        partial(
+            api_helpers.call_update_detector_version_status,
+            frauddetector_client=afd_client,
+            detector_id=detector_model.DetectorId,
+            detector_version_id=dv.get("detectorVersionId", "-1"),
+            status=INACTIVE_STATUS,
+        )
+        for dv in dv_summaries
+        if dv.get("status", "") == ACTIVE_STATUS
+    ]
+    delete_tasks = [
+        partial(
+            api_helpers.call_delete_detector_version,
             frauddetector_client=afd_client,
             detector_id=detector_model.DetectorId,
             detector_version_id=dv.get("detectorVersionId", "-1"),
         )
+        for dv in dv_summaries
+    ]
+    return [("deactivate detector versions", deactivate_tasks), ("delete detector versions", delete_tasks)]
 
 
-def delete_rules_and_inline_outcomes_for_detector_model(afd_client, detector_model: models.ResourceModel):
+def _get_rule_and_inline_outcome_tiers(afd_client, detector_model: models.ResourceModel) -> List[Tuple[str, list]]:
     # get rules: id -> rules
     get_rules_response = api_helpers.call_get_rules(
         frauddetector_client=afd_client, detector_id=detector_model.DetectorId
@@ -39,6 +59,7 @@ def delete_rules_and_inline_outcomes_for_detector_model(afd_client, detector_mod
     rule_details = get_rules_response.get("ruleDetails", [])
     rule_models_by_rule_id_version = _create_rule_models_by_rule_id_rule_version_tuple(detector_model)
     inline_outcome_names = set()
+    delete_rule_tasks = []
     for rule_detail in rule_details:
         rule_id = rule_detail.get("ruleId", "")
         rule_version = rule_detail.get("ruleVersion", "-1")
@@ -49,30 +70,67 @@ def delete_rules_and_inline_outcomes_for_detector_model(afd_client, detector_mod
             rule_model = rule_models_by_rule_id_version[rule_id_version_tuple]
             inline_outcome_names.update([outcome.Name for outcome in rule_model.Outcomes if outcome.Inline])
 
-        # delete rule
-        api_helpers.call_delete_rule(
-            frauddetector_client=afd_client,
-            detector_id=detector_model.DetectorId,
-            rule_id=rule_id,
-            rule_version=rule_version,
+        delete_rule_tasks.append(
+            partial(
+                api_helpers.call_delete_rule,
+                frauddetector_client=afd_client,
+                detector_id=detector_model.DetectorId,
+                rule_id=rule_id,
+                rule_version=rule_version,
+            )
         )
 
-    for outcome_name in inline_outcome_names:
-        api_helpers.call_delete_outcome(frauddetector_client=afd_client, outcome_name=outcome_name)
-    return
-
-
-def delete_detector_for_detector_model(afd_client, detector_model: models.ResourceModel):
-    api_helpers.call_delete_detector(frauddetector_client=afd_client, detector_id=detector_model.DetectorId)
+    delete_outcome_tasks = [
+        partial(api_helpers.call_delete_outcome, frauddetector_client=afd_client, outcome_name=outcome_name)
+        for outcome_name in inline_outcome_names
+    ]
+    return [("delete rule versions", delete_rule_tasks), ("delete inline outcomes", delete_outcome_tasks)]
+
+
+def _get_detector_tiers(afd_client, detector_model: models.ResourceModel) -> List[Tuple[str, list]]:
+    return [
+        (
+            "delete detector",
+            [
+                partial(
+                    api_helpers.call_delete_detector,
+                    frauddetector_client=afd_client,
+                    detector_id=detector_model.DetectorId,
+                )
+            ],
+        )
+    ]
 
 
-def delete_inline_dependencies_for_detector_model(afd_client, detector_model: models.ResourceModel):
-    if detector_model.EventType.Inline:
-        api_helpers.call_delete_event_type(
-            frauddetector_client=afd_client,
-            event_type_name=detector_model.EventType.Name,
-        )
-        _delete_inline_dependencies_for_inline_event_type(afd_client, detector_model.EventType)
+def _get_inline_dependency_tiers(afd_client, detector_model: models.ResourceModel) -> List[Tuple[str, list]]:
+    if not detector_model.EventType.Inline:
+        return []
+    inline_resources = model_helpers.get_inline_resources_for_event_type(event_type_model=detector_model.EventType)
+    delete_event_type_task = partial(
+        api_helpers.call_delete_event_type,
+        frauddetector_client=afd_client,
+        event_type_name=detector_model.EventType.Name,
+    )
+    delete_dependency_tasks = (
+        [
+            partial(api_helpers.call_delete_variable, frauddetector_client=afd_client, variable_name=variable_name)
+            for variable_name in inline_resources["event_variables"]
+        ]
+        + [
+            partial(
+                api_helpers.call_delete_entity_type, frauddetector_client=afd_client, entity_type_name=entity_type_name
+            )
+            for entity_type_name in inline_resources["entity_types"]
+        ]
+        + [
+            partial(api_helpers.call_delete_label, frauddetector_client=afd_client, label_name=label_name)
+            for label_name in inline_resources["labels"]
+        ]
+    )
+    return [
+        ("delete inline event type", [delete_event_type_task]),
+        ("delete inline event variables, entity types and labels", delete_dependency_tasks),
+    ]
 
 
 def _create_rule_models_by_rule_id_rule_version_tuple(
@@ -84,25 +142,3 @@ def _create_rule_models_by_rule_id_rule_version_tuple(
     for rule in detector_model.Rules:
         dict_to_return[(rule.RuleId, rule.RuleVersion)] = rule
     return dict_to_return
-
-
-def _delete_inline_dependencies_for_inline_event_type(afd_client, event_type_model: models.EventType):
-    inline_resources = model_helpers.get_inline_resources_for_event_type(event_type_model=event_type_model)
-    _delete_inline_event_variables(afd_client, inline_resources["event_variables"])
-    _delete_inline_entity_types(afd_client, inline_resources["entity_types"])
-    _delete_inline_labels(afd_client, inline_resources["labels"])
-
-
-def _delete_inline_event_variables(afd_client, inline_variable_names: set):
-    for inline_variable_name in inline_variable_names:
-        api_helpers.call_delete_variable(frauddetector_client=afd_client, variable_name=inline_variable_name)
-
-
-def _delete_inline_entity_types(afd_client, inline_entity_type_names: set):
-    for inline_entity_type_name in inline_entity_type_names:
-        api_helpers.call_delete_entity_type(frauddetector_client=afd_client, entity_type_name=inline_entity_type_name)
-
-
-def _delete_inline_labels(afd_client, inline_label_names: set):
-    for inline_label_name in inline_label_names:
-        api_helpers.call_delete_label(frauddetector_client=afd_client, label_name=inline_label_name)
@@ -0,0 +1,206 @@
+import logging
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import api_helpers, validation_helpers, util
+
+# Use this logger to forward log messages to CloudWatch Logs.
+LOG = logging.getLogger(__name__)
+LOG.setLevel(logging.DEBUG)
+
+# When more outcome names than this need to be resolved, list all outcomes once instead of getting each by name
+OUTCOME_INDEX_BULK_THRESHOLD = 10
+
+
+# Outcomes
+
+
+def build_outcome_index(frauddetector_client, outcome_names: Iterable[str]) -> Dict[str, dict]:
+    """
+    Build an index of outcome name -> outcome (as returned by get_outcomes) for the given outcome names.
+    Above OUTCOME_INDEX_BULK_THRESHOLD names, the index is built from a paginated get_outcomes listing that stops
+    as soon as every name is found, otherwise from targeted get_outcomes calls.
+    Outcomes that do not exist are left out of the index.
+    :param frauddetector_client: afd boto3 client to use to make the requests
+    :param outcome_names: names of the outcomes to index
+    :return: dict of outcome name -> outcome
+    """
+    outcome_names = set(outcome_names)
+    outcome_index = {}
+    if len(outcome_names) > OUTCOME_INDEX_BULK_THRESHOLD:
+        LOG.debug(f"building outcome index from all outcomes for {len(outcome_names)} outcome names")
+        try:
+            for outcome in api_helpers.call_get_outcomes.iterate(frauddetector_client):
+                if outcome.get("name") in outcome_names:
+                    outcome_index[outcome.get("name")] = outcome
+                if len(outcome_index) == len(outcome_names):
+                    break
+        except api_helpers.PaginationBudgetExceeded as e:
+            LOG.warning(f"outcome index is incomplete, getting the rest by name: {e}")
+
+    # get the remaining outcomes by name, this includes outcomes a bulk listing missed (e.g. just created outcomes)
+    remaining_outcome_names = sorted(outcome_names - outcome_index.keys())
+    get_outcome_results = util.map_concurrently(
+        partial(_get_outcome_by_name, frauddetector_client), remaining_outcome_names
+    )
+    for outcome_name, outcome in zip(remaining_outcome_names, get_outcome_results):
+        if outcome is not None:
+            outcome_index[outcome_name] = outcome
+    return outcome_index
+
+
+def _get_outcome_by_name(frauddetector_client, outcome_name: str):
+    get_outcomes_worked, get_outcomes_response = validation_helpers.check_if_get_outcomes_succeeds(
+        frauddetector_client, outcome_name
+    )
+    if not get_outcomes_worked:
+        return None
+    outcomes = get_outcomes_response.get("outcomes", [])
+    if len(outcomes) != 1:
+        return None
+    return outcomes[0]
+
+
+# Rules
+
+
+class RuleIndex:
+    """
+    Index of all rule versions of a detector, keyed by rule id and by (rule id, rule version).
+    Built from a single paginated get_rules sweep, and kept up to date in place with the rules returned by
+    create_rule and update_rule_version, so that a handler never has to get rules of the detector again.
+    """
+
+    def __init__(self, detector_id: str, rule_details: Iterable[dict] = ()):
+        self.detector_id = detector_id
+        self._rule_details_by_rule_id: Dict[str, Dict[str, dict]] = {}
+        for rule_detail in rule_details:
+            self.add(rule_detail)
+
+    def add(self, rule: dict):
+        """
+        Add or replace a rule version, e.g. a rule detail from get_rules or the rule of a create_rule response.
+        """
+        rule_versions = self._rule_details_by_rule_id.setdefault(rule.get("ruleId"), {})
+        rule_versions[rule.get("ruleVersion")] = rule
+
+    def remove(self, rule_id: str, rule_version: str):
+        """
+        Remove a rule version, e.g. after delete_rule.
+        """
+        rule_versions = self._rule_details_by_rule_id.get(rule_id, {})
+        rule_versions.pop(rule_version, None)
+        if not rule_versions:
+            self._rule_details_by_rule_id.pop(rule_id, None)
+
+    def get_all_rule_versions(self) -> List[dict]:
+        return [
+            rule_detail
+            for rule_versions in self._rule_details_by_rule_id.values()
+            for rule_detail in rule_versions.values()
+        ]
+
+    def get(self, rule_id: str, rule_version: str) -> Optional[dict]:
+        return self._rule_details_by_rule_id.get(rule_id, {}).get(rule_version)
+
+    def get_rule_versions(self, rule_id: str) -> List[dict]:
+        return list(self._rule_details_by_rule_id.get(rule_id, {}).values())
+
+    def get_max_rule_version(self, rule_id: str) -> Optional[str]:
+        rule_versions = self._rule_details_by_rule_id.get(rule_id, {}).keys()
+        if not rule_versions:
+            return None
+        return max(rule_versions, key=int)
+
+
+def build_rule_index(frauddetector_client, detector_id: str) -> RuleIndex:
+    """
+    Build an index of all rule versions of the given detector from a single paginated get_rules sweep.
+    :param frauddetector_client: afd boto3 client to use to make the requests
+    :param detector_id: id of the detector to index rules for
+    :return: RuleIndex for the detector
+    """
+    get_rules_response = api_helpers.call_get_rules(frauddetector_client=frauddetector_client, detector_id=detector_id)
+    return RuleIndex(detector_id, get_rules_response.get("ruleDetails", []))
+
+
+# Usage
+
+
+class DetectorUsageGraph:
+    """
+    Reference graph of a detector: detector versions -> rule versions -> outcomes.
+    Lets a handler delete only the rule versions and outcomes that nothing references anymore, instead of trying
+    every delete and catching the ConflictException of the ones that are still in use.
+    """
+
+    def __init__(
+        self,
+        detector_id: str,
+        rule_versions_by_detector_version_id: Dict[str, Iterable[Tuple[str, str]]],
+        rule_index: RuleIndex,
+    ):
+        self.detector_id = detector_id
+        self.rule_index = rule_index
+        self._detector_version_ids_by_rule_version: Dict[Tuple[str, str], Set[str]] = {}
+        for detector_version_id, rule_versions in rule_versions_by_detector_version_id.items():
+            for rule_version in rule_versions:
+                self._detector_version_ids_by_rule_version.setdefault(tuple(rule_version), set()).add(
+                    detector_version_id
+                )
+
+    def get_detector_version_ids_referencing(self, rule_id: str, rule_version: str) -> Set[str]:
+        return set(self._detector_version_ids_by_rule_version.get((rule_id, rule_version), set()))
+
+    def get_rule_versions_referencing(self, outcome_name: str) -> Set[Tuple[str, str]]:
+        return {
+            (rule_detail.get("ruleId"), rule_detail.get("ruleVersion"))
+            for rule_detail in self.rule_index.get_all_rule_versions()
+            if outcome_name in rule_detail.get("outcomes", [])
+        }
+
+    def get_unreferenced_rule_versions(self, rule_versions: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        return {
+            (rule_id, rule_version)
+            for rule_id, rule_version in rule_versions
+            if not self.get_detector_version_ids_referencing(rule_id, rule_version)
+        }
+
+    def get_unreferenced_outcomes(self, outcome_names: Iterable[str]) -> Set[str]:
+        referenced_outcome_names = {
+            outcome_name
+            for rule_detail in self.rule_index.get_all_rule_versions()
+            for outcome_name in rule_detail.get("outcomes", [])
+        }
+        return set(outcome_names) - referenced_outcome_names
+
+    def remove_rule_version(self, rule_id: str, rule_version: str):
+        self._detector_version_ids_by_rule_version.pop((rule_id, rule_version), None)
+        self.rule_index.remove(rule_id, rule_version)
+
+
+def build_detector_usage_graph(frauddetector_client, detector_id: str) -> DetectorUsageGraph:
+    """
+    Build the reference graph of the given detector from one describe_detector, a get_detector_version per detector
+    version (run concurrently) and a single get_rules sweep.
+    :param frauddetector_client: afd boto3 client to use to make the requests
+    :param detector_id: id of the detector to build the graph for
+    :return: DetectorUsageGraph for the detector
+    """
+    describe_detector_response = api_helpers.call_describe_detector(frauddetector_client, detector_id)
+    detector_version_ids = [
+        summary.get("detectorVersionId") for summary in describe_detector_response.get("detectorVersionSummaries", [])
+    ]
+    get_detector_version_responses = util.map_concurrently(
+        partial(api_helpers.call_get_detector_version, frauddetector_client, detector_id), detector_version_ids
+    )
+    rule_versions_by_detector_version_id = {
+        detector_version_id: [
+            (rule.get("ruleId"), rule.get("ruleVersion")) for rule in get_detector_version_response.get("rules", [])
+        ]
+        for detector_version_id, get_detector_version_response in zip(
+            detector_version_ids, get_detector_version_responses
+        )
+    }
+    rule_index = build_rule_index(frauddetector_client, detector_id)
+    return DetectorUsageGraph(detector_id, rule_versions_by_detector_version_id, rule_index)
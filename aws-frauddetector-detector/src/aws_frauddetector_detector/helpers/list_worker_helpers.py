@@ -1,7 +1,7 @@
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 
-from . import api_helpers, model_helpers
+from . import api_helpers
 from .. import models
 
 # Use this logger to forward log messages to CloudWatch Logs.
@@ -9,41 +9,40 @@ LOG = logging.getLogger(__name__)
 LOG.setLevel(logging.DEBUG)
 
 
-def list_detector_models(afd_client) -> List[models.ResourceModel]:
-    # For contract_delete_read, we need to fail if the resource DNE
-    get_detectors_response = api_helpers.call_get_detectors(afd_client)
+def list_detector_models(afd_client, next_token: str = None) -> Tuple[List[models.ResourceModel], Optional[str]]:
+    # Return a single page of detectors per invocation, so list stays bounded regardless of account size.
+    #   Models are built from the get_detectors summaries only: rules, outcomes, event type dependencies and tags
+    #   are left for the read handler, which callers can use with the primary identifier (Arn) of each model.
+    get_detectors_response = api_helpers.call_get_detectors_page(afd_client, next_token=next_token)
     detectors_in_response = get_detectors_response.get("detectors", [])
+    models_to_return = [_get_shallow_model_for_detector(detector) for detector in detectors_in_response]
+    return models_to_return, get_detectors_response.get("nextToken", None)
 
-    models_to_return = []
-    for detector in detectors_in_response:
-        # get_model_for_detector requires model.EventType.Name and model.EventType.Inline
-        # Assume Inline for list handler (we have no way of knowing with current implementation)
-        empty_event_type_model = models.EventType(
-            Name=detector.get("eventTypeName", None),
-            Tags=[],
-            Description=None,
-            EventVariables=[],
-            Labels=[],
-            EntityTypes=[],
-            Arn=None,
-            CreatedTime=None,
-            LastUpdatedTime=None,
-            Inline=True,
-        )
-        partial_model = models.ResourceModel(
-            DetectorId=detector.get("detectorId", ""),
-            Arn=detector.get("arn", ""),
-            CreatedTime=detector.get("createdTime", ""),
-            LastUpdatedTime=detector.get("lastUpdatedTime", ""),
-            Description=detector.get("description", None),
-            EventType=empty_event_type_model,
-            DetectorVersionId=None,
-            DetectorVersionStatus=None,
-            RuleExecutionMode=None,
-            Rules=[],
-            Tags=None,
-            AssociatedModels=None,
-        )
-        populated_model = model_helpers.get_model_for_detector(afd_client, detector, partial_model)
-        models_to_return.append(populated_model)
-    return models_to_return
+
+def _get_shallow_model_for_detector(detector: dict) -> models.ResourceModel:
+    event_type_model = models.EventType(
+        Name=detector.get("eventTypeName", None),
+        Tags=None,
+        Description=None,
+        EventVariables=None,
+        Labels=None,
+        EntityTypes=None,
+        Arn=None,
+        CreatedTime=None,
+        LastUpdatedTime=None,
+        Inline=None,
+    )
+    return models.ResourceModel(
+        DetectorId=detector.get("detectorId", ""),
+        Arn=detector.get("arn", ""),
+        CreatedTime=detector.get("createdTime", ""),
+        LastUpdatedTime=detector.get("lastUpdatedTime", ""),
+        Description=detector.get("description", None),
+        EventType=event_type_model,
+        DetectorVersionId=None,
+        DetectorVersionStatus=None,
+        RuleExecutionMode=None,
+        Rules=None,
+        Tags=None,
+        AssociatedModels=None,
+    )
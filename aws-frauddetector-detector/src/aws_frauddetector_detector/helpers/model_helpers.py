@@ -1,17 +1,25 @@
-from typing import List, Optional, Set
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Set
 from cloudformation_cli_python_lib import (
     exceptions,
 )
 
 from .. import models
-from . import api_helpers, validation_helpers, util
+from . import api_helpers, index_helpers, validation_helpers, util
 
 import logging
+import re
 
 # Use this logger to forward log messages to CloudWatch Logs.
 LOG = logging.getLogger(__name__)
 LOG.setLevel(logging.DEBUG)
 
+# Rule execution mode AFD uses for detector versions created without one
+DEFAULT_RULE_EXECUTION_MODE = "FIRST_MATCHED"
+
+# Matches double or single quoted string literals in rule expressions, e.g. $email == "a  b"
+RULE_EXPRESSION_STRING_LITERAL_PATTERN = re.compile(r"(\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*')")
+
 
 # Tags
 
@@ -73,10 +81,6 @@ def get_model_for_detector(frauddetector_client, detector, model: models.Resourc
         AssociatedModels=None,
     )
 
-    # get event type model
-    event_type_model = get_event_type_and_return_event_type_model(frauddetector_client, model.EventType)
-    model_to_return.EventType = event_type_model
-
     # get latest detector version info to attach to model
     if model.DetectorVersionId:
         desired_detector_version = api_helpers.call_get_detector_version(
@@ -95,53 +99,146 @@ def get_model_for_detector(frauddetector_client, detector, model: models.Resourc
     model_to_return.DetectorVersionStatus = desired_detector_version.get("status", "")
     model_to_return.RuleExecutionMode = desired_detector_version.get("ruleExecutionMode", "")
 
-    associated_models: List[models.Model] = []
+    # the event type, associated models, rules and tags are independent of each other, so fetch them concurrently.
+    #   rules are read from a single detector-wide rule index rather than one get_rules call per rule
     model_endpoints: List[str] = desired_detector_version.get("externalModelEndpoints", [])
-    for model_endpoint in model_endpoints:
-        get_external_models_response = api_helpers.call_get_external_models(frauddetector_client, model_endpoint)
-        external_models = get_external_models_response.get("externalModels", [])
-        if not external_models:
-            # we should never see this block get executed
-            raise exceptions.NotFound("associatedModel", model_endpoint)
-        associated_models.append(models.Model(Arn=external_models[0].get("arn", "not/found")))
-
     model_versions: List[dict] = desired_detector_version.get("modelVersions", [])
-    for model_version in model_versions:
+    rules: List[dict] = desired_detector_version.get("rules", [])
+    referenced_outcome_names = referenced_resources.get("rule_outcomes")
 
-        required_attributes = {"modelId", "modelType", "modelVersionNumber"}
-        if not required_attributes.issubset(model_version.keys()):
-            # we should never see this block get executed
-            LOG.error(f"get DV did not include enough information in model versions: {desired_detector_version}")
-            raise exceptions.NotFound("associatedModel", model_version)
+    tasks = [
+        partial(get_event_type_and_return_event_type_model, frauddetector_client, model.EventType),
+        partial(_get_tags_for_given_arn, frauddetector_client, detector_arn),
+        partial(index_helpers.build_rule_index, frauddetector_client, detector_id),
+    ]
+    tasks.extend(
+        partial(_get_associated_model_for_external_model_endpoint, frauddetector_client, model_endpoint)
+        for model_endpoint in model_endpoints
+    )
+    tasks.extend(
+        partial(_get_associated_model_for_model_version, frauddetector_client, desired_detector_version, model_version)
+        for model_version in model_versions
+    )
+    results = util.run_concurrently(tasks)
 
-        model_version_arn = get_model_version_arn_from_model_version(frauddetector_client, model_version)
-        associated_models.append(models.Model(Arn=model_version_arn))
+    model_to_return.EventType = results[0]
+    detector_tags = results[1]
+    rule_index: index_helpers.RuleIndex = results[2]
+    model_to_return.AssociatedModels = results[3:]
 
-    model_to_return.AssociatedModels = associated_models
+    # rule details keep the same order as the rules in the detector version
+    rule_details = [
+        _get_rule_detail(rule_index, rule.get("ruleId", ""), rule.get("ruleVersion", "-1")) for rule in rules
+    ]
 
-    # get rule models to attach
-    referenced_outcome_names = referenced_resources.get("rule_outcomes")
-    for rule in desired_detector_version.get("rules", []):
-        rule_detector_id = rule.get("detectorId", "")
-        rule_id = rule.get("ruleId", "")
-        rule_version = rule.get("ruleVersion", "-1")
-        rule_to_append = get_rule_and_return_rule_model(
+    # resolve the outcomes of all rules with a single outcome index, then build rule models concurrently
+    outcome_index = index_helpers.build_outcome_index(
+        frauddetector_client,
+        {outcome_name for rule_detail in rule_details for outcome_name in rule_detail.get("outcomes", [])},
+    )
+    model_to_return.Rules = util.map_concurrently(
+        partial(
+            _get_rule_model_for_rule_detail,
             frauddetector_client,
-            rule_detector_id,
-            rule_id,
-            rule_version,
-            referenced_outcome_names,
-        )
-        model_to_return.Rules.append(rule_to_append)
+            referenced_outcomes=referenced_outcome_names,
+            outcome_index=outcome_index,
+        ),
+        rule_details,
+    )
 
-    # get tags
-    detector_tags = _get_tags_for_given_arn(frauddetector_client, detector_arn)
     # TODO: reorder tags to the same order as the input model to work around contract test bug?
     model_to_return.Tags = get_tag_models_from_tags(detector_tags)
 
     return model_to_return
 
 
+def get_model_for_written_detector(
+    frauddetector_client, model: models.ResourceModel, detector_version_id: str, rule_dicts: List[dict]
+) -> models.ResourceModel:
+    """
+    Build the model of a detector the handler just wrote from the desired model and the write responses
+    (detector version id, rule versions), reading only what the writes do not return: the detector and rule
+    arns and timestamps, the outcomes and the event type.
+    Tags and associated models are taken from the desired model, since the handler just wrote them.
+    """
+    referenced_resources = get_referenced_resources_for_detector(model)
+    tasks = [
+        partial(api_helpers.call_get_detectors, frauddetector_client, model.DetectorId),
+        partial(get_event_type_and_return_event_type_model, frauddetector_client, model.EventType),
+        partial(index_helpers.build_rule_index, frauddetector_client, model.DetectorId),
+    ]
+    get_detectors_response, event_type_model, rule_index = util.run_concurrently(tasks)
+    detectors = get_detectors_response.get("detectors", [])
+    if not detectors:
+        raise exceptions.NotFound("detector", model.DetectorId)
+    detector = detectors[0]
+
+    model_to_return = models.ResourceModel(
+        DetectorId=detector.get("detectorId", ""),
+        Arn=detector.get("arn", ""),
+        CreatedTime=detector.get("createdTime", ""),
+        LastUpdatedTime=detector.get("lastUpdatedTime", ""),
+        Description=detector.get("description", ""),
+        EventType=event_type_model,
+        DetectorVersionId=detector_version_id,
+        DetectorVersionStatus=model.DetectorVersionStatus,
+        RuleExecutionMode=model.RuleExecutionMode or DEFAULT_RULE_EXECUTION_MODE,
+        Rules=[],
+        Tags=get_tag_models_from_tags(get_tags_from_tag_models(model.Tags) or []),
+        AssociatedModels=[models.Model(Arn=associated_model.Arn) for associated_model in model.AssociatedModels or []],
+    )
+
+    rule_details = [
+        _get_rule_detail(rule_index, rule_dict.get("ruleId", ""), rule_dict.get("ruleVersion", "-1"))
+        for rule_dict in rule_dicts
+    ]
+    outcome_index = index_helpers.build_outcome_index(
+        frauddetector_client,
+        {outcome_name for rule_detail in rule_details for outcome_name in rule_detail.get("outcomes", [])},
+    )
+    rule_tags_by_rule_id = {rule.RuleId: get_tags_from_tag_models(rule.Tags) or [] for rule in model.Rules}
+    outcome_tags_by_name = {
+        outcome.Name: get_tags_from_tag_models(outcome.Tags) or []
+        for rule in model.Rules
+        for outcome in rule.Outcomes
+        if outcome.Inline
+    }
+    model_to_return.Rules = [
+        _get_rule_model_for_rule_detail(
+            frauddetector_client,
+            rule_detail,
+            referenced_resources.get("rule_outcomes"),
+            outcome_index,
+            rule_tags=rule_tags_by_rule_id.get(rule_detail.get("ruleId")),
+            outcome_tags_by_name=outcome_tags_by_name,
+        )
+        for rule_detail in rule_details
+    ]
+    return model_to_return
+
+
+def _get_associated_model_for_external_model_endpoint(frauddetector_client, model_endpoint: str) -> models.Model:
+    get_external_models_response = api_helpers.call_get_external_models(frauddetector_client, model_endpoint)
+    external_models = get_external_models_response.get("externalModels", [])
+    if not external_models:
+        # we should never see this block get executed
+        raise exceptions.NotFound("associatedModel", model_endpoint)
+    return models.Model(Arn=external_models[0].get("arn", "not/found"))
+
+
+def _get_associated_model_for_model_version(
+    frauddetector_client, detector_version: dict, model_version: dict
+) -> models.Model:
+    required_attributes = {"modelId", "modelType", "modelVersionNumber"}
+    if not required_attributes.issubset(model_version.keys()):
+        # we should never see this block get executed
+        LOG.error(f"get DV did not include enough information in model versions: {detector_version}")
+        raise exceptions.NotFound("associatedModel", model_version)
+
+    model_version_arn = get_model_version_arn_from_model_version(frauddetector_client, model_version)
+    return models.Model(Arn=model_version_arn)
+
+
 def get_model_version_arn_from_model_version(frauddetector_client, model_version: dict) -> str:
     get_mv_response = api_helpers.call_get_model_version(
         frauddetector_client=frauddetector_client,
@@ -183,23 +280,22 @@ def create_rule_for_rule_model(
     return create_rule_response.get("rule")
 
 
-def get_rule_and_return_rule_model(
+def _get_rule_detail(rule_index: index_helpers.RuleIndex, rule_id: str, rule_version: str) -> dict:
+    rule_detail = rule_index.get(rule_id, rule_version)
+    if rule_detail is None:
+        raise exceptions.NotFound("ruleId:ruleVersion", f"{rule_id}:{rule_version}")
+    return rule_detail
+
+
+def _get_rule_model_for_rule_detail(
     frauddetector_client,
-    detector_id: str,
-    rule_id: str,
-    rule_version: str,
+    rule_detail: dict,
     referenced_outcomes: set,
+    outcome_index: Optional[Dict[str, dict]] = None,
+    rule_tags: Optional[List[dict]] = None,
+    outcome_tags_by_name: Optional[Dict[str, List[dict]]] = None,
 ) -> models.Rule:
-    get_rules_response = api_helpers.call_get_rules(
-        frauddetector_client=frauddetector_client,
-        detector_id=detector_id,
-        rule_id=rule_id,
-        rule_version=rule_version,
-    )
-    rule_details = get_rules_response.get("ruleDetails")
-    if len(rule_details) != 1:
-        raise exceptions.NotFound("ruleId:ruleVersion", f"{rule_id}:{rule_version}")
-    rule_detail = rule_details[0]
+    # rule_tags and outcome_tags_by_name skip reading tags the caller just wrote
     rule_arn = rule_detail.get("arn", "")
     rule_outcome_names = rule_detail.get("outcomes", "")
     model_to_return = models.Rule(
@@ -217,7 +313,8 @@ def get_rule_and_return_rule_model(
     )
 
     # attach tag models
-    rule_tags = _get_tags_for_given_arn(frauddetector_client, rule_arn)
+    if rule_tags is None:
+        rule_tags = _get_tags_for_given_arn(frauddetector_client, rule_arn)
     model_to_return.Tags = get_tag_models_from_tags(rule_tags)
 
     # attach outcome models
@@ -225,10 +322,64 @@ def get_rule_and_return_rule_model(
         frauddetector_client=frauddetector_client,
         outcome_names=rule_outcome_names,
         reference_outcome_names=referenced_outcomes,
+        outcome_index=outcome_index,
+        outcome_tags_by_name=outcome_tags_by_name,
     )
     return model_to_return
 
 
+def rule_models_are_equivalent(previous_rule_model: models.Rule, current_rule_model: models.Rule) -> bool:
+    """
+    Structurally compare two rule models on everything update_rule_version would change: expression (ignoring
+    whitespace outside of string literals), language, outcome names (resolved from Name or Arn), description and tags.
+    """
+    return (
+        _normalize_rule_expression(previous_rule_model.Expression)
+        == _normalize_rule_expression(current_rule_model.Expression)
+        and previous_rule_model.Language == current_rule_model.Language
+        and _get_outcome_names_for_rule_model(previous_rule_model)
+        == _get_outcome_names_for_rule_model(current_rule_model)
+        and (previous_rule_model.Description or "") == (current_rule_model.Description or "")
+        and _get_tags_by_key(previous_rule_model.Tags) == _get_tags_by_key(current_rule_model.Tags)
+    )
+
+
+def rule_detail_matches_rule_model(rule_detail: dict, rule_model: models.Rule) -> bool:
+    """
+    Compare an existing rule version (as returned by get_rules) with a rule model on everything create_rule writes,
+    except for tags, which get_rules does not return.
+    """
+    return (
+        _normalize_rule_expression(rule_detail.get("expression", None))
+        == _normalize_rule_expression(rule_model.Expression)
+        and rule_detail.get("language", None) == rule_model.Language
+        and list(rule_detail.get("outcomes", [])) == _get_outcome_names_for_rule_model(rule_model)
+        and (rule_detail.get("description", None) or "") == (rule_model.Description or "")
+    )
+
+
+def outcome_models_are_equivalent(
+    previous_outcome_model: models.Outcome, current_outcome_model: models.Outcome
+) -> bool:
+    return (previous_outcome_model.Description or "") == (current_outcome_model.Description or "") and _get_tags_by_key(
+        previous_outcome_model.Tags
+    ) == _get_tags_by_key(current_outcome_model.Tags)
+
+
+def _normalize_rule_expression(expression: Optional[str]) -> str:
+    # odd parts are string literals, which are kept as is
+    parts = RULE_EXPRESSION_STRING_LITERAL_PATTERN.split((expression or "").strip())
+    return "".join(part if i % 2 else " ".join(part.split()) for i, part in enumerate(parts))
+
+
+def _get_outcome_names_for_rule_model(rule_model: models.Rule) -> List[str]:
+    return [outcome.Name or util.extract_name_from_arn(outcome.Arn) for outcome in rule_model.Outcomes or []]
+
+
+def _get_tags_by_key(tag_models: Optional[List[models.Tag]]) -> Dict[str, str]:
+    return {tag.Key: tag.Value for tag in tag_models or []}
+
+
 # EventTypes
 
 
@@ -348,16 +499,54 @@ def get_model_for_inline_event_type(frauddetector_client, event_type, referenced
 # Outcomes
 
 
-def get_outcomes_model_for_given_outcome_names(frauddetector_client, outcome_names, reference_outcome_names):
+def get_inline_outcome_models_by_name(rule_models: Iterable[models.Rule]) -> Dict[str, models.Outcome]:
+    """
+    Collect the unique inline outcomes of the given rules by name, as rules commonly share inline outcomes.
+    Raises InvalidRequest when two rules define the same inline outcome with a different description or tags.
+    """
+    inline_outcome_models_by_name = {}
+    for rule_model in rule_models:
+        for outcome_model in rule_model.Outcomes or []:
+            if not outcome_model.Inline:
+                continue
+            existing_outcome_model = inline_outcome_models_by_name.setdefault(outcome_model.Name, outcome_model)
+            if not outcome_models_are_equivalent(existing_outcome_model, outcome_model):
+                raise exceptions.InvalidRequest(
+                    f"Inline outcome {outcome_model.Name} is defined differently by rule {rule_model.RuleId}!"
+                )
+    return inline_outcome_models_by_name
+
+
+def put_inline_outcomes_for_outcome_models(frauddetector_client, outcome_models: Iterable[models.Outcome]):
+    util.map_concurrently(partial(_put_inline_outcome_for_outcome_model, frauddetector_client), outcome_models)
+
+
+def _put_inline_outcome_for_outcome_model(frauddetector_client, outcome_model: models.Outcome):
+    api_helpers.call_put_outcome(
+        frauddetector_client=frauddetector_client,
+        outcome_name=outcome_model.Name,
+        outcome_tags=get_tags_from_tag_models(outcome_model.Tags),
+        outcome_description=outcome_model.Description,
+    )
+
+
+def get_outcomes_model_for_given_outcome_names(
+    frauddetector_client,
+    outcome_names,
+    reference_outcome_names,
+    outcome_index: Optional[Dict[str, dict]] = None,
+    outcome_tags_by_name: Optional[Dict[str, List[dict]]] = None,
+):
+    # callers resolving outcomes for several rules should build the outcome index once and pass it in
+    if outcome_index is None:
+        outcome_index = index_helpers.build_outcome_index(frauddetector_client, outcome_names)
     outcome_models = []
     for outcome_name in outcome_names:
-        get_outcomes_response = api_helpers.call_get_outcomes(frauddetector_client, outcome_name)
-        outcomes = get_outcomes_response.get("outcomes", [])
-        if len(outcomes) != 1:
+        outcome = outcome_index.get(outcome_name, None)
+        if outcome is None:
             raise RuntimeError(
                 f"Error! Expected an existing outcome, but outcome did not exist! outcome {outcome_name}"
             )
-        outcome = outcomes[0]
         outcome_arn = outcome.get("arn", "")
         LOG.debug(f"checking if outcome {outcome_name} is in {reference_outcome_names}")
         if outcome_name in reference_outcome_names:
@@ -373,7 +562,9 @@ def get_outcomes_model_for_given_outcome_names(frauddetector_client, outcome_nam
             )
         else:
             LOG.debug(f"outcome not in reference set, {outcome_name} is inline")
-            outcome_tags = _get_tags_for_given_arn(frauddetector_client, outcome_arn)
+            outcome_tags = (outcome_tags_by_name or {}).get(outcome_name)
+            if outcome_tags is None:
+                outcome_tags = _get_tags_for_given_arn(frauddetector_client, outcome_arn)
             tag_models = get_tag_models_from_tags(outcome_tags)
             outcome_model = models.Outcome(
                 Name=outcome_name,
@@ -400,11 +591,19 @@ def get_outcomes_model_for_given_outcome_names(frauddetector_client, outcome_nam
 def _get_variables_and_return_event_variables_model(
     frauddetector_client, variable_names, reference_variable_names: set
 ):
-    collected_variables = []
-    for variable_name in variable_names:
-        # use singular get_variables to preserve order (transient contract test bug workaround)
-        get_variables_response = api_helpers.call_get_variables(frauddetector_client, variable_name)
-        collected_variables.extend(get_variables_response.get("variables", []))
+    variable_names = list(variable_names)
+    batch_get_variable_response = api_helpers.call_batch_get_variable(frauddetector_client, names=variable_names)
+    batch_get_variable_errors = batch_get_variable_response.get("errors", [])
+    if batch_get_variable_errors:
+        missing_variable_names = ", ".join(error.get("name", "") for error in batch_get_variable_errors)
+        raise exceptions.NotFound("eventVariable", missing_variable_names)
+
+    # batch_get_variable does not preserve order, so restore the event type's variable order
+    # (transient contract test bug workaround)
+    variables_by_name = {
+        variable.get("name"): variable for variable in batch_get_variable_response.get("variables", [])
+    }
+    collected_variables = [variables_by_name[name] for name in variable_names if name in variables_by_name]
     return _get_event_variables_model_for_given_variables(
         frauddetector_client, collected_variables, reference_variable_names
     )
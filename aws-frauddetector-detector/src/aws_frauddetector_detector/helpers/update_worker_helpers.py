@@ -1,11 +1,12 @@
 import logging
-from typing import Tuple, Set
+import time
+from typing import Dict, Tuple, Set, Optional
 
 from cloudformation_cli_python_lib import (
     exceptions,
 )
 
-from . import validation_helpers, api_helpers, common_helpers, model_helpers, util
+from . import validation_helpers, api_helpers, common_helpers, index_helpers, model_helpers, util
 from .. import models
 
 # Use this logger to forward log messages to CloudWatch Logs.
@@ -38,55 +39,108 @@ def validate_dependencies_for_detector_update(
     validation_helpers.validate_model_versions_for_detector_model(afd_client, model)
 
 
+def is_metadata_only_detector_update(model: models.ResourceModel, previous_model: models.ResourceModel) -> bool:
+    """
+    A detector update is metadata-only when it leaves everything that lives on the detector version unchanged:
+    rules (and their inline outcomes), rule execution mode, associated models and detector version status.
+    Such an update only needs put_detector and a tag sync, without any rule or detector version churn.
+    """
+    if (
+        model.RuleExecutionMode != previous_model.RuleExecutionMode
+        or model.DetectorVersionStatus != previous_model.DetectorVersionStatus
+        or _get_associated_model_arns(model) != _get_associated_model_arns(previous_model)
+    ):
+        return False
+    current_rules = model.Rules or []
+    previous_rules = previous_model.Rules or []
+    if [rule.RuleId for rule in current_rules] != [rule.RuleId for rule in previous_rules]:
+        return False
+    return all(
+        model_helpers.rule_models_are_equivalent(previous_rule, current_rule)
+        and not _get_inline_outcomes_to_update(previous_rule, current_rule)
+        for previous_rule, current_rule in zip(previous_rules, current_rules)
+    )
+
+
+def keep_detector_version_for_detector_update(model: models.ResourceModel, previous_model: models.ResourceModel):
+    # carry over the detector version and rule versions of the previous model, as nothing about them changed
+    model.DetectorVersionId = previous_model.DetectorVersionId
+    previous_rule_versions_by_rule_id = {rule.RuleId: rule.RuleVersion for rule in previous_model.Rules or []}
+    for rule_model in model.Rules or []:
+        rule_model.RuleVersion = previous_rule_versions_by_rule_id.get(rule_model.RuleId)
+
+
 def update_rules_and_inline_outcomes_for_detector_update(
-    afd_client, model: models.ResourceModel, previous_model: models.ResourceModel
-) -> (Set[Tuple[str, str]], Set[str]):
+    afd_client,
+    model: models.ResourceModel,
+    previous_model: models.ResourceModel,
+    written_rule_versions_by_rule_id: Dict[str, str] = None,
+    deadline: float = None,
+) -> (Set[Tuple[str, str]], Set[str], bool):
+    """
+    Create new rules and update persisting rules (and their inline outcomes), one rule at a time.
+    Each rule version written is recorded in `written_rule_versions_by_rule_id` right away, and recorded rules are
+    skipped, so an update resumed with the same dict does not write any rule again.
+    Once `deadline` (a `time.monotonic()` timestamp) has passed, no more rules are written.
+    Returns the rule versions and inline outcomes to delete (after updating the detector version), and whether
+    every rule was written.
+    """
+    if written_rule_versions_by_rule_id is None:
+        written_rule_versions_by_rule_id = {}
+
     # build list of kept rules, unused rules & new rules
     previous_rules_by_rule_id = {r.RuleId: r for r in previous_model.Rules}
     current_rules_by_rule_id = {r.RuleId: r for r in model.Rules}
 
+    # rules sharing an inline outcome must agree on its definition
+    model_helpers.get_inline_outcome_models_by_name(model.Rules)
+
+    # index all rule versions of the detector once, instead of getting rules per rule
+    rule_index = index_helpers.build_rule_index(afd_client, model.DetectorId)
+
     # get list of outcomes and rule versions to delete
     (unused_rule_versions, unused_inline_outcomes,) = _get_unused_rule_versions_and_inline_outcomes(
         afd_client=afd_client,
         detector_id=model.DetectorId,
         previous_rules_by_rule_id=previous_rules_by_rule_id,
         current_rules_by_rule_id=current_rules_by_rule_id,
+        rule_index=rule_index,
     )
 
     # create new inline outcomes and rules
-    new_rule_versions_by_rule_id = _create_new_inline_outcomes_and_rules(
+    is_done = _create_new_inline_outcomes_and_rules(
         afd_client=afd_client,
         detector_id=model.DetectorId,
         previous_rules_by_rule_id=previous_rules_by_rule_id,
         current_rules_by_rule_id=current_rules_by_rule_id,
+        rule_index=rule_index,
+        written_rule_versions_by_rule_id=written_rule_versions_by_rule_id,
+        deadline=deadline,
     )
 
     # update persisting rules and rule artifacts (inline outcomes, rule versions)
-    (
-        rule_versions_to_delete,
-        inline_outcomes_to_delete,
-        persisting_rule_versions_by_rule_id,
-    ) = _update_persisting_rules(
-        afd_client=afd_client,
-        detector_id=model.DetectorId,
-        previous_rules_by_rule_id=previous_rules_by_rule_id,
-        current_rules_by_rule_id=current_rules_by_rule_id,
-    )
+    if is_done:
+        (rule_versions_to_delete, inline_outcomes_to_delete, is_done,) = _update_persisting_rules(
+            afd_client=afd_client,
+            detector_id=model.DetectorId,
+            previous_rules_by_rule_id=previous_rules_by_rule_id,
+            current_rules_by_rule_id=current_rules_by_rule_id,
+            rule_index=rule_index,
+            written_rule_versions_by_rule_id=written_rule_versions_by_rule_id,
+            deadline=deadline,
+        )
+        unused_rule_versions.update(rule_versions_to_delete)
+        unused_inline_outcomes.update(inline_outcomes_to_delete)
 
     # update model to include rule version for rules
-    LOG.debug(f"updating rule models: {model.Rules} with rule versions by rule id {new_rule_versions_by_rule_id}")
-    new_rule_versions_by_rule_id.update(persisting_rule_versions_by_rule_id)
+    LOG.debug(f"updating rule models: {model.Rules} with rule versions by rule id {written_rule_versions_by_rule_id}")
     for rule_model in model.Rules:
-        if rule_model.RuleId in new_rule_versions_by_rule_id:
-            rule_model.RuleVersion = new_rule_versions_by_rule_id.get(rule_model.RuleId)
+        if rule_model.RuleId in written_rule_versions_by_rule_id:
+            rule_model.RuleVersion = written_rule_versions_by_rule_id.get(rule_model.RuleId)
     LOG.debug(f"updated rule models: {model.Rules}")
 
-    # update unused rule versions and inline outcomes from persisting rules
-    unused_rule_versions.update(rule_versions_to_delete)
-    unused_inline_outcomes.update(inline_outcomes_to_delete)
-
     # return rules and outcomes to delete (need to delete after updating detector version)
-    return unused_rule_versions, unused_inline_outcomes
+    return unused_rule_versions, unused_inline_outcomes, is_done
 
 
 def update_detector_version_for_detector_update(
@@ -107,7 +161,11 @@ def update_detector_version_for_detector_update(
     external_models = model_helpers.get_external_model_endpoints_from_model(model)
     model_versions = model_helpers.get_model_versions_from_model(model)
 
-    if previous_model.DetectorVersionStatus != DRAFT_STATUS:
+    # a draft newer than the previous detector version was created by an interrupted attempt of this update
+    interrupted_dv_id = _get_draft_detector_version_of_interrupted_update(afd_client, model, previous_model)
+    update_in_place = previous_model.DetectorVersionStatus == DRAFT_STATUS or interrupted_dv_id is not None
+
+    if not update_in_place:
         LOG.info("previous detector version status was not DRAFT. creating a new detector version")
         api_helpers.call_create_detector_version(
             frauddetector_client=afd_client,
@@ -124,7 +182,7 @@ def update_detector_version_for_detector_update(
         api_helpers.call_update_detector_version(
             frauddetector_client=afd_client,
             detector_id=model.DetectorId,
-            detector_version_id=model.DetectorVersionId,
+            detector_version_id=interrupted_dv_id or model.DetectorVersionId,
             rules=desired_rules,
             rule_execution_mode=model.RuleExecutionMode,
             model_versions=model_versions,
@@ -137,7 +195,7 @@ def update_detector_version_for_detector_update(
     dv_ids = [summary.get("detectorVersionId", "-1") for summary in dv_summaries]
     max_dv_id = str(max([int(dv_id) for dv_id in dv_ids]))
     model.DetectorVersionId = max_dv_id
-    if previous_model.DetectorVersionStatus == DRAFT_STATUS:
+    if update_in_place:
         LOG.info("previous detector version status was DRAFT. updating tags separately")
         # update dv does not update tags, so update tags in this case
         get_dv_response = api_helpers.call_get_detector_version(
@@ -176,19 +234,55 @@ def update_detector_version_for_detector_update(
     return dvs_to_delete
 
 
+def _get_draft_detector_version_of_interrupted_update(
+    afd_client, model: models.ResourceModel, previous_model: models.ResourceModel
+) -> Optional[str]:
+    # only a non-draft previous detector version makes the update create a new one
+    if previous_model.DetectorVersionStatus == DRAFT_STATUS or not previous_model.DetectorVersionId:
+        return None
+    describe_detector_response = api_helpers.call_describe_detector(afd_client, model.DetectorId)
+    newer_draft_dv_ids = [
+        int(summary.get("detectorVersionId", "-1"))
+        for summary in describe_detector_response.get("detectorVersionSummaries", [])
+        if summary.get("status", None) == DRAFT_STATUS
+        and int(summary.get("detectorVersionId", "-1")) > int(previous_model.DetectorVersionId)
+    ]
+    if not newer_draft_dv_ids:
+        return None
+    LOG.info(f"reusing detector version {max(newer_draft_dv_ids)} created by an interrupted update")
+    return str(max(newer_draft_dv_ids))
+
+
 def delete_unused_detector_versions_for_detector_update(afd_client, unused_detector_versions: Set[Tuple[str, str]]):
     for detector_id, detector_version_id in unused_detector_versions:
-        api_helpers.call_delete_detector_version(
-            frauddetector_client=afd_client,
-            detector_id=detector_id,
-            detector_version_id=detector_version_id,
-        )
+        try:
+            api_helpers.call_delete_detector_version(
+                frauddetector_client=afd_client,
+                detector_id=detector_id,
+                detector_version_id=detector_version_id,
+            )
+        except afd_client.exceptions.ResourceNotFoundException:
+            # already deleted by an interrupted attempt of this update
+            LOG.info(f"detector version {detector_id}:{detector_version_id} is already deleted")
 
 
-def delete_unused_rules_for_detector_update(afd_client, detector_id: str, unused_rule_versions: Set[Tuple[str, str]]):
-    # For now, just catch conditional check failed exception, which means the rule is still used.
-    # We will follow up with a more optimal approach (and avoid the try/catch)
-    for unused_rule_id, unused_rule_version in unused_rule_versions:
+def delete_unused_rules_for_detector_update(
+    afd_client,
+    detector_id: str,
+    unused_rule_versions: Set[Tuple[str, str]],
+    usage_graph: Optional[index_helpers.DetectorUsageGraph] = None,
+):
+    # only delete rule versions no detector version references anymore, rather than catching conflicts for the rest
+    if usage_graph is None:
+        usage_graph = index_helpers.build_detector_usage_graph(afd_client, detector_id)
+    unreferenced_rule_versions = usage_graph.get_unreferenced_rule_versions(unused_rule_versions)
+    for rule_id, rule_version in unused_rule_versions - unreferenced_rule_versions:
+        LOG.info(
+            f"keeping rule {rule_id}:{rule_version}, it is used by detector versions "
+            f"{usage_graph.get_detector_version_ids_referencing(rule_id, rule_version)}"
+        )
+
+    for unused_rule_id, unused_rule_version in unreferenced_rule_versions:
         try:
             api_helpers.call_delete_rule(
                 frauddetector_client=afd_client,
@@ -196,18 +290,42 @@ def delete_unused_rules_for_detector_update(afd_client, detector_id: str, unused
                 rule_id=unused_rule_id,
                 rule_version=unused_rule_version,
             )
+            usage_graph.remove_rule_version(unused_rule_id, unused_rule_version)
+        except afd_client.exceptions.ResourceNotFoundException:
+            # already deleted by an interrupted attempt of this update
+            LOG.info(f"rule {unused_rule_id}:{unused_rule_version} is already deleted")
+            usage_graph.remove_rule_version(unused_rule_id, unused_rule_version)
         except afd_client.exceptions.ConflictException as conflictException:
+            # the graph is a snapshot, so a concurrent update can still add a reference
             LOG.warning(
                 f"Conflict exception when deleting rule! Continuing without failure. "
-                f"This is likely from a rule being present in an active detector version. "
-                f"This can happen when transitioning from ACTIVE -> DRAFT, and keeping the ACTIVE version. "
+                f"The rule version gained a reference after the usage graph was built. "
                 f"Exception: {conflictException}"
             )
 
 
-def delete_unused_inline_outcomes_for_detector_update(afd_client, unused_inline_outcome_names: Set[str]):
-    for unused_outcome_name in unused_inline_outcome_names:
-        api_helpers.call_delete_outcome(frauddetector_client=afd_client, outcome_name=unused_outcome_name)
+def delete_unused_inline_outcomes_for_detector_update(
+    afd_client,
+    detector_id: str,
+    unused_inline_outcome_names: Set[str],
+    usage_graph: Optional[index_helpers.DetectorUsageGraph] = None,
+):
+    # only delete outcomes no remaining rule version of the detector uses
+    if usage_graph is None:
+        usage_graph = index_helpers.build_detector_usage_graph(afd_client, detector_id)
+    unreferenced_outcome_names = usage_graph.get_unreferenced_outcomes(unused_inline_outcome_names)
+    for outcome_name in set(unused_inline_outcome_names) - unreferenced_outcome_names:
+        LOG.info(
+            f"keeping outcome {outcome_name}, it is used by rule versions "
+            f"{usage_graph.get_rule_versions_referencing(outcome_name)}"
+        )
+
+    for unused_outcome_name in unreferenced_outcome_names:
+        try:
+            api_helpers.call_delete_outcome(frauddetector_client=afd_client, outcome_name=unused_outcome_name)
+        except afd_client.exceptions.ResourceNotFoundException:
+            # already deleted by an interrupted attempt of this update
+            LOG.info(f"outcome {unused_outcome_name} is already deleted")
 
 
 def validate_dependencies_for_inline_event_type_update(
@@ -264,6 +382,7 @@ def _get_unused_rule_versions_and_inline_outcomes(
     detector_id: str,
     previous_rules_by_rule_id: dict,
     current_rules_by_rule_id: dict,
+    rule_index: index_helpers.RuleIndex,
 ) -> (Set[str], Set[str]):
     unused_rule_versions = set()
     unused_inline_outcomes = set()
@@ -280,12 +399,7 @@ def _get_unused_rule_versions_and_inline_outcomes(
         unused_inline_outcomes.update(outcomes_to_delete)
 
         # rule versions to delete
-        get_rules_response = api_helpers.call_get_rules(
-            frauddetector_client=afd_client,
-            detector_id=detector_id,
-            rule_id=unused_rule_id,
-        )
-        rule_details = get_rules_response.get("ruleDetails", [])
+        rule_details = rule_index.get_rule_versions(unused_rule_id)
         rule_versions_to_delete = {(rd.get("ruleId", None), rd.get("ruleVersion", None)) for rd in rule_details}
         unused_rule_versions.update(rule_versions_to_delete)
     return unused_rule_versions, unused_inline_outcomes
@@ -296,35 +410,45 @@ def _create_new_inline_outcomes_and_rules(
     detector_id: str,
     previous_rules_by_rule_id: dict,
     current_rules_by_rule_id: dict,
-):
-    # build list of new rules (and new inline outcomes) to create
-    outcomes_to_create = {}
-    rules_to_create = {}
-    new_rule_ids = [rule_id for rule_id in current_rules_by_rule_id.keys() if rule_id not in previous_rules_by_rule_id]
-    for new_rule_id in new_rule_ids:
-        new_rule_model: models.Rule = current_rules_by_rule_id[new_rule_id]
-        outcomes_to_create.update({outcome.Name: outcome for outcome in new_rule_model.Outcomes if outcome.Inline})
-        rules_to_create.update({new_rule_model.RuleId: new_rule_model})
-
-    # create new inline outcomes and new rules
-    _create_new_inline_outcomes(afd_client, outcomes_to_create)
-    return _create_new_rules(afd_client, detector_id, rules_to_create)
-
-
-def _create_new_inline_outcomes(afd_client, outcomes_to_create: dict):
-    for outcome_name, outcome_model in outcomes_to_create.items():
-        tags = model_helpers.get_tags_from_tag_models(outcome_model.Tags)
-        api_helpers.call_put_outcome(
-            frauddetector_client=afd_client,
-            outcome_name=outcome_name,
-            outcome_tags=tags,
-            outcome_description=outcome_model.Description,
-        )
+    rule_index: index_helpers.RuleIndex,
+    written_rule_versions_by_rule_id: Dict[str, str],
+    deadline: float = None,
+) -> bool:
+    # build list of new rules not created yet (and their unique new inline outcomes) to create
+    rules_to_create = {
+        rule_id: rule_model
+        for rule_id, rule_model in current_rules_by_rule_id.items()
+        if rule_id not in previous_rules_by_rule_id and rule_id not in written_rule_versions_by_rule_id
+    }
+    outcomes_to_create = model_helpers.get_inline_outcome_models_by_name(rules_to_create.values())
+
+    # create new inline outcomes (once each, concurrently) and new rules
+    model_helpers.put_inline_outcomes_for_outcome_models(afd_client, outcomes_to_create.values())
+    return _create_new_rules(
+        afd_client, detector_id, rules_to_create, rule_index, written_rule_versions_by_rule_id, deadline
+    )
 
 
-def _create_new_rules(afd_client, detector_id: str, rules_to_create: dict) -> dict:
-    new_rule_versions_by_rule_id = {}
-    for rule_id, rule_model in rules_to_create.items():
+def _create_new_rules(
+    afd_client,
+    detector_id: str,
+    rules_to_create: dict,
+    rule_index: index_helpers.RuleIndex,
+    written_rule_versions_by_rule_id: Dict[str, str],
+    deadline: float = None,
+) -> bool:
+    for rule_count, (rule_id, rule_model) in enumerate(rules_to_create.items()):
+        if rule_count > 0 and _is_past_deadline(deadline):
+            LOG.info(f"out of time after creating {rule_count} of {len(rules_to_create)} rules")
+            return False
+        # an interrupted attempt of this update may have created the rule already, reuse it instead of failing
+        existing_rule_detail = rule_index.get(rule_id, rule_index.get_max_rule_version(rule_id))
+        if existing_rule_detail is not None and model_helpers.rule_detail_matches_rule_model(
+            existing_rule_detail, rule_model
+        ):
+            LOG.info(f"rule {rule_id} already exists, reusing rule version {existing_rule_detail.get('ruleVersion')}")
+            written_rule_versions_by_rule_id[rule_id] = existing_rule_detail.get("ruleVersion", None)
+            continue
         tags = model_helpers.get_tags_from_tag_models(rule_model.Tags)
         rule_outcomes = [outcome.Name for outcome in rule_model.Outcomes]
         create_rule_response = api_helpers.call_create_rule(
@@ -337,8 +461,10 @@ def _create_new_rules(afd_client, detector_id: str, rules_to_create: dict) -> di
             rule_description=rule_model.Description,
             rule_tags=tags,
         )
-        new_rule_versions_by_rule_id[rule_id] = create_rule_response.get("rule", {}).get("ruleVersion", None)
-    return new_rule_versions_by_rule_id
+        created_rule = create_rule_response.get("rule", {})
+        rule_index.add(created_rule)
+        written_rule_versions_by_rule_id[rule_id] = created_rule.get("ruleVersion", None)
+    return True
 
 
 def _update_persisting_rules(
@@ -346,28 +472,50 @@ def _update_persisting_rules(
     detector_id: str,
     previous_rules_by_rule_id: dict,
     current_rules_by_rule_id: dict,
-) -> (Set[Tuple[str, str]], Set[str], dict):
+    rule_index: index_helpers.RuleIndex,
+    written_rule_versions_by_rule_id: Dict[str, str],
+    deadline: float = None,
+) -> (Set[Tuple[str, str]], Set[str], bool):
     unused_rule_versions = set()
     unused_inline_outcomes = set()
-    persisting_rule_versions_by_rule_id = dict()
-    persisting_rule_ids = previous_rules_by_rule_id.keys() & current_rules_by_rule_id.keys()
-    for persisting_rule_id in persisting_rule_ids:
+    persisting_rule_ids = [
+        rule_id
+        for rule_id in current_rules_by_rule_id
+        if rule_id in previous_rules_by_rule_id and rule_id not in written_rule_versions_by_rule_id
+    ]
+
+    # resolve the inline outcomes to update of all persisting rules with a single outcome index
+    inline_outcome_names = {
+        outcome_name
+        for rule_id in persisting_rule_ids
+        for outcome_name in _get_inline_outcomes_to_update(
+            previous_rules_by_rule_id[rule_id], current_rules_by_rule_id[rule_id]
+        )
+    }
+    outcome_index = index_helpers.build_outcome_index(afd_client, inline_outcome_names)
+
+    for rule_count, persisting_rule_id in enumerate(persisting_rule_ids):
+        if rule_count > 0 and _is_past_deadline(deadline):
+            LOG.info(f"out of time after updating {rule_count} of {len(persisting_rule_ids)} rules")
+            return unused_rule_versions, unused_inline_outcomes, False
         current_rule_model: models.Rule = current_rules_by_rule_id[persisting_rule_id]
         previous_rule_model: models.Rule = previous_rules_by_rule_id[persisting_rule_id]
         (
             rule_versions_to_delete,
             inline_outcomes_to_delete,
             persisting_rule_version_by_rule_id,
-        ) = _update_persisting_rule(afd_client, detector_id, current_rule_model, previous_rule_model)
+        ) = _update_persisting_rule(
+            afd_client, detector_id, current_rule_model, previous_rule_model, rule_index, outcome_index
+        )
         unused_rule_versions.update(rule_versions_to_delete)
         unused_inline_outcomes.update(inline_outcomes_to_delete)
-        persisting_rule_versions_by_rule_id.update(persisting_rule_version_by_rule_id)
+        written_rule_versions_by_rule_id.update(persisting_rule_version_by_rule_id)
+
+    return unused_rule_versions, unused_inline_outcomes, True
 
-    return (
-        unused_rule_versions,
-        unused_inline_outcomes,
-        persisting_rule_versions_by_rule_id,
-    )
+
+def _is_past_deadline(deadline: float = None) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
 
 
 def _update_persisting_rule(
@@ -375,6 +523,8 @@ def _update_persisting_rule(
     detector_id: str,
     current_rule_model: models.Rule,
     previous_rule_model: models.Rule,
+    rule_index: index_helpers.RuleIndex,
+    outcome_index: Dict[str, dict] = None,
 ) -> (Set[Tuple[str, str]], Set[str], dict):
     # check new outcomes vs old outcomes
     previous_outcomes_by_name = {outcome.Name: outcome for outcome in previous_rule_model.Outcomes}
@@ -384,18 +534,17 @@ def _update_persisting_rule(
         for outcome_name, outcome in previous_outcomes_by_name.items()
         if outcome_name not in current_outcomes_by_name and outcome.Inline
     }
-    outcomes_to_update = {
-        outcome_name: outcome
-        for outcome_name, outcome in current_outcomes_by_name.items()
-        if outcome_name not in unused_inline_outcome_names and outcome.Inline
-    }
+    outcomes_to_update = _get_inline_outcomes_to_update(previous_rule_model, current_rule_model)
 
     # new outcome model will not have Arn, as Arn is readonly for inline outcomes
-    existing_outcome_models = model_helpers.get_outcomes_model_for_given_outcome_names(
-        frauddetector_client=afd_client,
-        outcome_names=outcomes_to_update.keys(),
-        reference_outcome_names=set(),
-    )
+    existing_outcome_models = []
+    if outcomes_to_update:
+        existing_outcome_models = model_helpers.get_outcomes_model_for_given_outcome_names(
+            frauddetector_client=afd_client,
+            outcome_names=outcomes_to_update.keys(),
+            reference_outcome_names=set(),
+            outcome_index=outcome_index,
+        )
 
     for existing_outcome in existing_outcome_models:
         desired_outcome_model = outcomes_to_update[existing_outcome.Name]
@@ -405,44 +554,54 @@ def _update_persisting_rule(
             outcome_name=desired_outcome_model.Name,
             outcome_description=desired_outcome_model.Description,
         )
-        # use arn from existing outcome model to update tags
+        # use arn and the just-read tags (removed from the model when empty) from existing outcome model to update tags
+        attached_tags = model_helpers.get_tags_from_tag_models(getattr(existing_outcome, "Tags", None)) or []
         common_helpers.update_tags(
             frauddetector_client=afd_client,
             afd_resource_arn=existing_outcome.Arn,
             new_tags=new_tags,
+            attached_tags=attached_tags,
         )
 
-    # rather than check all the differences, we can just update rule version and call it a day
-    #   first, we need to get rules and grab latest version, since it's not anywhere
-    get_rules_response = api_helpers.call_get_rules(
-        frauddetector_client=afd_client,
-        detector_id=detector_id,
-        rule_id=current_rule_model.RuleId,
-    )
-    rule_details = get_rules_response.get("ruleDetails", [])
-    rule_versions = [int(rd.get("ruleVersion", "-1")) for rd in rule_details]
-    max_rule_version_string = str(max(rule_versions))
-
-    update_rule_version_response = api_helpers.call_update_rule_version(
-        frauddetector_client=afd_client,
-        detector_id=detector_id,
-        rule_id=current_rule_model.RuleId,
-        rule_version=max_rule_version_string,
-        rule_expression=current_rule_model.Expression,
-        rule_language=current_rule_model.Language,
-        rule_outcomes=list(current_outcomes_by_name.keys()),
-        rule_description=current_rule_model.Description,
-        rule_tags=model_helpers.get_tags_from_tag_models(current_rule_model.Tags),
-    )
+    # unchanged rules keep their current rule version, as every update_rule_version call mints a new version
+    if model_helpers.rule_models_are_equivalent(previous_rule_model, current_rule_model):
+        current_rule_version = previous_rule_model.RuleVersion or rule_index.get_max_rule_version(
+            current_rule_model.RuleId
+        )
+        if rule_index.get(current_rule_model.RuleId, current_rule_version) is not None:
+            LOG.debug(f"rule {current_rule_model.RuleId} is unchanged, keeping rule version {current_rule_version}")
+            return set(), unused_inline_outcome_names, {current_rule_model.RuleId: current_rule_version}
+
+    # otherwise, update rule version with the latest version from the rule index, since it's not anywhere
+    max_rule_version_string = rule_index.get_max_rule_version(current_rule_model.RuleId)
+    if max_rule_version_string is None:
+        raise exceptions.NotFound("ruleId", current_rule_model.RuleId)
+
+    # an interrupted attempt of this update may have written the new rule version already, reuse it
+    max_rule_detail = rule_index.get(current_rule_model.RuleId, max_rule_version_string)
+    if max_rule_version_string != previous_rule_model.RuleVersion and model_helpers.rule_detail_matches_rule_model(
+        max_rule_detail, current_rule_model
+    ):
+        LOG.info(f"rule {current_rule_model.RuleId} already updated, reusing rule version {max_rule_version_string}")
+        update_rule_version_response = {"rule": max_rule_detail}
+    else:
+        update_rule_version_response = api_helpers.call_update_rule_version(
+            frauddetector_client=afd_client,
+            detector_id=detector_id,
+            rule_id=current_rule_model.RuleId,
+            rule_version=max_rule_version_string,
+            rule_expression=current_rule_model.Expression,
+            rule_language=current_rule_model.Language,
+            rule_outcomes=list(current_outcomes_by_name.keys()),
+            rule_description=current_rule_model.Description,
+            rule_tags=model_helpers.get_tags_from_tag_models(current_rule_model.Tags),
+        )
 
     # gather old rule versions to delete
-    rule_version_to_keep = update_rule_version_response.get("rule", {}).get("ruleVersion", None)
-    get_rules_response = api_helpers.call_get_rules(
-        frauddetector_client=afd_client,
-        detector_id=detector_id,
-        rule_id=current_rule_model.RuleId,
-    )
-    rule_details = get_rules_response.get("ruleDetails", [])
+    updated_rule = update_rule_version_response.get("rule", {})
+    rule_index.add(updated_rule)
+    rule_version_to_keep = updated_rule.get("ruleVersion", None)
+    rule_details = rule_index.get_rule_versions(current_rule_model.RuleId)
     rule_versions_to_delete = {
         (rd.get("ruleId", None), rd.get("ruleVersion", None))
         for rd in rule_details
@@ -456,6 +615,27 @@ def _update_persisting_rule(
     )
 
 
+def _get_associated_model_arns(model: models.ResourceModel) -> Set[str]:
+    return {associated_model.Arn for associated_model in model.AssociatedModels or []}
+
+
+def _get_inline_outcomes_to_update(previous_rule_model: models.Rule, current_rule_model: models.Rule) -> dict:
+    # inline outcomes that are new to the rule or differ from the previous model, by name
+    previous_outcomes_by_name = {outcome.Name: outcome for outcome in previous_rule_model.Outcomes}
+    outcomes_to_update = {}
+    for outcome in current_rule_model.Outcomes:
+        if not outcome.Inline:
+            continue
+        previous_outcome = previous_outcomes_by_name.get(outcome.Name)
+        if (
+            previous_outcome is None
+            or not previous_outcome.Inline
+            or not model_helpers.outcome_models_are_equivalent(previous_outcome, outcome)
+        ):
+            outcomes_to_update[outcome.Name] = outcome
+    return outcomes_to_update
+
+
 def _validate_event_variables_for_event_type_update(
     afd_client,
     event_type_model: models.EventType,
@@ -651,3 +831,214 @@ def _validate_inline_label_for_event_type_update(afd_client, label, previous_lab
                 afd_resource_arn=label.Arn,
                 new_tags=label.Tags,
             )
+
+
+# Checkpointed Update
+
+
+class DetectorUpdateCheckpoint:
+    """
+    Progress of a detector update across handler invocations, persisted in the callback context.
+    Completed steps are never run again on resume; the state they produced is restored onto the model instead.
+    """
+
+    def __init__(self, callback_context: Optional[dict] = None):
+        callback_context = callback_context or {}
+        self.completed_steps = list(callback_context.get("completedSteps", []))
+        self.is_metadata_only = callback_context.get("isMetadataOnly", None)
+        self.detector_version_id = callback_context.get("detectorVersionId", None)
+        self.rule_versions_by_rule_id = dict(callback_context.get("ruleVersionsByRuleId", {}))
+        # rule versions written so far by a rules step that ran out of time, so they are not written again
+        self.written_rule_versions_by_rule_id = dict(callback_context.get("writtenRuleVersionsByRuleId", {}))
+        self.rule_versions_to_delete = {tuple(rv) for rv in callback_context.get("ruleVersionsToDelete", [])}
+        self.outcomes_to_delete = set(callback_context.get("outcomesToDelete", []))
+        self.detector_versions_to_delete = {tuple(dv) for dv in callback_context.get("detectorVersionsToDelete", [])}
+        # not persisted: `time.monotonic()` deadline of the current invocation, set by `run_detector_update_steps`
+        self.deadline = None
+        # not persisted: usage graph of the detector, shared by the delete steps of the current invocation
+        self.usage_graph = None
+
+    def to_callback_context(self) -> dict:
+        # callback context is serialized to JSON, so sets and tuples are stored as sorted lists
+        return {
+            "completedSteps": self.completed_steps,
+            "isMetadataOnly": self.is_metadata_only,
+            "detectorVersionId": self.detector_version_id,
+            "ruleVersionsByRuleId": self.rule_versions_by_rule_id,
+            "writtenRuleVersionsByRuleId": self.written_rule_versions_by_rule_id,
+            "ruleVersionsToDelete": sorted(list(rv) for rv in self.rule_versions_to_delete),
+            "outcomesToDelete": sorted(self.outcomes_to_delete),
+            "detectorVersionsToDelete": sorted(list(dv) for dv in self.detector_versions_to_delete),
+        }
+
+    def get_usage_graph(self, afd_client, detector_id: str) -> index_helpers.DetectorUsageGraph:
+        # built on first use, after the old detector versions are deleted, so it does not reference them anymore
+        if self.usage_graph is None:
+            self.usage_graph = index_helpers.build_detector_usage_graph(afd_client, detector_id)
+        return self.usage_graph
+
+    def record_versions(self, model: models.ResourceModel):
+        self.detector_version_id = model.DetectorVersionId
+        self.rule_versions_by_rule_id = {rule.RuleId: rule.RuleVersion for rule in model.Rules or []}
+
+    def restore_versions(self, model: models.ResourceModel):
+        if self.detector_version_id is not None:
+            model.DetectorVersionId = self.detector_version_id
+        for rule_model in model.Rules or []:
+            if rule_model.RuleId in self.rule_versions_by_rule_id:
+                rule_model.RuleVersion = self.rule_versions_by_rule_id[rule_model.RuleId]
+
+
+def _validate_detector_update_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    # For contract_update_create_only_property, we need to fail if trying to set DetectorId to something different
+    if model.DetectorId != previous_model.DetectorId:
+        raise exceptions.NotUpdatable(f"Error occurred: cannot update create-only property 'DetectorId'")
+
+    # For contract_update_non_existent_resource, we need to fail if the resource DNE
+    get_detectors_works, _ = validation_helpers.check_if_get_detectors_succeeds(afd_client, model.DetectorId)
+    if not get_detectors_works:
+        raise exceptions.NotFound("detector", model.DetectorId)
+
+    validate_dependencies_for_detector_update(afd_client, model, previous_model)
+    if model.EventType.Inline:
+        validate_dependencies_for_inline_event_type_update(
+            afd_client=afd_client,
+            event_type_model=model.EventType,
+            previous_event_type_model=previous_model.EventType,
+        )
+
+
+def _update_inline_event_type_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    if model.EventType.Inline:
+        update_inline_event_type(
+            afd_client=afd_client,
+            event_type_model=model.EventType,
+            previous_event_type_model=previous_model.EventType,
+        )
+
+
+def _update_rules_and_inline_outcomes_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    if checkpoint.is_metadata_only:
+        LOG.info(f"Rules, rule execution mode, associated models and status are unchanged, keeping detector version")
+        keep_detector_version_for_detector_update(model, previous_model)
+    else:
+        # rules are checkpointed one by one, the deletions they leave accumulate across invocations
+        (rule_versions_to_delete, outcomes_to_delete, is_done,) = update_rules_and_inline_outcomes_for_detector_update(
+            afd_client=afd_client,
+            model=model,
+            previous_model=previous_model,
+            written_rule_versions_by_rule_id=checkpoint.written_rule_versions_by_rule_id,
+            deadline=checkpoint.deadline,
+        )
+        checkpoint.rule_versions_to_delete.update(rule_versions_to_delete)
+        checkpoint.outcomes_to_delete.update(outcomes_to_delete)
+        if not is_done:
+            return False
+    checkpoint.record_versions(model)
+    return True
+
+
+def _update_detector_version_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    if checkpoint.is_metadata_only:
+        return
+    checkpoint.detector_versions_to_delete = update_detector_version_for_detector_update(
+        afd_client=afd_client, model=model, previous_model=previous_model
+    )
+    checkpoint.record_versions(model)
+
+
+def _delete_unused_detector_versions_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    LOG.info(f"Deleting old detector versions: {checkpoint.detector_versions_to_delete}")
+    delete_unused_detector_versions_for_detector_update(afd_client, checkpoint.detector_versions_to_delete)
+
+
+def _delete_unused_rules_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    LOG.info(f"Deleting old rules: {checkpoint.rule_versions_to_delete}")
+    delete_unused_rules_for_detector_update(
+        afd_client,
+        model.DetectorId,
+        checkpoint.rule_versions_to_delete,
+        usage_graph=checkpoint.get_usage_graph(afd_client, model.DetectorId),
+    )
+
+
+def _delete_unused_inline_outcomes_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    LOG.info(f"Deleting no-longer-used inline outcomes: {checkpoint.outcomes_to_delete}")
+    # the rules step removed the rule versions it deleted from the shared graph
+    delete_unused_inline_outcomes_for_detector_update(
+        afd_client,
+        model.DetectorId,
+        checkpoint.outcomes_to_delete,
+        usage_graph=checkpoint.get_usage_graph(afd_client, model.DetectorId),
+    )
+
+
+def _put_detector_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    # put detector for description update
+    if model.EventType.Name:
+        event_type_name = model.EventType.Name
+    else:
+        event_type_name = util.extract_name_from_arn(model.EventType.Arn)
+    api_helpers.call_put_detector(
+        frauddetector_client=afd_client,
+        detector_id=model.DetectorId,
+        detector_event_type_name=event_type_name,
+        detector_description=model.Description,
+    )
+
+
+def _update_detector_tags_step(afd_client, model, previous_model, checkpoint: DetectorUpdateCheckpoint):
+    # since put on update does not update tags, update tags separately
+    common_helpers.update_tags(afd_client, afd_resource_arn=model.Arn, new_tags=model.Tags)
+
+
+# Ordered steps of a detector update. Step names are persisted in the callback context, so do not rename them.
+# A step that runs out of time part way through returns False, and runs again (from the checkpoint) next invocation.
+DETECTOR_UPDATE_STEPS = [
+    ("validateDependencies", _validate_detector_update_step),
+    ("updateInlineEventType", _update_inline_event_type_step),
+    ("updateRulesAndInlineOutcomes", _update_rules_and_inline_outcomes_step),
+    ("updateDetectorVersion", _update_detector_version_step),
+    ("deleteUnusedDetectorVersions", _delete_unused_detector_versions_step),
+    ("deleteUnusedRules", _delete_unused_rules_step),
+    ("deleteUnusedInlineOutcomes", _delete_unused_inline_outcomes_step),
+    ("putDetector", _put_detector_step),
+    ("updateDetectorTags", _update_detector_tags_step),
+]
+
+
+def run_detector_update_steps(
+    afd_client,
+    model: models.ResourceModel,
+    previous_model: models.ResourceModel,
+    checkpoint: DetectorUpdateCheckpoint,
+    deadline: float,
+) -> bool:
+    """
+    Run the detector update steps that the checkpoint has not completed yet, in order.
+    At least one step runs per invocation; after that, no step is started once `deadline` (a `time.monotonic()`
+    timestamp) has passed. Steps doing many writes also stop at the deadline, after writing at least once.
+    Returns True when all steps completed, False when the update needs another invocation.
+    """
+    checkpoint.deadline = deadline
+    checkpoint.restore_versions(model)
+    if checkpoint.is_metadata_only is None:
+        checkpoint.is_metadata_only = is_metadata_only_detector_update(model, previous_model)
+
+    ran_step = False
+    for step_name, step in DETECTOR_UPDATE_STEPS:
+        if step_name in checkpoint.completed_steps:
+            LOG.debug(f"skipping completed detector update step: {step_name}")
+            continue
+        if ran_step and time.monotonic() >= deadline:
+            LOG.info(
+                f"out of time before detector update step {step_name}, checkpointing: {checkpoint.completed_steps}"
+            )
+            return False
+        LOG.info(f"running detector update step: {step_name}")
+        if step(afd_client, model, previous_model, checkpoint) is False:
+            LOG.info(f"out of time during detector update step {step_name}, checkpointing")
+            return False
+        checkpoint.completed_steps.append(step_name)
+        ran_step = True
+    return True
@@ -1,14 +1,21 @@
-from typing import Optional
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TypeVar
 from cloudformation_cli_python_lib import (
     exceptions,
 )
 
+T = TypeVar("T")
+
 # This works because afd does not support '/' in any identifiers, e.g. external model endpoint name
 EXTERNAL_MODEL_ARN_SUBSTRING = "external-model/"
 
 MODEL_VERSION_ARN_SUBSTRING = "model-version/"
 MODEL_VERSION_ARN_SEGMENTS = 4
 
+# Maximum number of worker threads used to fan out independent API calls
+MAX_CONCURRENT_API_CALLS = 10
+
 
 def extract_name_from_arn(resource_arn: str) -> Optional[str]:
     if resource_arn is None:
@@ -16,6 +23,15 @@ def extract_name_from_arn(resource_arn: str) -> Optional[str]:
     return resource_arn.split("/")[-1]
 
 
+def split_array_into_chunks(arr, chunk_size):
+    """
+    Return a generator of arrays of length chunk_size from source array arr.
+    """
+    for i in range(0, len(arr), chunk_size):
+        yield arr[i : i + chunk_size]
+    return
+
+
 def is_external_model_arn(arn: str) -> bool:
     return EXTERNAL_MODEL_ARN_SUBSTRING in arn
 
@@ -33,3 +49,82 @@ def get_model_version_details_from_arn(arn):
     model_id = segmented_arn[-2]
     model_type = segmented_arn[-3]
     return model_id, model_type, model_version_number
+
+
+def run_concurrently(tasks: Iterable[Callable[[], T]], max_workers: int = MAX_CONCURRENT_API_CALLS) -> List[T]:
+    """
+    Run the given no-argument callables on a bounded thread pool.
+    Results are returned in the same order as the given tasks, regardless of completion order.
+    If any task raises, tasks that have not started yet are cancelled and the exception is re-raised unchanged.
+    :param tasks: no-argument callables to run
+    :param max_workers: maximum number of tasks to run at the same time
+    :return: list of task results, ordered like the given tasks
+    """
+    tasks = list(tasks)
+    if max_workers <= 1 or len(tasks) <= 1:
+        return [task() for task in tasks]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in futures:
+            if future in done and future.exception() is not None:
+                for pending_future in not_done:
+                    pending_future.cancel()
+                raise future.exception()
+        return [future.result() for future in futures]
+
+
+def map_concurrently(func: Callable[..., T], items: Iterable, max_workers: int = MAX_CONCURRENT_API_CALLS) -> List[T]:
+    """
+    Call func once per item on a bounded thread pool. See `run_concurrently` for ordering and error semantics.
+    :param func: single-argument callable to apply to each item
+    :param items: items to apply func to
+    :param max_workers: maximum number of calls to run at the same time
+    :return: list of results, ordered like the given items
+    """
+    return run_concurrently([partial(func, item) for item in items], max_workers)
+
+
+class TierFailedError(RuntimeError):
+    """
+    Raised by `run_tiers` when more than one task of a tier failed, carrying all of their exceptions.
+    """
+
+    def __init__(self, tier_name: str, errors: List[Exception], task_count: int):
+        self.tier_name = tier_name
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} of {task_count} tasks failed in tier '{tier_name}': " + "; ".join(str(e) for e in errors)
+        )
+
+
+def run_tiers(
+    tiers: Iterable[Tuple[str, Iterable[Callable[[], Any]]]], max_workers: int = MAX_CONCURRENT_API_CALLS
+) -> None:
+    """
+    Run tiers of no-argument callables in the given order, running the tasks within each tier concurrently.
+    A tier only starts after every task of the previous tier finished. Unlike `run_concurrently`, every task of a tier
+    runs to completion even if others fail; then a single failure is re-raised unchanged, several failures are
+    raised together as a TierFailedError, and the remaining tiers are skipped.
+    :param tiers: (tier name, no-argument callables) pairs, in dependency order
+    :param max_workers: maximum number of tasks to run at the same time
+    """
+    for tier_name, tasks in tiers:
+        tasks = list(tasks)
+        errors = [error for error in run_concurrently(map(_capture_exception, tasks), max_workers) if error is not None]
+        if len(errors) == 1:
+            raise errors[0]
+        if errors:
+            raise TierFailedError(tier_name, errors, len(tasks))
+
+
+def _capture_exception(task: Callable[[], Any]) -> Callable[[], Optional[Exception]]:
+    def run_task():
+        try:
+            task()
+            return None
+        except Exception as e:
+            return e
+
+    return run_task
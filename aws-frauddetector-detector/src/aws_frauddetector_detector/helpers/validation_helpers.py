@@ -1,3 +1,4 @@
+import functools
 import logging
 
 from cloudformation_cli_python_lib import (
@@ -19,6 +20,21 @@ def remove_none_arguments(args):
     return args
 
 
+def _existence_check(func):
+    """
+    Runs the decorated check within `api_helpers.existence_check`, as a resource not found exception is one of its
+    expected results.
+    """
+
+    @functools.wraps(func)
+    def existence_check_wrapper(*args, **kwargs):
+        with api_helpers.existence_check():
+            return func(*args, **kwargs)
+
+    return existence_check_wrapper
+
+
+@_existence_check
 def check_if_get_detectors_succeeds(frauddetector_client, detector_id):
     """
     This calls get_detectors and returns True if it worked, along with the API response (True, response)
@@ -35,6 +51,7 @@ def check_if_get_detectors_succeeds(frauddetector_client, detector_id):
         return False, None
 
 
+@_existence_check
 def check_if_get_detector_version_succeeds(frauddetector_client, detector_id, detector_version_id):
     """
     This calls get_detector_version and returns True if it worked, along with the API response (True, response)
@@ -54,6 +71,7 @@ def check_if_get_detector_version_succeeds(frauddetector_client, detector_id, de
         return False, None
 
 
+@_existence_check
 def check_if_get_variables_succeeds(frauddetector_client, variable_name):
     """
     This calls get_variables and returns True if it worked, along with the API response (True, response)
@@ -70,6 +88,7 @@ def check_if_get_variables_succeeds(frauddetector_client, variable_name):
         return False, None
 
 
+@_existence_check
 def check_if_get_entity_types_succeeds(frauddetector_client, entity_type_name):
     """
     This calls get_entity_types and returns True if it worked, along with the API response (True, response)
@@ -86,6 +105,7 @@ def check_if_get_entity_types_succeeds(frauddetector_client, entity_type_name):
         return False, None
 
 
+@_existence_check
 def check_if_get_event_types_succeeds(frauddetector_client, event_type_to_check: str):
     """
     This calls get_event_types and returns True if the response contains an event type: (True, event_type)
@@ -102,6 +122,7 @@ def check_if_get_event_types_succeeds(frauddetector_client, event_type_to_check:
         return False, None
 
 
+@_existence_check
 def check_if_get_labels_succeeds(frauddetector_client, label_name):
     """
     This calls get_labels and returns True if it worked, along with the API response (True, response)
@@ -118,6 +139,7 @@ def check_if_get_labels_succeeds(frauddetector_client, label_name):
         return False, None
 
 
+@_existence_check
 def check_if_get_outcomes_succeeds(frauddetector_client, outcome_name):
     """
     This calls get_outcomes and returns True if it worked, along with the API response (True, response)
@@ -134,6 +156,7 @@ def check_if_get_outcomes_succeeds(frauddetector_client, outcome_name):
         return False, None
 
 
+@_existence_check
 def check_if_get_model_version_succeeds(frauddetector_client, model_id, model_type, model_version_number):
     """
     This calls get_model_version and returns True if it worked, along with the API response (True, response)
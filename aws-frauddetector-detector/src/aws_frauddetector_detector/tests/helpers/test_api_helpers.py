@@ -3,6 +3,8 @@ from .. import unit_test_utils
 from unittest.mock import MagicMock
 from botocore.exceptions import ClientError
 
+import botocore.session
+
 NUMBER_OF_ITEMS_PER_PAGE = 2
 MAX_PAGES = 10
 
@@ -67,6 +69,102 @@ def test_retry_not_found_exceptions_decorator_multi_page():
     assert mock_afd_client.get_labels.call_count == MAX_PAGES + 1
 
 
+def test_consistency_waiter_gives_up_after_max_attempts():
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.exceptions.ResourceNotFoundException = ClientError
+    mock_afd_client.get_labels = MagicMock(side_effect=ClientError({"Code": "", "Message": ""}, "get_labels"))
+    consistency_waiter = api_helpers.ConsistencyWaiter(base_delay=0, max_attempts=3)
+
+    try:
+        consistency_waiter.call(ClientError, mock_afd_client.get_labels)
+        raise AssertionError("expected ClientError")
+    except ClientError:
+        pass
+
+    assert mock_afd_client.get_labels.call_count == 3
+    assert consistency_waiter.wait_count == 1
+    assert consistency_waiter.give_up_count == 1
+
+
+def test_consistency_waiter_does_not_sleep_past_wait_budget(monkeypatch):
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_labels = MagicMock(side_effect=ClientError({"Code": "", "Message": ""}, "get_labels"))
+    mock_sleep = MagicMock()
+    monkeypatch.setattr(api_helpers.time, "sleep", mock_sleep)
+    consistency_waiter = api_helpers.ConsistencyWaiter(wait_budget=1)
+    consistency_waiter.get_delay = MagicMock(return_value=0.6)
+
+    try:
+        consistency_waiter.call(ClientError, mock_afd_client.get_labels)
+        raise AssertionError("expected ClientError")
+    except ClientError:
+        pass
+
+    # the first retry fits in the budget, the second one does not
+    assert mock_afd_client.get_labels.call_count == 2
+    assert mock_sleep.call_count == 1
+    assert consistency_waiter.give_up_count == 1
+
+
+def test_consistency_waiter_always_allows_first_retry(monkeypatch):
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_labels = MagicMock(
+        side_effect=[ClientError({"Code": "", "Message": ""}, "get_labels"), {"labels": []}]
+    )
+    monkeypatch.setattr(api_helpers.time, "sleep", MagicMock())
+    consistency_waiter = api_helpers.ConsistencyWaiter(wait_budget=0)
+
+    response = consistency_waiter.call(ClientError, mock_afd_client.get_labels)
+
+    assert response == {"labels": []}
+    assert consistency_waiter.give_up_count == 0
+
+
+def test_existence_check_limits_retries_of_not_found_exceptions(monkeypatch):
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.exceptions.ResourceNotFoundException = ClientError
+    mock_afd_client.get_labels = MagicMock(side_effect=ClientError({"Code": "", "Message": ""}, "get_labels"))
+    monkeypatch.setattr(api_helpers.time, "sleep", MagicMock())
+
+    @api_helpers.retry_not_found_exceptions
+    def call_get_labels(frauddetector_client):
+        return frauddetector_client.get_labels()
+
+    with api_helpers.existence_check():
+        try:
+            call_get_labels(mock_afd_client)
+            raise AssertionError("expected ClientError")
+        except ClientError:
+            pass
+
+    assert mock_afd_client.get_labels.call_count == api_helpers.EXISTENCE_CHECK_MAX_ATTEMPTS
+
+
+def test_request_scoped_consistency_waiter_records_waits():
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.exceptions.ResourceNotFoundException = ClientError
+    mock_afd_client.get_labels = MagicMock(
+        side_effect=[ClientError({"Code": "", "Message": ""}, "get_labels"), {"labels": []}, {"labels": []}]
+    )
+
+    @api_helpers.retry_not_found_exceptions
+    def call_get_labels(frauddetector_client):
+        return frauddetector_client.get_labels()
+
+    @api_helpers.request_scoped_consistency_waiter
+    def handler_work():
+        call_get_labels(mock_afd_client)
+        call_get_labels(mock_afd_client)
+        return api_helpers._consistency_waiter
+
+    consistency_waiter = handler_work()
+
+    assert mock_afd_client.get_labels.call_count == 3
+    assert consistency_waiter.wait_count == 1
+    assert consistency_waiter.give_up_count == 0
+    assert api_helpers._consistency_waiter is None
+
+
 def test_paginated_api_call_not_infinite_loop():
     test_fn = MagicMock()
     test_fn.side_effect = [
@@ -113,6 +211,222 @@ def test_paginated_api_call_matches_criteria():
     assert test_fn.call_count == MAX_PAGES
 
 
+def test_paginated_api_call_requests_max_results_and_keeps_next_token_when_pages_remain():
+    test_fn = MagicMock()
+    test_fn.side_effect = [
+        {
+            "nextToken": f"token{i}",
+            "someThings": [{"someAttribute": f"{i}.{j}"} for j in range(NUMBER_OF_ITEMS_PER_PAGE)],
+        }
+        for i in range(MAX_PAGES * 2)
+    ]
+
+    @api_helpers.paginated_api_call("someThings", max_pages=MAX_PAGES, max_results=NUMBER_OF_ITEMS_PER_PAGE)
+    def call_test_fn(nextToken=None, maxResults=None):
+        return test_fn(nextToken=nextToken, maxResults=maxResults)
+
+    response = call_test_fn()
+
+    assert len(response["someThings"]) == NUMBER_OF_ITEMS_PER_PAGE * MAX_PAGES
+    assert response["nextToken"] == f"token{MAX_PAGES - 1}"
+    assert test_fn.call_args_list[0][1] == {"nextToken": None, "maxResults": NUMBER_OF_ITEMS_PER_PAGE}
+    assert test_fn.call_args_list[1][1] == {"nextToken": "token0", "maxResults": NUMBER_OF_ITEMS_PER_PAGE}
+
+    # the continuation token picks up where the budget ran out
+    continued_response = call_test_fn(nextToken=response["nextToken"])
+    assert test_fn.call_args_list[MAX_PAGES][1]["nextToken"] == f"token{MAX_PAGES - 1}"
+    assert continued_response["someThings"][0]["someAttribute"] == f"{MAX_PAGES}.0"
+
+
+def test_paginated_api_call_iterate_stops_early():
+    test_fn = MagicMock()
+    test_fn.side_effect = [
+        {
+            "nextToken": "notNone",
+            "someThings": [{"someAttribute": f"{i}.{j}"} for j in range(NUMBER_OF_ITEMS_PER_PAGE)],
+        }
+        for i in range(MAX_PAGES)
+    ]
+
+    @api_helpers.paginated_api_call("someThings", max_pages=MAX_PAGES)
+    def call_test_fn(nextToken=None):
+        return test_fn(nextToken)
+
+    found = next(item for item in call_test_fn.iterate() if item["someAttribute"] == "1.0")
+
+    assert found == {"someAttribute": "1.0"}
+    assert test_fn.call_count == 2
+
+
+def test_paginated_api_call_iterate_raises_when_pages_remain():
+    test_fn = MagicMock()
+    test_fn.side_effect = [
+        {
+            "nextToken": f"token{i}",
+            "someThings": [{"someAttribute": f"{i}.{j}"} for j in range(NUMBER_OF_ITEMS_PER_PAGE)],
+        }
+        for i in range(MAX_PAGES + 10)
+    ]
+
+    @api_helpers.paginated_api_call("someThings", max_pages=MAX_PAGES)
+    def call_test_fn(nextToken=None):
+        return test_fn(nextToken)
+
+    collected_items = []
+    try:
+        for item in call_test_fn.iterate():
+            collected_items.append(item)
+        raise AssertionError("expected PaginationBudgetExceeded")
+    except api_helpers.PaginationBudgetExceeded as e:
+        assert e.next_token == f"token{MAX_PAGES - 1}"
+
+    assert len(collected_items) == NUMBER_OF_ITEMS_PER_PAGE * MAX_PAGES
+    assert test_fn.call_count == MAX_PAGES
+
+
+def test_paginated_api_call_drops_items_with_duplicate_unique_key():
+    test_fn = MagicMock()
+    test_fn.side_effect = [
+        {"nextToken": "notNone", "someThings": [{"name": "a"}, {"name": "b"}]},
+        {"someThings": [{"name": "b"}, {"name": "c"}]},
+    ]
+
+    @api_helpers.paginated_api_call("someThings", unique_key=lambda item: item["name"])
+    def call_test_fn(nextToken=None):
+        return test_fn(nextToken)
+
+    response = call_test_fn()
+
+    assert [item["name"] for item in response["someThings"]] == ["a", "b", "c"]
+
+
+def test_cached_api_call_outside_of_request_scope():
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_outcomes = MagicMock(return_value={"outcomes": [unit_test_utils.FAKE_OUTCOME]})
+
+    api_helpers.call_get_outcomes(mock_afd_client, unit_test_utils.FAKE_NAME)
+    api_helpers.call_get_outcomes(mock_afd_client, unit_test_utils.FAKE_NAME)
+
+    assert mock_afd_client.get_outcomes.call_count == 2
+
+
+def test_cached_api_call_within_request_scope():
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_outcomes = MagicMock(return_value={"outcomes": [unit_test_utils.FAKE_OUTCOME]})
+
+    @api_helpers.request_scoped_api_call_cache
+    def handler_work():
+        first_response = api_helpers.call_get_outcomes(mock_afd_client, unit_test_utils.FAKE_NAME)
+        first_response["outcomes"].clear()
+        second_response = api_helpers.call_get_outcomes(
+            frauddetector_client=mock_afd_client, outcome_name=unit_test_utils.FAKE_NAME
+        )
+        api_helpers.call_get_outcomes(mock_afd_client, "different_outcome")
+        return second_response
+
+    response = handler_work()
+
+    # second call is a cache hit, and is not affected by the caller modifying the first response
+    assert mock_afd_client.get_outcomes.call_count == 2
+    assert response["outcomes"] == [unit_test_utils.FAKE_OUTCOME]
+    assert api_helpers._api_call_cache is None
+
+
+def test_cached_api_call_invalidated_by_write():
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_outcomes = MagicMock(return_value={"outcomes": [unit_test_utils.FAKE_OUTCOME]})
+    mock_afd_client.list_tags_for_resource = MagicMock(return_value={"tags": unit_test_utils.FAKE_TAGS})
+    mock_afd_client.put_outcome = MagicMock()
+    mock_afd_client.get_rules = MagicMock(return_value={"ruleDetails": [unit_test_utils.FAKE_RULE_DETAIL]})
+
+    @api_helpers.request_scoped_api_call_cache
+    def handler_work():
+        api_helpers.call_get_outcomes(mock_afd_client, unit_test_utils.FAKE_NAME)
+        api_helpers.call_get_outcomes(mock_afd_client)
+        api_helpers.call_get_outcomes(mock_afd_client, "different_outcome")
+        api_helpers.call_list_tags_for_resource(mock_afd_client, unit_test_utils.FAKE_ARN)
+        api_helpers.call_get_rules(mock_afd_client, unit_test_utils.FAKE_NAME)
+        api_helpers.call_put_outcome(mock_afd_client, unit_test_utils.FAKE_NAME)
+        api_helpers.call_get_outcomes(mock_afd_client, unit_test_utils.FAKE_NAME)
+        api_helpers.call_get_outcomes(mock_afd_client)
+        api_helpers.call_get_outcomes(mock_afd_client, "different_outcome")
+        api_helpers.call_list_tags_for_resource(mock_afd_client, unit_test_utils.FAKE_ARN)
+        api_helpers.call_get_rules(mock_afd_client, unit_test_utils.FAKE_NAME)
+
+    handler_work()
+
+    # named and list-all reads of the written outcome are refreshed, tags are refreshed, other reads are cached
+    assert mock_afd_client.get_outcomes.call_count == 5
+    assert mock_afd_client.list_tags_for_resource.call_count == 2
+    assert mock_afd_client.get_rules.call_count == 1
+
+
+def test_cached_api_call_does_not_cache_read_that_raced_a_write():
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.put_outcome = MagicMock()
+
+    # the write finishes (and invalidates) while the read is in flight, e.g. on another worker thread
+    def get_outcomes_racing_put_outcome(**kwargs):
+        api_helpers.call_put_outcome(mock_afd_client, unit_test_utils.FAKE_NAME)
+        return {"outcomes": [unit_test_utils.FAKE_OUTCOME]}
+
+    mock_afd_client.get_outcomes = MagicMock(side_effect=get_outcomes_racing_put_outcome)
+
+    @api_helpers.request_scoped_api_call_cache
+    def handler_work():
+        api_helpers.call_get_outcomes(mock_afd_client, unit_test_utils.FAKE_NAME)
+        mock_afd_client.get_outcomes.side_effect = None
+        mock_afd_client.get_outcomes.return_value = {"outcomes": []}
+        return api_helpers.call_get_outcomes(mock_afd_client, unit_test_utils.FAKE_NAME)
+
+    response = handler_work()
+
+    # the raced read was not cached, so the second read sees the state after the write
+    assert mock_afd_client.get_outcomes.call_count == 2
+    assert response == {"outcomes": []}
+
+
+def test_call_batch_get_variable_retries_names_in_errors_for_consistency(monkeypatch):
+    # Arrange - the second variable is only visible on the second attempt
+    monkeypatch.setattr(api_helpers, "_consistency_waiter", api_helpers.ConsistencyWaiter(base_delay=0))
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.batch_get_variable = MagicMock(
+        side_effect=[
+            {"variables": [unit_test_utils.FAKE_IP_VARIABLE], "errors": [{"name": "created_variable"}]},
+            {"variables": [unit_test_utils.FAKE_EMAIL_VARIABLE], "errors": []},
+        ]
+    )
+
+    # Act
+    response = api_helpers.call_batch_get_variable(
+        mock_afd_client, names=[unit_test_utils.FAKE_IP_VARIABLE.get("name"), "created_variable"]
+    )
+
+    # Assert
+    assert mock_afd_client.batch_get_variable.call_count == 2
+    assert mock_afd_client.batch_get_variable.call_args[1] == {"names": ["created_variable"]}
+    assert response == {
+        "variables": [unit_test_utils.FAKE_IP_VARIABLE, unit_test_utils.FAKE_EMAIL_VARIABLE],
+        "errors": [],
+    }
+
+
+def test_call_batch_get_variable_returns_errors_left_after_retries(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.batch_get_variable = MagicMock(return_value={"variables": [], "errors": [{"name": "missing"}]})
+    consistency_waiter = api_helpers.ConsistencyWaiter(base_delay=0, max_attempts=2)
+    monkeypatch.setattr(api_helpers, "_consistency_waiter", consistency_waiter)
+
+    # Act
+    response = api_helpers.call_batch_get_variable(mock_afd_client, names=["missing"])
+
+    # Assert
+    assert mock_afd_client.batch_get_variable.call_count == 2
+    assert consistency_waiter.give_up_count == 1
+    assert response == {"variables": [], "errors": [{"name": "missing"}]}
+
+
 def test_get_calls(monkeypatch):
     required_arguments = [
         {
@@ -431,3 +745,26 @@ def _test_api_helper_call(
     if should_check_validation_helper:
         mock_remove_none_arguments.assert_called_once()
     mock_api_call.assert_called_once()
+
+
+def _is_within_max_results_limits(operation_name: str, max_results: int) -> bool:
+    # botocore only checks the minimum on the client, the service rejects page sizes above the maximum
+    service_model = botocore.session.get_session().get_service_model("frauddetector")
+    limits = service_model.operation_model(operation_name).input_shape.members["maxResults"].metadata
+    return limits["min"] <= max_results <= limits["max"]
+
+
+def test_paginated_api_calls_request_page_sizes_within_api_limits():
+    # Arrange - call_<operation> functions call the <operation> API
+    paginated_calls = {
+        name: func
+        for name, func in vars(api_helpers).items()
+        if name.startswith("call_") and getattr(func, "max_results", None) is not None
+    }
+
+    # Assert
+    assert "call_list_tags_for_resource" in paginated_calls
+    for name, func in paginated_calls.items():
+        operation_name = "".join(word.capitalize() for word in name[len("call_") :].split("_"))
+        assert _is_within_max_results_limits(operation_name, func.max_results), name
+    assert _is_within_max_results_limits("GetDetectors", api_helpers.DETECTORS_PAGE_SIZE)
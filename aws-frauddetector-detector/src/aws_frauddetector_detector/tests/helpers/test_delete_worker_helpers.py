@@ -1,12 +1,17 @@
 from aws_frauddetector_detector.helpers import (
     delete_worker_helpers,
     api_helpers,
+    util,
 )
 from .. import unit_test_utils
 from unittest.mock import MagicMock
 
 
-def test_deactivate_and_delete_detector_versions_for_detector_model(monkeypatch):
+def _get_task_counts_by_tier_name(tiers):
+    return [(tier_name, len(tasks)) for tier_name, tasks in tiers]
+
+
+def test_get_detector_version_tiers(monkeypatch):
     # Arrange
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     fake_model = unit_test_utils.create_fake_model()
@@ -29,15 +34,20 @@ def test_deactivate_and_delete_detector_versions_for_detector_model(monkeypatch)
     monkeypatch.setattr(api_helpers, "call_delete_detector_version", mock_call_delete_detector_version)
 
     # Act
-    delete_worker_helpers.deactivate_and_delete_detector_versions_for_detector_model(mock_afd_client, fake_model)
+    tiers = delete_worker_helpers._get_detector_version_tiers(mock_afd_client, fake_model)
+    util.run_tiers(tiers)
 
     # Assert
+    assert _get_task_counts_by_tier_name(tiers) == [
+        ("deactivate detector versions", 1),
+        ("delete detector versions", 2),
+    ]
     assert mock_call_describe_detector.call_count == 1
     assert mock_call_update_detector_version_status.call_count == 1
     assert mock_call_delete_detector_version.call_count == 2
 
 
-def test_delete_rules_and_inline_outcomes_for_detector_model(monkeypatch):
+def test_get_rule_and_inline_outcome_tiers(monkeypatch):
     # Arrange
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     fake_model = unit_test_utils.create_fake_model(is_output_model=True)
@@ -51,15 +61,17 @@ def test_delete_rules_and_inline_outcomes_for_detector_model(monkeypatch):
     monkeypatch.setattr(api_helpers, "call_delete_outcome", mock_call_delete_outcome)
 
     # Act
-    delete_worker_helpers.delete_rules_and_inline_outcomes_for_detector_model(mock_afd_client, fake_model)
+    tiers = delete_worker_helpers._get_rule_and_inline_outcome_tiers(mock_afd_client, fake_model)
+    util.run_tiers(tiers)
 
     # Assert
+    assert _get_task_counts_by_tier_name(tiers) == [("delete rule versions", 1), ("delete inline outcomes", 1)]
     assert mock_call_get_rules.call_count == 1
     assert mock_call_delete_rule.call_count == 1
     assert mock_call_delete_outcome.call_count == 1
 
 
-def test_delete_detector_for_detector_model(monkeypatch):
+def test_get_detector_tiers(monkeypatch):
     # Arrange
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     fake_model = unit_test_utils.create_fake_model(is_output_model=True)
@@ -68,13 +80,15 @@ def test_delete_detector_for_detector_model(monkeypatch):
     monkeypatch.setattr(api_helpers, "call_delete_detector", mock_call_delete_detector)
 
     # Act
-    delete_worker_helpers.delete_detector_for_detector_model(mock_afd_client, fake_model)
+    tiers = delete_worker_helpers._get_detector_tiers(mock_afd_client, fake_model)
+    util.run_tiers(tiers)
 
     # Assert
+    assert _get_task_counts_by_tier_name(tiers) == [("delete detector", 1)]
     assert mock_call_delete_detector.call_count == 1
 
 
-def test_delete_inline_dependencies_for_detector_model(monkeypatch):
+def test_get_inline_dependency_tiers(monkeypatch):
     # Arrange
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     fake_model = unit_test_utils.create_fake_model(is_output_model=True)
@@ -89,10 +103,57 @@ def test_delete_inline_dependencies_for_detector_model(monkeypatch):
     monkeypatch.setattr(api_helpers, "call_delete_label", mock_call_delete_label)
 
     # Act
-    delete_worker_helpers.delete_inline_dependencies_for_detector_model(mock_afd_client, fake_model)
+    tiers = delete_worker_helpers._get_inline_dependency_tiers(mock_afd_client, fake_model)
+    util.run_tiers(tiers)
 
     # Assert
+    assert _get_task_counts_by_tier_name(tiers) == [
+        ("delete inline event type", 1),
+        ("delete inline event variables, entity types and labels", 5),
+    ]
     assert mock_call_delete_event_type.call_count == 1
     assert mock_call_delete_variable.call_count == 2
     assert mock_call_delete_entity_type.call_count == 1
     assert mock_call_delete_label.call_count == 2
+
+
+def test_delete_detector_and_dependencies_for_detector_model_deletes_in_dependency_order(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    fake_model = unit_test_utils.create_fake_model(is_output_model=True)
+    calls = []
+    describe_detector_response = {"detectorVersionSummaries": [{"detectorVersionId": "1", "status": "ACTIVE"}]}
+    get_rules_response = {"ruleDetails": [unit_test_utils.FAKE_RULE_DETAIL]}
+
+    monkeypatch.setattr(api_helpers, "call_describe_detector", MagicMock(return_value=describe_detector_response))
+    monkeypatch.setattr(api_helpers, "call_get_rules", MagicMock(return_value=get_rules_response))
+    for api_name in [
+        "update_detector_version_status",
+        "delete_detector_version",
+        "delete_rule",
+        "delete_outcome",
+        "delete_detector",
+        "delete_event_type",
+        "delete_variable",
+        "delete_entity_type",
+        "delete_label",
+    ]:
+        monkeypatch.setattr(
+            api_helpers,
+            f"call_{api_name}",
+            MagicMock(side_effect=lambda api_name=api_name, **kwargs: calls.append(api_name)),
+        )
+
+    # Act
+    delete_worker_helpers.delete_detector_and_dependencies_for_detector_model(mock_afd_client, fake_model)
+
+    # Assert
+    assert calls[:6] == [
+        "update_detector_version_status",
+        "delete_detector_version",
+        "delete_rule",
+        "delete_outcome",
+        "delete_detector",
+        "delete_event_type",
+    ]
+    assert sorted(calls[6:]) == sorted(["delete_variable"] * 2 + ["delete_entity_type"] + ["delete_label"] * 2)
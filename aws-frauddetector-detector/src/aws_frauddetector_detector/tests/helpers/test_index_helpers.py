@@ -0,0 +1,129 @@
+from ...helpers import index_helpers
+from unittest.mock import MagicMock
+from .. import unit_test_utils
+
+
+def _create_fake_outcome_with_name(name: str):
+    return dict(unit_test_utils.FAKE_OUTCOME, name=name)
+
+
+def test_build_outcome_index_below_threshold_gets_outcomes_by_name():
+    # Arrange
+    outcome_names = [f"outcome_{i}" for i in range(3)]
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_outcomes = MagicMock(
+        side_effect=lambda name, **kwargs: {"outcomes": [_create_fake_outcome_with_name(name)]}
+    )
+
+    # Act
+    outcome_index = index_helpers.build_outcome_index(mock_afd_client, outcome_names)
+
+    # Assert
+    assert mock_afd_client.get_outcomes.call_count == 3
+    assert sorted(outcome_index.keys()) == outcome_names
+    assert outcome_index["outcome_1"].get("name") == "outcome_1"
+
+
+def test_build_outcome_index_above_threshold_lists_outcomes_once():
+    # Arrange
+    outcome_names = [f"outcome_{i}" for i in range(index_helpers.OUTCOME_INDEX_BULK_THRESHOLD + 1)]
+    all_outcomes = [_create_fake_outcome_with_name(name) for name in outcome_names + ["unrelated"]]
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_outcomes = MagicMock(return_value={"outcomes": all_outcomes})
+
+    # Act
+    outcome_index = index_helpers.build_outcome_index(mock_afd_client, outcome_names)
+
+    # Assert
+    assert mock_afd_client.get_outcomes.call_count == 1
+    assert sorted(outcome_index.keys()) == sorted(outcome_names)
+
+
+def test_build_outcome_index_leaves_out_missing_outcomes():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_outcomes = MagicMock(
+        side_effect=lambda name, **kwargs: {
+            "outcomes": [_create_fake_outcome_with_name(name)] if name == "exists" else []
+        }
+    )
+
+    # Act
+    outcome_index = index_helpers.build_outcome_index(mock_afd_client, ["exists", "missing"])
+
+    # Assert
+    assert list(outcome_index.keys()) == ["exists"]
+
+
+def test_build_rule_index_gets_rules_once_and_indexes_versions():
+    # Arrange
+    rule_details = [
+        dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId="rule_1", ruleVersion="1"),
+        dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId="rule_1", ruleVersion="10"),
+        dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId="rule_2", ruleVersion="2"),
+    ]
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_rules = MagicMock(return_value={"ruleDetails": rule_details})
+
+    # Act
+    rule_index = index_helpers.build_rule_index(mock_afd_client, unit_test_utils.FAKE_NAME)
+
+    # Assert
+    mock_afd_client.get_rules.assert_called_once_with(detectorId=unit_test_utils.FAKE_NAME, maxResults=100)
+    assert rule_index.get("rule_1", "10") == rule_details[1]
+    assert rule_index.get("rule_2", "1") is None
+    assert rule_index.get_max_rule_version("rule_1") == "10"
+    assert rule_index.get_max_rule_version("missing") is None
+    assert len(rule_index.get_rule_versions("rule_1")) == 2
+
+
+def test_rule_index_add_updates_index_in_place():
+    # Arrange
+    rule_index = index_helpers.RuleIndex(
+        unit_test_utils.FAKE_NAME, [dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId="rule_1", ruleVersion="1")]
+    )
+
+    # Act
+    rule_index.add({"detectorId": unit_test_utils.FAKE_NAME, "ruleId": "rule_1", "ruleVersion": "2"})
+
+    # Assert
+    assert rule_index.get_max_rule_version("rule_1") == "2"
+    assert len(rule_index.get_rule_versions("rule_1")) == 2
+
+
+def test_build_detector_usage_graph_maps_detector_versions_to_rule_versions_to_outcomes():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.describe_detector = MagicMock(
+        return_value={"detectorVersionSummaries": [{"detectorVersionId": "1"}, {"detectorVersionId": "2"}]}
+    )
+    mock_afd_client.get_detector_version = MagicMock(
+        side_effect=lambda detectorId, detectorVersionId: {
+            "rules": [{"detectorId": detectorId, "ruleId": "rule_1", "ruleVersion": detectorVersionId}]
+        }
+    )
+    mock_afd_client.get_rules = MagicMock(
+        return_value={
+            "ruleDetails": [
+                dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId="rule_1", ruleVersion=str(i), outcomes=[f"outcome_{i}"])
+                for i in range(1, 4)
+            ]
+        }
+    )
+
+    # Act
+    usage_graph = index_helpers.build_detector_usage_graph(mock_afd_client, unit_test_utils.FAKE_NAME)
+    unreferenced_rule_versions = usage_graph.get_unreferenced_rule_versions(
+        {("rule_1", "1"), ("rule_1", "2"), ("rule_1", "3")}
+    )
+    for rule_id, rule_version in unreferenced_rule_versions:
+        usage_graph.remove_rule_version(rule_id, rule_version)
+
+    # Assert
+    assert mock_afd_client.describe_detector.call_count == 1
+    assert mock_afd_client.get_detector_version.call_count == 2
+    assert mock_afd_client.get_rules.call_count == 1
+    assert unreferenced_rule_versions == {("rule_1", "3")}
+    assert usage_graph.get_detector_version_ids_referencing("rule_1", "2") == {"2"}
+    assert usage_graph.get_unreferenced_outcomes({"outcome_1", "outcome_3"}) == {"outcome_3"}
+    assert usage_graph.get_rule_versions_referencing("outcome_1") == {("rule_1", "1")}
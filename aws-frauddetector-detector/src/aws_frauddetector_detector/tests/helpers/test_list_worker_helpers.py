@@ -11,15 +11,37 @@ def test_list_detector_models(monkeypatch):
     # Arrange
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     get_detectors_response = {"detectors": [unit_test_utils.FAKE_DETECTOR, unit_test_utils.FAKE_DETECTOR]}
-    mock_call_get_detectors = MagicMock(return_value=get_detectors_response)
+    mock_call_get_detectors_page = MagicMock(return_value=get_detectors_response)
     mock_get_model_for_detector = MagicMock()
-    monkeypatch.setattr(api_helpers, "call_get_detectors", mock_call_get_detectors)
+    monkeypatch.setattr(api_helpers, "call_get_detectors_page", mock_call_get_detectors_page)
     monkeypatch.setattr(model_helpers, "get_model_for_detector", mock_get_model_for_detector)
 
     # Act
-    models = list_worker_helpers.list_detector_models(mock_afd_client)
+    models, next_token = list_worker_helpers.list_detector_models(mock_afd_client)
 
     # Assert
     assert len(models) == 2
-    assert mock_call_get_detectors.call_count == 1
-    assert mock_get_model_for_detector.call_count == 2
+    assert next_token is None
+    assert models[0].Arn == unit_test_utils.FAKE_DETECTOR.get("arn")
+    assert models[0].DetectorId == unit_test_utils.FAKE_DETECTOR.get("detectorId")
+    assert mock_call_get_detectors_page.call_count == 1
+    assert mock_get_model_for_detector.call_count == 0
+
+
+def test_list_detector_models_with_next_token():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    get_detectors_response = {"detectors": [unit_test_utils.FAKE_DETECTOR], "nextToken": "page_3"}
+    mock_afd_client.get_detectors = MagicMock(return_value=get_detectors_response)
+
+    # Act
+    models, next_token = list_worker_helpers.list_detector_models(mock_afd_client, "page_2")
+
+    # Assert
+    assert len(models) == 1
+    assert next_token == "page_3"
+    mock_afd_client.get_detectors.assert_called_once_with(
+        nextToken="page_2", maxResults=api_helpers.DETECTORS_PAGE_SIZE
+    )
+    assert mock_afd_client.list_tags_for_resource.call_count == 0
+    assert mock_afd_client.get_rules.call_count == 0
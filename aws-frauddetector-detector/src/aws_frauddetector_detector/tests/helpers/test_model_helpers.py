@@ -1,8 +1,13 @@
 from aws_frauddetector_detector.helpers import model_helpers
 from aws_frauddetector_detector import models
 from unittest.mock import MagicMock
+from cloudformation_cli_python_lib import (
+    exceptions,
+)
 from .. import unit_test_utils
 
+import pytest
+
 
 def test_put_detector_for_model():
     # Arrange
@@ -39,8 +44,11 @@ def test_get_model_for_detector():
     # Arrange
     list_tags_response = {"tags": unit_test_utils.FAKE_TAGS}
     get_event_types_response = {"eventTypes": [unit_test_utils.FAKE_EVENT_TYPE]}
-    get_variables_response_1 = {"variables": [unit_test_utils.FAKE_IP_VARIABLE]}
-    get_variables_response_2 = {"variables": [unit_test_utils.FAKE_EMAIL_VARIABLE]}
+    # batch_get_variable does not preserve request order
+    batch_get_variable_response = {
+        "variables": [unit_test_utils.FAKE_EMAIL_VARIABLE, unit_test_utils.FAKE_IP_VARIABLE],
+        "errors": [],
+    }
     get_labels_response_1 = {"labels": [unit_test_utils.FAKE_FRAUD_LABEL]}
     get_labels_response_2 = {"labels": [unit_test_utils.FAKE_LEGIT_LABEL]}
     get_entity_types_response = {"entityTypes": [unit_test_utils.FAKE_ENTITY_TYPE]}
@@ -59,11 +67,7 @@ def test_get_model_for_detector():
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.list_tags_for_resource = MagicMock(return_value=list_tags_response)
     mock_afd_client.get_event_types = MagicMock(return_value=get_event_types_response)
-    mock_afd_client.get_variables = MagicMock()
-    mock_afd_client.get_variables.side_effect = [
-        get_variables_response_1,
-        get_variables_response_2,
-    ]
+    mock_afd_client.batch_get_variable = MagicMock(return_value=batch_get_variable_response)
     mock_afd_client.get_labels = MagicMock()
     mock_afd_client.get_labels.side_effect = [
         get_labels_response_1,
@@ -95,7 +99,7 @@ def test_get_model_for_detector():
     # Assert
     assert mock_afd_client.list_tags_for_resource.call_count == 9
     assert mock_afd_client.get_event_types.call_count == 1
-    assert mock_afd_client.get_variables.call_count == 2
+    assert mock_afd_client.batch_get_variable.call_count == 1
     assert mock_afd_client.get_labels.call_count == 2
     assert mock_afd_client.get_entity_types.call_count == 1
     assert mock_afd_client.describe_detector.call_count == 1
@@ -107,6 +111,85 @@ def test_get_model_for_detector():
     assert model_result == output_model
 
 
+def test_get_model_for_written_detector_reads_only_what_writes_do_not_return():
+    # Arrange
+    batch_get_variable_response = {
+        "variables": [unit_test_utils.FAKE_EMAIL_VARIABLE, unit_test_utils.FAKE_IP_VARIABLE],
+        "errors": [],
+    }
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.list_tags_for_resource = MagicMock(return_value={"tags": unit_test_utils.FAKE_TAGS})
+    mock_afd_client.get_detectors = MagicMock(return_value={"detectors": [unit_test_utils.FAKE_DETECTOR]})
+    mock_afd_client.get_event_types = MagicMock(return_value={"eventTypes": [unit_test_utils.FAKE_EVENT_TYPE]})
+    mock_afd_client.batch_get_variable = MagicMock(return_value=batch_get_variable_response)
+    mock_afd_client.get_labels = MagicMock()
+    mock_afd_client.get_labels.side_effect = [
+        {"labels": [unit_test_utils.FAKE_FRAUD_LABEL]},
+        {"labels": [unit_test_utils.FAKE_LEGIT_LABEL]},
+    ]
+    mock_afd_client.get_entity_types = MagicMock(return_value={"entityTypes": [unit_test_utils.FAKE_ENTITY_TYPE]})
+    mock_afd_client.get_rules = MagicMock(return_value={"ruleDetails": [unit_test_utils.FAKE_RULE_DETAIL]})
+    mock_afd_client.get_outcomes = MagicMock(return_value={"outcomes": [unit_test_utils.FAKE_OUTCOME]})
+    mock_afd_client.describe_detector = MagicMock()
+    mock_afd_client.get_detector_version = MagicMock()
+
+    fake_model = unit_test_utils.create_fake_model()
+    rule_dicts = [
+        {
+            "detectorId": unit_test_utils.FAKE_NAME,
+            "ruleId": unit_test_utils.FAKE_NAME,
+            "ruleVersion": unit_test_utils.FAKE_VERSION_ID,
+        }
+    ]
+
+    # Act
+    model_result = model_helpers.get_model_for_written_detector(
+        mock_afd_client, fake_model, unit_test_utils.FAKE_VERSION_ID, rule_dicts
+    )
+
+    # Assert
+    # detector, rule and inline outcome tags come from the desired model, only the event type is read
+    assert mock_afd_client.list_tags_for_resource.call_count == 6
+    assert mock_afd_client.get_detectors.call_count == 1
+    assert mock_afd_client.get_rules.call_count == 1
+    assert mock_afd_client.describe_detector.call_count == 0
+    assert mock_afd_client.get_detector_version.call_count == 0
+    assert model_result == unit_test_utils.create_fake_model(is_output_model=True)
+
+
+def test_get_model_for_detector_keeps_rule_order():
+    # Arrange
+    rule_ids = [f"rule_{i}" for i in range(5)]
+    get_detector_version_response = {
+        **unit_test_utils.FAKE_DETECTOR_VERSION,
+        "rules": [
+            {"detectorId": unit_test_utils.FAKE_NAME, "ruleId": rule_id, "ruleVersion": "1"} for rule_id in rule_ids
+        ],
+    }
+
+    # one detector-wide sweep, in a different order than the detector version rules
+    get_rules_response = {
+        "ruleDetails": [{**unit_test_utils.FAKE_RULE_DETAIL, "ruleId": rule_id} for rule_id in reversed(rule_ids)]
+    }
+
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.list_tags_for_resource = MagicMock(return_value={"tags": unit_test_utils.FAKE_TAGS})
+    mock_afd_client.get_event_types = MagicMock(return_value={"eventTypes": [unit_test_utils.FAKE_EVENT_TYPE]})
+    mock_afd_client.get_detector_version = MagicMock(return_value=get_detector_version_response)
+    mock_afd_client.get_rules = MagicMock(return_value=get_rules_response)
+    mock_afd_client.get_outcomes = MagicMock(return_value={"outcomes": [unit_test_utils.FAKE_OUTCOME]})
+
+    fake_model = unit_test_utils.create_fake_model_with_references()
+    fake_model.DetectorVersionId = unit_test_utils.FAKE_VERSION_ID
+
+    # Act
+    model_result = model_helpers.get_model_for_detector(mock_afd_client, unit_test_utils.FAKE_DETECTOR, fake_model)
+
+    # Assert
+    assert mock_afd_client.get_rules.call_count == 1
+    assert [rule.RuleId for rule in model_result.Rules] == rule_ids
+
+
 def test_get_model_for_detector_with_references():
     # Arrange
     list_tags_response = {"tags": unit_test_utils.FAKE_TAGS}
@@ -153,8 +236,11 @@ def test_get_event_type_and_return_event_type_model():
     # Arrange
     list_tags_response = {"tags": unit_test_utils.FAKE_TAGS}
     get_event_types_response = {"eventTypes": [unit_test_utils.FAKE_EVENT_TYPE]}
-    get_variables_response_1 = {"variables": [unit_test_utils.FAKE_IP_VARIABLE]}
-    get_variables_response_2 = {"variables": [unit_test_utils.FAKE_EMAIL_VARIABLE]}
+    # batch_get_variable does not preserve request order
+    batch_get_variable_response = {
+        "variables": [unit_test_utils.FAKE_EMAIL_VARIABLE, unit_test_utils.FAKE_IP_VARIABLE],
+        "errors": [],
+    }
     get_labels_response_1 = {"labels": [unit_test_utils.FAKE_FRAUD_LABEL]}
     get_labels_response_2 = {"labels": [unit_test_utils.FAKE_LEGIT_LABEL]}
     get_entity_types_response = {"entityTypes": [unit_test_utils.FAKE_ENTITY_TYPE]}
@@ -162,11 +248,7 @@ def test_get_event_type_and_return_event_type_model():
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.list_tags_for_resource = MagicMock(return_value=list_tags_response)
     mock_afd_client.get_event_types = MagicMock(return_value=get_event_types_response)
-    mock_afd_client.get_variables = MagicMock()
-    mock_afd_client.get_variables.side_effect = [
-        get_variables_response_1,
-        get_variables_response_2,
-    ]
+    mock_afd_client.batch_get_variable = MagicMock(return_value=batch_get_variable_response)
     mock_afd_client.get_labels = MagicMock()
     mock_afd_client.get_labels.side_effect = [
         get_labels_response_1,
@@ -182,7 +264,7 @@ def test_get_event_type_and_return_event_type_model():
     # Assert
     assert mock_afd_client.list_tags_for_resource.call_count == 6
     assert mock_afd_client.get_event_types.call_count == 1
-    assert mock_afd_client.get_variables.call_count == 2
+    assert mock_afd_client.batch_get_variable.call_count == 1
     assert mock_afd_client.get_labels.call_count == 2
     assert mock_afd_client.get_entity_types.call_count == 1
     assert model_result == unit_test_utils.create_fake_event_type(is_output_model=True)
@@ -247,3 +329,111 @@ def _assert_referenced_input_model_output_model_equality(
             expected_outcome = expected_rule_model.Outcomes[j]
             assert actual_outcome.Arn == expected_outcome.Arn
             assert actual_outcome.Inline == expected_outcome.Inline
+
+
+def test_get_variables_and_return_event_variables_model_chunks_and_keeps_order():
+    # Arrange
+    variable_names = [f"variable_{i}" for i in range(150)]
+    fake_variables_by_name = {
+        name: dict(unit_test_utils.FAKE_IP_VARIABLE, name=name, arn=f"{unit_test_utils.FAKE_ARN_PREFIX}{name}")
+        for name in variable_names
+    }
+
+    def fake_batch_get_variable(names):
+        # return each chunk in reverse order, as batch_get_variable does not preserve request order
+        return {"variables": [fake_variables_by_name[name] for name in reversed(names)], "errors": []}
+
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.batch_get_variable = MagicMock(side_effect=fake_batch_get_variable)
+    mock_afd_client.list_tags_for_resource = MagicMock(return_value={"tags": []})
+
+    # Act
+    result = model_helpers._get_variables_and_return_event_variables_model(
+        mock_afd_client, variable_names, set(variable_names)
+    )
+
+    # Assert
+    assert mock_afd_client.batch_get_variable.call_count == 2
+    assert [variable_model.Name for variable_model in result] == variable_names
+
+
+def test_get_variables_and_return_event_variables_model_errors_raise_not_found():
+    # Arrange
+    batch_get_variable_response = {
+        "variables": [unit_test_utils.FAKE_IP_VARIABLE],
+        "errors": [{"name": "missing", "code": 404, "message": "variable not found"}],
+    }
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.batch_get_variable = MagicMock(return_value=batch_get_variable_response)
+
+    # Act / Assert
+    with pytest.raises(exceptions.NotFound):
+        model_helpers._get_variables_and_return_event_variables_model(
+            mock_afd_client, [unit_test_utils.IP_LOWER, "missing"], set()
+        )
+
+
+def test_rule_models_are_equivalent_ignores_whitespace_and_tag_order():
+    # Arrange
+    previous_rule_model = unit_test_utils.create_fake_rule()
+    previous_rule_model.Expression = '$email  ==\n"a  b"'
+    previous_rule_model.Tags = unit_test_utils.FAKE_TAG_MODELS_DIFFERENT
+    current_rule_model = unit_test_utils.create_fake_rule()
+    current_rule_model.Expression = ' $email == "a  b" '
+    current_rule_model.Tags = list(reversed(unit_test_utils.FAKE_TAG_MODELS_DIFFERENT))
+    current_rule_model.Outcomes = [unit_test_utils.create_fake_referenced_outcome()]
+
+    # Act / Assert
+    assert model_helpers.rule_models_are_equivalent(previous_rule_model, current_rule_model)
+
+
+def test_rule_models_are_equivalent_detects_changes():
+    # Arrange
+    previous_rule_model = unit_test_utils.create_fake_rule()
+    previous_rule_model.Expression = '$email == "a b"'
+    changed_literal_rule_model = unit_test_utils.create_fake_rule()
+    changed_literal_rule_model.Expression = '$email == "a  b"'
+    changed_description_rule_model = unit_test_utils.create_fake_rule()
+    changed_description_rule_model.Expression = previous_rule_model.Expression
+    changed_description_rule_model.Description = "different"
+
+    # Act / Assert
+    assert not model_helpers.rule_models_are_equivalent(previous_rule_model, changed_literal_rule_model)
+    assert not model_helpers.rule_models_are_equivalent(previous_rule_model, changed_description_rule_model)
+
+
+def test_get_inline_outcome_models_by_name_deduplicates_shared_outcomes():
+    # Arrange
+    rules = [unit_test_utils.create_fake_rule() for _ in range(3)]
+    rules.append(unit_test_utils.create_fake_rule_with_referenced_outcome())
+
+    # Act
+    inline_outcome_models_by_name = model_helpers.get_inline_outcome_models_by_name(rules)
+
+    # Assert
+    assert list(inline_outcome_models_by_name.keys()) == [unit_test_utils.FAKE_NAME]
+
+
+def test_get_inline_outcome_models_by_name_with_conflicting_definitions_fails():
+    # Arrange
+    rules = [unit_test_utils.create_fake_rule(), unit_test_utils.create_fake_rule()]
+    rules[1].Outcomes[0].Description = "different description"
+
+    # Act / Assert
+    with pytest.raises(exceptions.InvalidRequest):
+        model_helpers.get_inline_outcome_models_by_name(rules)
+
+
+def test_put_inline_outcomes_for_outcome_models_puts_each_outcome_once():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.put_outcome = MagicMock()
+    rules = [unit_test_utils.create_fake_rule() for _ in range(40)]
+
+    # Act
+    model_helpers.put_inline_outcomes_for_outcome_models(
+        mock_afd_client, model_helpers.get_inline_outcome_models_by_name(rules).values()
+    )
+
+    # Assert
+    assert mock_afd_client.put_outcome.call_count == 1
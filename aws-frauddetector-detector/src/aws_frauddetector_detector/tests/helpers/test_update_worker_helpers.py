@@ -1,8 +1,10 @@
+import json
 from aws_frauddetector_detector.helpers import (
     update_worker_helpers,
     validation_helpers,
     api_helpers,
     common_helpers,
+    index_helpers,
     model_helpers,
 )
 from aws_frauddetector_detector import models
@@ -363,13 +365,59 @@ def test_update_rules_and_inline_outcomes_for_detector_update(monkeypatch):
     (
         unused_rule_versions,
         unused_inline_outcomes,
+        is_done,
     ) = update_worker_helpers.update_rules_and_inline_outcomes_for_detector_update(
         mock_afd_client, fake_model, fake_previous_model
     )
 
     # Assert
-    assert len(unused_rule_versions) == 1  # currently, we always update rule version for simplicity
+    assert mock_call_get_rules.call_count == 1  # a single detector-wide rule index
+    assert mock_call_update_rule_version.call_count == 0  # rule is unchanged, keep its rule version
+    assert len(unused_rule_versions) == 0
     assert len(unused_inline_outcomes) == 0  # outcome is not updated
+    assert is_done is True
+    assert fake_model.Rules[0].RuleVersion == unit_test_utils.FAKE_VERSION_ID
+
+
+def test_update_rules_and_inline_outcomes_for_detector_update_changed_rule(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    fake_model = unit_test_utils.create_fake_model()
+    fake_previous_model = unit_test_utils.create_fake_model()
+    fake_model.Rules[0].Expression = "$ip == '1.2.3.4'"
+
+    global mock_call_get_rules
+    global mock_call_update_rule_version
+    global mock_get_outcomes_model_for_given_outcome_names
+
+    get_rules_response = {"ruleDetails": [unit_test_utils.FAKE_RULE_DETAIL]}
+    mock_call_get_rules = MagicMock(return_value=get_rules_response)
+    mock_call_update_rule_version = MagicMock(
+        return_value={"rule": {**unit_test_utils.FAKE_RULE_DETAIL, "ruleVersion": "2"}}
+    )
+    mock_get_outcomes_model_for_given_outcome_names = MagicMock(
+        return_value=[unit_test_utils.create_fake_outcome(True)]
+    )
+
+    _setup_monkeypatch_for_update_workers(monkeypatch)
+
+    # Act
+    (
+        unused_rule_versions,
+        unused_inline_outcomes,
+        is_done,
+    ) = update_worker_helpers.update_rules_and_inline_outcomes_for_detector_update(
+        mock_afd_client, fake_model, fake_previous_model
+    )
+
+    # Assert
+    assert mock_call_update_rule_version.call_count == 1
+    assert unused_rule_versions == {
+        (unit_test_utils.FAKE_RULE_DETAIL.get("ruleId"), unit_test_utils.FAKE_RULE_DETAIL.get("ruleVersion"))
+    }
+    assert len(unused_inline_outcomes) == 0
+    assert is_done is True
+    assert fake_model.Rules[0].RuleVersion == "2"
 
 
 def test_update_detector_version_for_detector_update(monkeypatch):
@@ -585,13 +633,18 @@ def test_delete_unused_rules_for_detector_update(monkeypatch):
 
     _setup_monkeypatch_for_update_workers(monkeypatch)
 
+    # rule 5:6 is still used by detector version 1
+    usage_graph = index_helpers.DetectorUsageGraph(
+        "detector_id", {"1": [("5", "6")]}, index_helpers.RuleIndex("detector_id")
+    )
+
     # Act
     update_worker_helpers.delete_unused_rules_for_detector_update(
-        mock_afd_client, "detector_id", {("1", "2"), ("3", "4")}
+        mock_afd_client, "detector_id", {("1", "2"), ("3", "4"), ("5", "6")}, usage_graph
     )
 
     # Assert
-    assert mock_call_delete_rule.call_count == 2  # we sent 2 tuples, so call delete rule twice
+    assert mock_call_delete_rule.call_count == 2  # only the 2 unreferenced rule versions are deleted
 
 
 def test_delete_unused_inline_outcomes_for_detector_update(monkeypatch):
@@ -602,11 +655,56 @@ def test_delete_unused_inline_outcomes_for_detector_update(monkeypatch):
 
     _setup_monkeypatch_for_update_workers(monkeypatch)
 
+    # outcome 3 is still used by a rule version
+    usage_graph = index_helpers.DetectorUsageGraph(
+        "detector_id",
+        {},
+        index_helpers.RuleIndex("detector_id", [dict(unit_test_utils.FAKE_RULE_DETAIL, outcomes=["3"])]),
+    )
+
     # Act
-    update_worker_helpers.delete_unused_inline_outcomes_for_detector_update(mock_afd_client, {"1", "2"})
+    update_worker_helpers.delete_unused_inline_outcomes_for_detector_update(
+        mock_afd_client, "detector_id", {"1", "2", "3"}, usage_graph
+    )
 
     # Assert
-    assert mock_call_delete_outcome.call_count == 2  # we sent 2 outcome names, so call delete outcome twice
+    assert mock_call_delete_outcome.call_count == 2  # only the 2 unreferenced outcomes are deleted
+
+
+def test_delete_unused_steps_share_one_usage_graph(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    fake_model = unit_test_utils.create_fake_model()
+
+    global mock_call_delete_rule
+    global mock_call_delete_outcome
+
+    _setup_monkeypatch_for_update_workers(monkeypatch)
+    mock_call_delete_rule.reset_mock()
+    mock_call_delete_outcome.reset_mock()
+
+    # outcome 3 is only used by rule 1:2, which no detector version references anymore
+    usage_graph = index_helpers.DetectorUsageGraph(
+        "detector_id",
+        {},
+        index_helpers.RuleIndex(
+            "detector_id", [dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId="1", ruleVersion="2", outcomes=["3"])]
+        ),
+    )
+    mock_build_detector_usage_graph = MagicMock(return_value=usage_graph)
+    monkeypatch.setattr(index_helpers, "build_detector_usage_graph", mock_build_detector_usage_graph)
+    checkpoint = update_worker_helpers.DetectorUpdateCheckpoint()
+    checkpoint.rule_versions_to_delete = {("1", "2")}
+    checkpoint.outcomes_to_delete = {"3"}
+
+    # Act
+    update_worker_helpers._delete_unused_rules_step(mock_afd_client, fake_model, fake_model, checkpoint)
+    update_worker_helpers._delete_unused_inline_outcomes_step(mock_afd_client, fake_model, fake_model, checkpoint)
+
+    # Assert
+    assert mock_build_detector_usage_graph.call_count == 1
+    assert mock_call_delete_rule.call_count == 1
+    assert mock_call_delete_outcome.call_count == 1  # the deleted rule version no longer keeps the outcome
 
 
 def test_validate_dependencies_for_inline_event_type_update(monkeypatch):
@@ -646,6 +744,7 @@ def test_validate_dependencies_for_inline_event_type_update(monkeypatch):
         {"labels": [unit_test_utils.FAKE_LEGIT_LABEL]},
     )
     mock_check_if_get_labels_succeeds = MagicMock(return_value=mock_check_if_get_labels_succeeds_response)
+    mock_update_tags = MagicMock()
 
     _setup_monkeypatch_for_update_workers(monkeypatch)
 
@@ -662,7 +761,7 @@ def test_validate_dependencies_for_inline_event_type_update(monkeypatch):
     assert mock_put_inline_entity_type.call_count == 1
     assert mock_create_inline_event_variable.call_count == 0
     assert mock_call_update_variable.call_count == 2
-    assert mock_update_tags.call_count == 8
+    assert mock_update_tags.call_count == 5
 
 
 def test_validate_dependencies_for_inline_event_type_update_referenced_dependencies(
@@ -704,6 +803,7 @@ def test_validate_dependencies_for_inline_event_type_update_referenced_dependenc
         {"labels": [unit_test_utils.FAKE_LEGIT_LABEL]},
     )
     mock_check_if_get_labels_succeeds = MagicMock(return_value=mock_check_if_get_labels_succeeds_response)
+    mock_update_tags = MagicMock()
 
     _setup_monkeypatch_for_update_workers(monkeypatch)
 
@@ -720,7 +820,7 @@ def test_validate_dependencies_for_inline_event_type_update_referenced_dependenc
     assert mock_put_inline_entity_type.call_count == 1  # we call put entity type regardless for simplicity
     assert mock_create_inline_event_variable.call_count == 0
     assert mock_call_update_variable.call_count == 2  # we call update variable regardless for simplicity
-    assert mock_update_tags.call_count == 8
+    assert mock_update_tags.call_count == 0
 
 
 def _setup_monkeypatch_for_update_workers(monkeypatch):
@@ -816,3 +916,255 @@ def _setup_monkeypatch_for_update_workers(monkeypatch):
         "get_outcomes_model_for_given_outcome_names",
         mock_get_outcomes_model_for_given_outcome_names,
     )
+
+
+def test_is_metadata_only_detector_update_for_description_and_tags_change():
+    # Arrange
+    fake_model = unit_test_utils.create_fake_model()
+    fake_previous_model = unit_test_utils.create_fake_model()
+    fake_model.Description = "different description"
+    fake_model.Tags = unit_test_utils.FAKE_TAG_MODELS_DIFFERENT
+
+    # Act
+    result = update_worker_helpers.is_metadata_only_detector_update(fake_model, fake_previous_model)
+
+    # Assert
+    assert result is True
+
+
+def test_is_metadata_only_detector_update_for_rule_or_status_change():
+    # Arrange
+    fake_previous_model = unit_test_utils.create_fake_model()
+    fake_model_with_rule_change = unit_test_utils.create_fake_model()
+    fake_model_with_rule_change.Rules[0].Expression = "$ip == '1.2.3.4'"
+    fake_model_with_outcome_change = unit_test_utils.create_fake_model()
+    fake_model_with_outcome_change.Rules[0].Outcomes[0].Description = "different description"
+    fake_model_with_status_change = unit_test_utils.create_fake_model()
+    fake_model_with_status_change.DetectorVersionStatus = unit_test_utils.FAKE_DRAFT_DV_STATUS
+
+    # Act / Assert
+    for fake_model in [fake_model_with_rule_change, fake_model_with_outcome_change, fake_model_with_status_change]:
+        assert update_worker_helpers.is_metadata_only_detector_update(fake_model, fake_previous_model) is False
+
+
+def test_keep_detector_version_for_detector_update():
+    # Arrange
+    fake_model = unit_test_utils.create_fake_model()
+    fake_previous_model = unit_test_utils.create_fake_model(is_output_model=True)
+
+    # Act
+    update_worker_helpers.keep_detector_version_for_detector_update(fake_model, fake_previous_model)
+
+    # Assert
+    assert fake_model.DetectorVersionId == fake_previous_model.DetectorVersionId
+    assert fake_model.Rules[0].RuleVersion == fake_previous_model.Rules[0].RuleVersion
+
+
+def test_create_new_rules_reuses_rule_created_by_interrupted_update(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    fake_rule_model = unit_test_utils.create_fake_model().Rules[0]
+    rule_index = index_helpers.RuleIndex(unit_test_utils.FAKE_NAME, [unit_test_utils.FAKE_RULE_DETAIL])
+
+    global mock_call_create_rule
+    mock_call_create_rule = MagicMock()
+
+    _setup_monkeypatch_for_update_workers(monkeypatch)
+
+    # Act
+    written_rule_versions_by_rule_id = {}
+    is_done = update_worker_helpers._create_new_rules(
+        mock_afd_client,
+        unit_test_utils.FAKE_NAME,
+        {fake_rule_model.RuleId: fake_rule_model},
+        rule_index,
+        written_rule_versions_by_rule_id,
+    )
+
+    # Assert
+    assert mock_call_create_rule.call_count == 0
+    assert is_done is True
+    assert written_rule_versions_by_rule_id == {fake_rule_model.RuleId: unit_test_utils.FAKE_VERSION_ID}
+
+
+def _create_fake_models_with_changed_rules(rule_ids):
+    fake_model = unit_test_utils.create_fake_model()
+    fake_previous_model = unit_test_utils.create_fake_model()
+    fake_model.Rules = []
+    fake_previous_model.Rules = []
+    for rule_id in rule_ids:
+        previous_rule = unit_test_utils.create_fake_rule(is_output_model=True)
+        previous_rule.RuleId = rule_id
+        previous_rule.RuleVersion = "1"
+        current_rule = unit_test_utils.create_fake_rule()
+        current_rule.RuleId = rule_id
+        current_rule.Expression = "$ip == '1.2.3.4'"
+        fake_previous_model.Rules.append(previous_rule)
+        fake_model.Rules.append(current_rule)
+    return fake_model, fake_previous_model
+
+
+def test_update_rules_and_inline_outcomes_for_detector_update_stops_at_deadline_and_resumes(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    fake_model, fake_previous_model = _create_fake_models_with_changed_rules(["rule_1", "rule_2"])
+    rule_details = [
+        dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId=rule_id, ruleVersion="1") for rule_id in ["rule_1", "rule_2"]
+    ]
+
+    global mock_call_get_rules
+    global mock_call_update_rule_version
+    global mock_get_outcomes_model_for_given_outcome_names
+
+    mock_call_get_rules = MagicMock(return_value={"ruleDetails": rule_details})
+    mock_call_update_rule_version = MagicMock(
+        side_effect=lambda **kwargs: {
+            "rule": dict(
+                unit_test_utils.FAKE_RULE_DETAIL,
+                ruleId=kwargs["rule_id"],
+                ruleVersion="2",
+                expression=kwargs["rule_expression"],
+            )
+        }
+    )
+    mock_get_outcomes_model_for_given_outcome_names = MagicMock(return_value=[])
+
+    _setup_monkeypatch_for_update_workers(monkeypatch)
+
+    # Act - the first invocation is out of time after the first rule, the second one resumes
+    written_rule_versions_by_rule_id = {}
+    (
+        first_unused_rule_versions,
+        _,
+        first_is_done,
+    ) = update_worker_helpers.update_rules_and_inline_outcomes_for_detector_update(
+        mock_afd_client, fake_model, fake_previous_model, written_rule_versions_by_rule_id, deadline=0
+    )
+    first_written_rule_versions_by_rule_id = dict(written_rule_versions_by_rule_id)
+    (
+        second_unused_rule_versions,
+        _,
+        second_is_done,
+    ) = update_worker_helpers.update_rules_and_inline_outcomes_for_detector_update(
+        mock_afd_client, fake_model, fake_previous_model, written_rule_versions_by_rule_id, deadline=float("inf")
+    )
+
+    # Assert
+    assert first_is_done is False
+    assert first_written_rule_versions_by_rule_id == {"rule_1": "2"}
+    assert first_unused_rule_versions == {("rule_1", "1")}
+    assert second_is_done is True
+    assert mock_call_update_rule_version.call_count == 2  # each rule is written once
+    assert written_rule_versions_by_rule_id == {"rule_1": "2", "rule_2": "2"}
+    assert second_unused_rule_versions == {("rule_2", "1")}
+    assert [rule.RuleVersion for rule in fake_model.Rules] == ["2", "2"]
+
+
+def test_update_persisting_rule_reuses_rule_version_written_by_interrupted_update(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    fake_model, fake_previous_model = _create_fake_models_with_changed_rules(["rule_1"])
+    rule_index = index_helpers.RuleIndex(
+        unit_test_utils.FAKE_NAME,
+        [
+            dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId="rule_1", ruleVersion="1"),
+            dict(unit_test_utils.FAKE_RULE_DETAIL, ruleId="rule_1", ruleVersion="2", expression="$ip == '1.2.3.4'"),
+        ],
+    )
+
+    global mock_call_update_rule_version
+    mock_call_update_rule_version = MagicMock()
+
+    _setup_monkeypatch_for_update_workers(monkeypatch)
+
+    # Act
+    unused_rule_versions, _, rule_versions_by_rule_id = update_worker_helpers._update_persisting_rule(
+        mock_afd_client, unit_test_utils.FAKE_NAME, fake_model.Rules[0], fake_previous_model.Rules[0], rule_index
+    )
+
+    # Assert
+    assert mock_call_update_rule_version.call_count == 0
+    assert rule_versions_by_rule_id == {"rule_1": "2"}
+    assert unused_rule_versions == {("rule_1", "1")}
+
+
+def test_detector_update_checkpoint_round_trips_through_callback_context():
+    # Arrange
+    fake_model = unit_test_utils.create_fake_model()
+    fake_model.DetectorVersionId = "2"
+    fake_model.Rules[0].RuleVersion = "3"
+    checkpoint = update_worker_helpers.DetectorUpdateCheckpoint()
+    checkpoint.completed_steps = ["validateDependencies"]
+    checkpoint.rule_versions_to_delete = {("rule_id", "1")}
+    checkpoint.outcomes_to_delete = {"outcome"}
+    checkpoint.written_rule_versions_by_rule_id = {"rule_id": "2"}
+    checkpoint.record_versions(fake_model)
+
+    # Act
+    callback_context = json.loads(json.dumps(checkpoint.to_callback_context()))
+    restored_checkpoint = update_worker_helpers.DetectorUpdateCheckpoint(callback_context)
+    restored_model = unit_test_utils.create_fake_model()
+    restored_checkpoint.restore_versions(restored_model)
+
+    # Assert
+    assert restored_checkpoint.completed_steps == ["validateDependencies"]
+    assert restored_checkpoint.rule_versions_to_delete == {("rule_id", "1")}
+    assert restored_checkpoint.outcomes_to_delete == {"outcome"}
+    assert restored_checkpoint.written_rule_versions_by_rule_id == {"rule_id": "2"}
+    assert restored_model.DetectorVersionId == "2"
+    assert restored_model.Rules[0].RuleVersion == "3"
+
+
+def test_run_detector_update_steps_checkpoints_after_deadline_and_resumes(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    fake_model = unit_test_utils.create_fake_model()
+    fake_previous_model = unit_test_utils.create_fake_model()
+    mock_steps = [MagicMock() for _ in range(3)]
+    monkeypatch.setattr(
+        update_worker_helpers,
+        "DETECTOR_UPDATE_STEPS",
+        [(f"step_{i}", mock_step) for i, mock_step in enumerate(mock_steps)],
+    )
+    checkpoint = update_worker_helpers.DetectorUpdateCheckpoint()
+
+    # Act
+    first_invocation_done = update_worker_helpers.run_detector_update_steps(
+        mock_afd_client, fake_model, fake_previous_model, checkpoint, deadline=0
+    )
+    resumed_checkpoint = update_worker_helpers.DetectorUpdateCheckpoint(checkpoint.to_callback_context())
+    second_invocation_done = update_worker_helpers.run_detector_update_steps(
+        mock_afd_client, fake_model, fake_previous_model, resumed_checkpoint, deadline=float("inf")
+    )
+
+    # Assert
+    assert first_invocation_done is False  # past the deadline, only the first step runs
+    assert second_invocation_done is True
+    assert [mock_step.call_count for mock_step in mock_steps] == [1, 1, 1]  # completed steps are not re-run
+    assert resumed_checkpoint.completed_steps == ["step_0", "step_1", "step_2"]
+
+
+def test_run_detector_update_steps_runs_step_out_of_time_part_way_again(monkeypatch):
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    fake_model = unit_test_utils.create_fake_model()
+    fake_previous_model = unit_test_utils.create_fake_model()
+    mock_partial_step = MagicMock(side_effect=[False, True])
+    monkeypatch.setattr(update_worker_helpers, "DETECTOR_UPDATE_STEPS", [("partial_step", mock_partial_step)])
+    checkpoint = update_worker_helpers.DetectorUpdateCheckpoint()
+
+    # Act
+    first_invocation_done = update_worker_helpers.run_detector_update_steps(
+        mock_afd_client, fake_model, fake_previous_model, checkpoint, deadline=0
+    )
+    resumed_checkpoint = update_worker_helpers.DetectorUpdateCheckpoint(checkpoint.to_callback_context())
+    second_invocation_done = update_worker_helpers.run_detector_update_steps(
+        mock_afd_client, fake_model, fake_previous_model, resumed_checkpoint, deadline=float("inf")
+    )
+
+    # Assert
+    assert first_invocation_done is False
+    assert checkpoint.completed_steps == []
+    assert second_invocation_done is True
+    assert mock_partial_step.call_count == 2
+    assert resumed_checkpoint.completed_steps == ["partial_step"]
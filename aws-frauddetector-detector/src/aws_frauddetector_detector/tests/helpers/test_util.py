@@ -0,0 +1,123 @@
+from aws_frauddetector_detector.helpers import util
+from cloudformation_cli_python_lib import (
+    exceptions,
+)
+
+import time
+
+
+def test_map_concurrently_preserves_order():
+    # Arrange - later items finish first
+    def slow_identity(item):
+        time.sleep(0.01 * (5 - item))
+        return item
+
+    # Act
+    result = util.map_concurrently(slow_identity, range(5), max_workers=5)
+
+    # Assert
+    assert result == [0, 1, 2, 3, 4]
+
+
+def test_map_concurrently_with_single_worker():
+    # Arrange
+    called_items = []
+
+    # Act
+    result = util.map_concurrently(lambda item: called_items.append(item) or item * 2, [1, 2, 3], max_workers=1)
+
+    # Assert
+    assert result == [2, 4, 6]
+    assert called_items == [1, 2, 3]
+
+
+def test_run_concurrently_propagates_first_exception():
+    # Arrange
+    def raise_not_found():
+        raise exceptions.NotFound("associatedModel", "model")
+
+    tasks = [lambda: 1, raise_not_found, lambda: 3]
+
+    # Act
+    caught_exception = None
+    try:
+        util.run_concurrently(tasks)
+    except exceptions.NotFound as exception:
+        caught_exception = exception
+
+    # Assert
+    assert caught_exception is not None
+
+
+def test_run_concurrently_with_no_tasks():
+    # Act
+    result = util.run_concurrently([])
+
+    # Assert
+    assert result == []
+
+
+def test_run_tiers_runs_tiers_in_order():
+    # Arrange
+    finished = []
+
+    def finish_after(name, delay):
+        time.sleep(delay)
+        finished.append(name)
+
+    tiers = [
+        ("first", [lambda: finish_after("a", 0.02), lambda: finish_after("b", 0.01)]),
+        ("second", [lambda: finish_after("c", 0)]),
+    ]
+
+    # Act
+    util.run_tiers(tiers)
+
+    # Assert
+    assert sorted(finished[:2]) == ["a", "b"]  # a tier finishes completely before the next one starts
+    assert finished[2] == "c"
+
+
+def test_run_tiers_aggregates_errors_of_a_tier_and_skips_later_tiers():
+    # Arrange
+    completed = []
+
+    def raise_runtime_error(message):
+        raise RuntimeError(message)
+
+    tiers = [
+        (
+            "failing tier",
+            [lambda: raise_runtime_error("one"), lambda: completed.append("ok"), lambda: raise_runtime_error("two")],
+        ),
+        ("skipped tier", [lambda: completed.append("skipped")]),
+    ]
+
+    # Act
+    caught_exception = None
+    try:
+        util.run_tiers(tiers)
+    except util.TierFailedError as exception:
+        caught_exception = exception
+
+    # Assert
+    assert caught_exception is not None
+    assert caught_exception.tier_name == "failing tier"
+    assert sorted(str(error) for error in caught_exception.errors) == ["one", "two"]
+    assert completed == ["ok"]  # tasks of the failing tier run to completion, later tiers do not run
+
+
+def test_run_tiers_reraises_single_error_unchanged():
+    # Arrange
+    def raise_not_found():
+        raise exceptions.NotFound("rule", "rule")
+
+    # Act
+    caught_exception = None
+    try:
+        util.run_tiers([("tier", [lambda: 1, raise_not_found])])
+    except exceptions.NotFound as exception:
+        caught_exception = exception
+
+    # Assert
+    assert caught_exception is not None
@@ -17,6 +17,7 @@ from .models import ResourceModel
 LOG = logging.getLogger(__name__)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_create_entity_type_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -37,6 +38,7 @@ def execute_create_entity_type_handler_work(session, model, progress):
     return common_helpers.put_entity_type_and_return_progress(afd_client, model, progress)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_update_entity_type_handler_work(session, model, progress, request):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -68,6 +70,7 @@ def execute_update_entity_type_handler_work(session, model, progress, request):
     return common_helpers.put_entity_type_and_return_progress(afd_client, model, progress)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_delete_entity_type_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -86,6 +89,7 @@ def execute_delete_entity_type_handler_work(session, model, progress):
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_read_entity_type_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
     # read requests only include primary identifier (Arn). Extract Name from Arn
@@ -111,6 +115,7 @@ def execute_read_entity_type_handler_work(session, model, progress):
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_list_entity_type_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -35,10 +35,12 @@ def _get_tags_for_given_arn(frauddetector_client, arn):
 # EntityTypes
 
 
-def get_model_for_entity_type(frauddetector_client, entity_type):
+def get_model_for_entity_type(frauddetector_client, entity_type, attached_tags=None):
     entity_type_arn = entity_type.get("arn", "")
-    list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=entity_type_arn)
-    attached_tags = list_tags_response.get("tags", [])
+    # tags we just wrote are what is attached, so only read them back when the caller does not know them
+    if attached_tags is None:
+        list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=entity_type_arn)
+        attached_tags = list_tags_response.get("tags", [])
     tag_models = get_tag_models_from_tags(attached_tags)
     return ResourceModel(
         Name=entity_type.get("name", ""),
@@ -50,14 +52,14 @@ def get_model_for_entity_type(frauddetector_client, entity_type):
     )
 
 
-def get_entity_types_and_return_model_for_entity_type(frauddetector_client, entity_type_name):
+def get_entity_types_and_return_model_for_entity_type(frauddetector_client, entity_type_name, attached_tags=None):
     try:
         get_entity_types_response = api_helpers.call_get_entity_types(
             frauddetector_client, entity_type_name=entity_type_name
         )
         entity_types = get_entity_types_response.get("entityTypes", [])
         if entity_types:
-            return get_model_for_entity_type(frauddetector_client, entity_types[0])
+            return get_model_for_entity_type(frauddetector_client, entity_types[0], attached_tags)
         # if get entity_types worked but did not return any entity_types, we have major problems
         error_msg = f"get_entity_types for {entity_type_name} worked but did not return any entity_types!"
         LOG.error(error_msg)
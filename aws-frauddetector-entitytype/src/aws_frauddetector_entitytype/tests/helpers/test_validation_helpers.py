@@ -9,11 +9,8 @@ def test_check_if_get_entity_types_succeeds_client_error_returns_false():
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.get_entity_types = MagicMock()
     mock_afd_client.exceptions.ResourceNotFoundException = ClientError
-    # We retry NotFound (for consistency), so return not found twice
-    mock_afd_client.get_entity_types.side_effect = [
-        ClientError({"Code": "", "Message": ""}, "get_entity_types"),
-        ClientError({"Code": "", "Message": ""}, "get_entity_types"),
-    ]
+    # We retry NotFound (for consistency), so return not found on every attempt
+    mock_afd_client.get_entity_types.side_effect = ClientError({"Code": "", "Message": ""}, "get_entity_types")
 
     # Act
     result = validation_helpers.check_if_get_entity_types_succeeds(mock_afd_client, unit_test_utils.FAKE_NAME)
@@ -21,6 +21,7 @@ LOG = logging.getLogger(__name__)
 LOG.setLevel(logging.DEBUG)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_create_event_type_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -40,6 +41,7 @@ def execute_create_event_type_handler_work(session, model, progress):
     return common_helpers.put_event_type_and_return_progress(afd_client, model, progress)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_update_event_type_handler_work(session, model, progress, request):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -68,6 +70,7 @@ def execute_update_event_type_handler_work(session, model, progress, request):
     return common_helpers.put_event_type_and_return_progress(afd_client, model, progress)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_delete_event_type_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -102,6 +105,7 @@ def execute_delete_event_type_handler_work(session, model, progress):
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_read_event_type_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
     # read requests only include primary identifier (Arn). Extract Name from Arn
@@ -132,6 +136,7 @@ def execute_read_event_type_handler_work(session, model, progress):
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_list_event_type_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
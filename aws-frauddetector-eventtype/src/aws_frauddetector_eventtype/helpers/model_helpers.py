@@ -42,14 +42,16 @@ def _get_tags_for_given_arn(frauddetector_client, arn):
 # EventTypes
 
 
-def get_event_type_and_return_model(frauddetector_client, event_type_model: models.ResourceModel):
+def get_event_type_and_return_model(
+    frauddetector_client, event_type_model: models.ResourceModel, attached_tags: Optional[List[dict]] = None
+):
     event_type_name = event_type_model.Name
     referenced_resources = get_referenced_resources(event_type_model)
     try:
         get_event_types_response = api_helpers.call_get_event_types(frauddetector_client, event_type_name)
         event_types = get_event_types_response.get("eventTypes", [])
         if event_types:
-            return get_model_for_event_type(frauddetector_client, event_types[0], referenced_resources)
+            return get_model_for_event_type(frauddetector_client, event_types[0], referenced_resources, attached_tags)
         # if get event types worked but did not return any event types, we have major problems
         error_msg = f"get_event_types for {event_type_name} worked but did not return any event types!"
         LOG.error(error_msg)
@@ -58,7 +60,9 @@ def get_event_type_and_return_model(frauddetector_client, event_type_model: mode
         raise exceptions.InternalFailure(f"Error occurred while getting an event type: {e}")
 
 
-def get_model_for_event_type(frauddetector_client, event_type, referenced_resources: dict):
+def get_model_for_event_type(
+    frauddetector_client, event_type, referenced_resources: dict, attached_tags: Optional[List[dict]] = None
+):
     # build model from event type
     model = models.ResourceModel(
         Name=event_type.get("name", ""),
@@ -72,9 +76,10 @@ def get_model_for_event_type(frauddetector_client, event_type, referenced_resour
         LastUpdatedTime=event_type.get("lastUpdatedTime", ""),
     )
 
-    # attach Tags
-    event_type_arn = event_type.get("arn", "")
-    event_type_tags = _get_tags_for_given_arn(frauddetector_client, event_type_arn)
+    # attach Tags (tags we just wrote are what is attached, so only read them back when the caller does not know them)
+    event_type_tags = attached_tags
+    if event_type_tags is None:
+        event_type_tags = _get_tags_for_given_arn(frauddetector_client, event_type.get("arn", ""))
     # TODO: reorder tags to the same order as the input model to work around contract test bug
     model.Tags = get_tag_models_from_tags(event_type_tags)
 
@@ -114,11 +119,19 @@ def get_model_for_event_type(frauddetector_client, event_type, referenced_resour
 def _get_variables_and_return_event_variables_model(
     frauddetector_client, variable_names, reference_variable_names: set
 ):
-    collected_variables = []
-    for variable_name in variable_names:
-        # use singular get_variables to preserve order (transient contract test bug workaround)
-        get_variables_response = api_helpers.call_get_variables(frauddetector_client, variable_name)
-        collected_variables.extend(get_variables_response.get("variables", []))
+    variable_names = list(variable_names)
+    batch_get_variable_response = api_helpers.call_batch_get_variable(frauddetector_client, names=variable_names)
+    batch_get_variable_errors = batch_get_variable_response.get("errors", [])
+    if batch_get_variable_errors:
+        missing_variable_names = ", ".join(error.get("name", "") for error in batch_get_variable_errors)
+        raise exceptions.NotFound("eventVariable", missing_variable_names)
+
+    # batch_get_variable does not preserve order, so restore the event type's variable order
+    # (transient contract test bug workaround)
+    variables_by_name = {
+        variable.get("name"): variable for variable in batch_get_variable_response.get("variables", [])
+    }
+    collected_variables = [variables_by_name[name] for name in variable_names if name in variables_by_name]
     return _get_event_variables_model_for_given_variables(
         frauddetector_client, collected_variables, reference_variable_names
     )
@@ -1,4 +1,11 @@
-from typing import Optional
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Maximum number of worker threads used to fan out independent API calls
+MAX_CONCURRENT_API_CALLS = 10
 
 
 def extract_name_from_arn(resource_arn: str) -> Optional[str]:
@@ -14,3 +21,38 @@ def split_array_into_chunks(arr, chunk_size):
     for i in range(0, len(arr), chunk_size):
         yield arr[i : i + chunk_size]
     return
+
+
+def run_concurrently(tasks: Iterable[Callable[[], T]], max_workers: int = MAX_CONCURRENT_API_CALLS) -> List[T]:
+    """
+    Run the given no-argument callables on a bounded thread pool.
+    Results are returned in the same order as the given tasks, regardless of completion order.
+    If any task raises, tasks that have not started yet are cancelled and the exception is re-raised unchanged.
+    :param tasks: no-argument callables to run
+    :param max_workers: maximum number of tasks to run at the same time
+    :return: list of task results, ordered like the given tasks
+    """
+    tasks = list(tasks)
+    if max_workers <= 1 or len(tasks) <= 1:
+        return [task() for task in tasks]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in futures:
+            if future in done and future.exception() is not None:
+                for pending_future in not_done:
+                    pending_future.cancel()
+                raise future.exception()
+        return [future.result() for future in futures]
+
+
+def map_concurrently(func: Callable[..., T], items: Iterable, max_workers: int = MAX_CONCURRENT_API_CALLS) -> List[T]:
+    """
+    Call func once per item on a bounded thread pool. See `run_concurrently` for ordering and error semantics.
+    :param func: single-argument callable to apply to each item
+    :param items: items to apply func to
+    :param max_workers: maximum number of calls to run at the same time
+    :return: list of results, ordered like the given items
+    """
+    return run_concurrently([partial(func, item) for item in items], max_workers)
@@ -1,3 +1,4 @@
+import functools
 import logging
 from typing import List, Tuple, Dict, Optional, Sequence
 from cloudformation_cli_python_lib import (
@@ -35,6 +36,21 @@ def remove_none_arguments(args):
     return args
 
 
+def _existence_check(func):
+    """
+    Runs the decorated check within `api_helpers.existence_check`, as a resource not found exception is one of its
+    expected results.
+    """
+
+    @functools.wraps(func)
+    def existence_check_wrapper(*args, **kwargs):
+        with api_helpers.existence_check():
+            return func(*args, **kwargs)
+
+    return existence_check_wrapper
+
+
+@_existence_check
 def check_if_get_variables_succeeds(frauddetector_client, variable_name):
     """
     This calls get_variables and returns True if it worked, along with the API response (True, response)
@@ -65,6 +81,7 @@ def check_batch_get_variable_errors(frauddetector_client, variable_names: List[s
         return False, {}
 
 
+@_existence_check
 def check_if_get_entity_types_succeeds(frauddetector_client, entity_type_name):
     """
     This calls get_entity_types and returns True if it worked, along with the API response (True, response)
@@ -81,6 +98,7 @@ def check_if_get_entity_types_succeeds(frauddetector_client, entity_type_name):
         return False, None
 
 
+@_existence_check
 def check_if_get_event_types_succeeds(frauddetector_client, event_type_to_check: str):
     """
     This calls get_event_types and returns True if the response contains an event type: (True, event_type)
@@ -97,6 +115,7 @@ def check_if_get_event_types_succeeds(frauddetector_client, event_type_to_check:
         return False, None
 
 
+@_existence_check
 def check_if_get_labels_succeeds(frauddetector_client, label_name):
     """
     This calls get_labels and returns True if it worked, along with the API response (True, response)
@@ -7,8 +7,11 @@ def test_get_event_type_and_return_model():
     # Arrange
     list_tags_response = {"tags": unit_test_utils.FAKE_TAGS}
     get_event_types_response = {"eventTypes": [unit_test_utils.FAKE_EVENT_TYPE]}
-    get_variables_response_1 = {"variables": [unit_test_utils.FAKE_IP_VARIABLE]}
-    get_variables_response_2 = {"variables": [unit_test_utils.FAKE_EMAIL_VARIABLE]}
+    # batch_get_variable does not preserve request order
+    batch_get_variable_response = {
+        "variables": [unit_test_utils.FAKE_EMAIL_VARIABLE, unit_test_utils.FAKE_IP_VARIABLE],
+        "errors": [],
+    }
     get_labels_response_1 = {"labels": [unit_test_utils.FAKE_FRAUD_LABEL]}
     get_labels_response_2 = {"labels": [unit_test_utils.FAKE_LEGIT_LABEL]}
     get_entity_types_response = {"entityTypes": [unit_test_utils.FAKE_ENTITY_TYPE]}
@@ -16,11 +19,7 @@ def test_get_event_type_and_return_model():
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.list_tags_for_resource = MagicMock(return_value=list_tags_response)
     mock_afd_client.get_event_types = MagicMock(return_value=get_event_types_response)
-    mock_afd_client.get_variables = MagicMock()
-    mock_afd_client.get_variables.side_effect = [
-        get_variables_response_1,
-        get_variables_response_2,
-    ]
+    mock_afd_client.batch_get_variable = MagicMock(return_value=batch_get_variable_response)
     mock_afd_client.get_labels = MagicMock()
     mock_afd_client.get_labels.side_effect = [
         get_labels_response_1,
@@ -36,7 +35,7 @@ def test_get_event_type_and_return_model():
     # Assert
     assert mock_afd_client.list_tags_for_resource.call_count == 6
     assert mock_afd_client.get_event_types.call_count == 1
-    assert mock_afd_client.get_variables.call_count == 2
+    assert mock_afd_client.batch_get_variable.call_count == 1
     assert mock_afd_client.get_labels.call_count == 2
     assert mock_afd_client.get_entity_types.call_count == 1
     assert model_for_outcome == unit_test_utils.create_fake_model(is_output_model=True)
@@ -34,10 +34,12 @@ def _get_tags_for_given_arn(frauddetector_client, arn):
 # Labels
 
 
-def get_model_for_label(frauddetector_client, label):
+def get_model_for_label(frauddetector_client, label, attached_tags=None):
     label_arn = label.get("arn", "")
-    list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=label_arn)
-    attached_tags = list_tags_response.get("tags", [])
+    # tags we just wrote are what is attached, so only read them back when the caller does not know them
+    if attached_tags is None:
+        list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=label_arn)
+        attached_tags = list_tags_response.get("tags", [])
     tag_models = get_tag_models_from_tags(attached_tags)
     return ResourceModel(
         Name=label.get("name", ""),
@@ -49,12 +51,12 @@ def get_model_for_label(frauddetector_client, label):
     )
 
 
-def get_labels_and_return_model_for_label(frauddetector_client, label_name):
+def get_labels_and_return_model_for_label(frauddetector_client, label_name, attached_tags=None):
     try:
         get_labels_response = api_helpers.call_get_labels(frauddetector_client, label_name=label_name)
         labels = get_labels_response.get("labels", [])
         if labels:
-            return get_model_for_label(frauddetector_client, labels[0])
+            return get_model_for_label(frauddetector_client, labels[0], attached_tags)
         # if get labels worked but did not return any labels, we have major problems
         error_msg = f"get_labels for {label_name} worked but did not return any labels!"
         LOG.error(error_msg)
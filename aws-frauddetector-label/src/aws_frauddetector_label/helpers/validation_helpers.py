@@ -1,3 +1,4 @@
+import functools
 import logging
 
 from . import api_helpers
@@ -14,6 +15,21 @@ def remove_none_arguments(args):
     return args
 
 
+def _existence_check(func):
+    """
+    Runs the decorated check within `api_helpers.existence_check`, as a resource not found exception is one of its
+    expected results.
+    """
+
+    @functools.wraps(func)
+    def existence_check_wrapper(*args, **kwargs):
+        with api_helpers.existence_check():
+            return func(*args, **kwargs)
+
+    return existence_check_wrapper
+
+
+@_existence_check
 def check_if_get_labels_succeeds(frauddetector_client, label_name):
     """
     This calls get_labels and returns True if it worked, along with the API response (True, response)
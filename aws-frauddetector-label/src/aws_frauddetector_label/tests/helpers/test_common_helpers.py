@@ -32,7 +32,6 @@ def test_put_label_and_return_progress_no_tags_attribute_success():
 def test_update_tags():
     # Arrange
     list_tags_response = {"tags": unit_test_utils.FAKE_TAGS}
-    fake_tag_keys = [tag.get("key", "") for tag in unit_test_utils.FAKE_TAGS]
 
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.list_tags_for_resource = MagicMock(return_value=list_tags_response)
@@ -47,12 +46,35 @@ def test_update_tags():
     )
 
     # Assert
-    mock_afd_client.untag_resource.assert_called_once_with(resourceARN=unit_test_utils.FAKE_ARN, tagKeys=fake_tag_keys)
+    mock_afd_client.untag_resource.assert_not_called()  # no keys were removed, changed keys are tagged over
     mock_afd_client.tag_resource.assert_called_once_with(
         resourceARN=unit_test_utils.FAKE_ARN, tags=unit_test_utils.FAKE_TAGS_DIFFERENT
     )
 
 
+def test_update_tags_with_attached_tags_untags_only_removed_keys():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.list_tags_for_resource = MagicMock()
+    mock_afd_client.tag_resource = MagicMock()
+    mock_afd_client.untag_resource = MagicMock()
+
+    # Act
+    common_helpers.update_tags(
+        mock_afd_client,
+        unit_test_utils.FAKE_ARN,
+        unit_test_utils.FAKE_TAG_MODELS,
+        attached_tags=unit_test_utils.FAKE_TAGS_DIFFERENT,
+    )
+
+    # Assert
+    mock_afd_client.list_tags_for_resource.assert_not_called()
+    mock_afd_client.tag_resource.assert_called_once_with(
+        resourceARN=unit_test_utils.FAKE_ARN, tags=unit_test_utils.FAKE_TAGS
+    )
+    mock_afd_client.untag_resource.assert_called_once_with(resourceARN=unit_test_utils.FAKE_ARN, tagKeys=["new_key"])
+
+
 def test_update_tags_no_tag_difference_dont_call_apis():
     # Arrange
     list_tags_response = {"tags": unit_test_utils.FAKE_TAGS}
@@ -16,3 +16,18 @@ def test_get_model_for_label():
     # Assert
     assert mock_afd_client.list_tags_for_resource.call_count == 1
     assert model_for_label == unit_test_utils.create_fake_model(is_output_model=True)
+
+
+def test_get_model_for_label_with_attached_tags_skips_list_tags():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.list_tags_for_resource = MagicMock()
+
+    # Act
+    model_for_label = model_helpers.get_model_for_label(
+        mock_afd_client, unit_test_utils.FAKE_FRAUD_LABEL, attached_tags=unit_test_utils.FAKE_TAGS
+    )
+
+    # Assert
+    assert mock_afd_client.list_tags_for_resource.call_count == 0
+    assert model_for_label == unit_test_utils.create_fake_model(is_output_model=True)
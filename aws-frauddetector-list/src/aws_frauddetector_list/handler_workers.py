@@ -1,4 +1,5 @@
 import logging
+import time
 from cloudformation_cli_python_lib import (
     OperationStatus,
     exceptions,
@@ -17,8 +18,14 @@ from .models import ResourceModel
 LOG = logging.getLogger(__name__)
 
 
-def execute_create_list_handler_work(session, model, progress):
+@api_helpers.request_scoped_consistency_waiter
+def execute_create_list_handler_work(session, model, progress, callback_context=None):
     afd_client = client_helpers.get_afd_client(session)
+    deadline = time.monotonic() + common_helpers.LIST_CREATE_TIME_BUDGET_SECONDS
+
+    # A resumed create already created the list, so only continue appending its elements
+    if (callback_context or {}).get(common_helpers.NEXT_ELEMENT_OFFSET, None) is not None:
+        return common_helpers.create_list_and_return_progress(afd_client, model, progress, callback_context, deadline)
 
     # For contract_create_duplicate, we need to fail if resource already exists
     get_lists_metadata_works, _ = validation_helpers.check_if_get_lists_metadata_succeeds(afd_client, model.Name)
@@ -29,14 +36,18 @@ def execute_create_list_handler_work(session, model, progress):
     if model.Arn is not None or model.CreatedTime is not None or model.LastUpdatedTime is not None:
         raise exceptions.InvalidRequest("Error occurred: cannot create read-only properties.")
 
+    # Fail on malformed elements before uploading any of them
+    validation_helpers.validate_list_elements(model.Elements, model.VariableType)
+
     # API does not handle 'None' property gracefully
     if model.Tags is None:
         del model.Tags
 
     # after satisfying contract call create list
-    return common_helpers.create_list_and_return_progress(afd_client, model, progress)
+    return common_helpers.create_list_and_return_progress(afd_client, model, progress, callback_context, deadline)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_update_list_handler_work(session, model, progress, request):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -56,6 +67,9 @@ def execute_update_list_handler_work(session, model, progress, request):
     if model.Name != previous_name:
         raise exceptions.NotUpdatable(f"Error occurred: cannot update create-only property 'Name'")
 
+    # Fail on malformed elements before updating tags or uploading any of them
+    validation_helpers.validate_list_elements(model.Elements, model.VariableType)
+
     if model.Tags is None:
         # API does not handle 'None' property gracefully
         del model.Tags
@@ -65,9 +79,10 @@ def execute_update_list_handler_work(session, model, progress, request):
         common_helpers.update_tags(afd_client, afd_resource_arn=model.Arn, new_tags=model.Tags)
 
     # after satisfying contract call update list
-    return common_helpers.update_list_and_return_progress(afd_client, model, progress)
+    return common_helpers.update_list_and_return_progress(afd_client, model, progress, previous_resource_state)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_delete_list_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -88,6 +103,7 @@ def execute_delete_list_handler_work(session, model, progress):
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_read_list_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
     # read requests only include primary identifier (Arn). Extract Name from Arn
@@ -113,14 +129,24 @@ def execute_read_list_handler_work(session, model, progress):
     return progress
 
 
-def execute_list_list_handler_work(session, model, progress):
+@api_helpers.request_scoped_consistency_waiter
+def execute_list_stabilization_probe_work(session, model) -> bool:
+    # callback polls only need to know the list exists, so skip the elements and tags a full read pulls
+    afd_client = client_helpers.get_afd_client(session)
+    list_name = model.Name or model.Arn.split("/")[-1]
+    get_lists_metadata_works, _ = validation_helpers.check_if_get_lists_metadata_succeeds(afd_client, list_name)
+    return get_lists_metadata_works
+
+
+@api_helpers.request_scoped_consistency_waiter
+def execute_list_list_handler_work(session, model, progress, next_token: str = None):
     afd_client = client_helpers.get_afd_client(session)
 
     try:
-        get_lists_metadata_response = api_helpers.call_get_lists_metadata(afd_client)
-        lists = get_lists_metadata_response.get("lists", [])
-        progress.resourceModels = [model_helpers.get_model_for_list(afd_client, list) for list in lists]
-        progress.status = OperationStatus.SUCCESS
+        list_models, next_token = model_helpers.get_list_models_page(afd_client, next_token)
     except RuntimeError as e:
         raise exceptions.InternalFailure(f"Error occurred: {e}")
+    progress.resourceModels = list_models
+    progress.nextToken = next_token
+    progress.status = OperationStatus.SUCCESS
     return progress
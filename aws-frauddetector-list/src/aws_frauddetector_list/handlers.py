@@ -2,10 +2,12 @@ import logging
 from typing import Any, MutableMapping, Optional
 from cloudformation_cli_python_lib import (
     Action,
+    HandlerErrorCode,
     OperationStatus,
     ProgressEvent,
     Resource,
     SessionProxy,
+    exceptions,
 )
 
 from . import handler_workers
@@ -42,7 +44,7 @@ def create_handler(
             model,
         )
     LOG.info(f"calling create with the following request: {request}")
-    return handler_workers.execute_create_list_handler_work(session, model, progress)
+    return handler_workers.execute_create_list_handler_work(session, model, progress, callback_context)
 
 
 @resource.handler(Action.UPDATE)
@@ -104,7 +106,7 @@ def list_handler(
         resourceModel=model,
     )
     LOG.info(f"calling list with the following request: {request}")
-    return handler_workers.execute_list_list_handler_work(session, model, progress)
+    return handler_workers.execute_list_list_handler_work(session, model, progress, request.nextToken)
 
 
 def _callback_helper(
@@ -116,29 +118,26 @@ def _callback_helper(
     """Define a callback logic used for resource stabilization."""
     LOG.debug("_callback_helper()")
 
-    # Call the Read handler to determine status.
-    rh = read_handler(
-        session,
-        request,
-        callback_context,
-    )
-    LOG.debug(f"Callback: Read handler status: {rh.status}")
-    # Return success if the Read handler returns success.
-    if rh.status == OperationStatus.SUCCESS:
+    # Probe existence only; a full read would pull every list element and tag on each poll.
+    try:
+        list_exists = handler_workers.execute_list_stabilization_probe_work(session, model)
+    except exceptions.BaseHandlerException as e:
+        LOG.warning(f"Callback: stabilization probe failed: {e}")
+        progress = e.to_progress_event()
+        progress.resourceModel = model
+        return progress
+    LOG.debug(f"Callback: stabilization probe found list: {list_exists}")
+    # Return success if the list exists, and fail like the Read handler would if it does not.
+    if list_exists:
         return ProgressEvent(
             status=OperationStatus.SUCCESS,
             resourceModel=model,
         )
-    elif rh.errorCode:
-        return ProgressEvent(
-            status=OperationStatus.FAILED,
-            resourceModel=model,
-        )
-    else:
-        return ProgressEvent(
-            status=OperationStatus.IN_PROGRESS,
-            resourceModel=model,
-        )
+    return ProgressEvent(
+        status=OperationStatus.FAILED,
+        resourceModel=model,
+        errorCode=HandlerErrorCode.NotFound,
+    )
 
 
 def _is_callback(
@@ -1,8 +1,11 @@
 from typing import List
 from . import validation_helpers
 
+import contextlib
 import functools
 import logging
+import random
+import threading
 import time
 
 # Use this logger to forward log messages to CloudWatch Logs.
@@ -13,10 +16,38 @@ LOG.setLevel(level=logging.DEBUG)
 # for page size of 100, 100 pages is 10,000 resources, which is twice the largest default service limit
 MAXIMUM_NUMBER_OF_PAGES = 100
 
-# Number of seconds to wait for eventually consistency for `retry_not_found_exceptions` decorator
-CONSISTENCY_SLEEP_TIME = 1.0
+# Waits for eventual consistency in `retry_not_found_exceptions` back off exponentially (with jitter),
+# from CONSISTENCY_BASE_DELAY seconds up to CONSISTENCY_MAX_DELAY seconds
+CONSISTENCY_BASE_DELAY = 0.25
+CONSISTENCY_MAX_DELAY = 3.0
+
+# Maximum number of attempts of a single api call that keeps raising a resource not found exception
+CONSISTENCY_MAX_ATTEMPTS = 4
+
+# Maximum number of attempts of an existence check, which expects a resource not found exception, see `existence_check`
+EXISTENCE_CHECK_MAX_ATTEMPTS = 2
+
+# Maximum number of seconds a handler invocation spends sleeping for consistency, across all of its api calls.
+# Only the sleeps count against it, and the first retry of an api call is always allowed.
+CONSISTENCY_WAIT_BUDGET = 20.0
+
+# Consistency waiter shared by the api calls of a handler, only set while a `request_scoped_consistency_waiter`
+# function runs
+_consistency_waiter = None
+_consistency_waiter_lock = threading.Lock()
+
+# Set in the threads that are within an `existence_check` context
+_existence_check_state = threading.local()
+
+# Page size for list handler pages of lists
+LISTS_PAGE_SIZE = 20
+
+# Page size of get_list_elements calls, the largest one the API allows
+LIST_ELEMENTS_PAGE_SIZE = 5000
 
 LIST_UPDATE_REPLACE = "REPLACE"
+LIST_UPDATE_APPEND = "APPEND"
+LIST_UPDATE_REMOVE = "REMOVE"
 
 # Wrapper/decorator
 
@@ -36,9 +67,86 @@ def api_call_with_debug_logs(func):
     return log_wrapper
 
 
+class ConsistencyWaiter:
+    """
+    Retries api calls that raise a resource not found exception, to wait for eventually consistent reads.
+    Waits back off exponentially with full jitter, each api call gets at most `max_attempts` attempts,
+    and all sleeps share a total budget of `wait_budget` seconds. The first retry of an api call does not need any
+    budget left. Counts and durations of the waits are kept for logging.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = CONSISTENCY_BASE_DELAY,
+        max_delay: float = CONSISTENCY_MAX_DELAY,
+        max_attempts: int = CONSISTENCY_MAX_ATTEMPTS,
+        wait_budget: float = CONSISTENCY_WAIT_BUDGET,
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.remaining_wait_budget = wait_budget
+        self._lock = threading.Lock()
+        self.wait_count = 0
+        self.give_up_count = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def get_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, not_found_exception, func, *args, **kwargs):
+        return self.call_with_max_attempts(self.max_attempts, not_found_exception, func, *args, **kwargs)
+
+    def call_with_max_attempts(self, max_attempts: int, not_found_exception, func, *args, **kwargs):
+        first_not_found_at = None
+        for attempt in range(1, max_attempts + 1):
+            try:
+                response = func(*args, **kwargs)
+            except not_found_exception:
+                if first_not_found_at is None:
+                    first_not_found_at = time.monotonic()
+                delay = self.get_delay(attempt)
+                if attempt == max_attempts or not self._take_from_wait_budget(delay, is_first_retry=attempt == 1):
+                    LOG.warning(f"giving up waiting for consistency after {attempt} attempts")
+                    self._record_wait(time.monotonic() - first_not_found_at, gave_up=True)
+                    raise
+                LOG.warning(
+                    f"caught a resource not found exception."
+                    f" sleeping {delay:.2f} seconds and retrying api call for consistency..."
+                )
+                time.sleep(delay)
+            else:
+                if first_not_found_at is not None:
+                    self._record_wait(time.monotonic() - first_not_found_at, gave_up=False)
+                return response
+
+    def _take_from_wait_budget(self, delay: float, is_first_retry: bool) -> bool:
+        with self._lock:
+            if delay > self.remaining_wait_budget and not is_first_retry:
+                return False
+            self.remaining_wait_budget -= delay
+            return True
+
+    def _record_wait(self, wait_time: float, gave_up: bool):
+        with self._lock:
+            self.wait_count += 1
+            if gave_up:
+                self.give_up_count += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def __str__(self):
+        return (
+            f"{self.wait_count} waits took {self.total_wait_time:.2f} seconds"
+            f" (longest {self.max_wait_time:.2f} seconds), {self.give_up_count} gave up"
+        )
+
+
 def retry_not_found_exceptions(func):
     """
-    Retries boto3 not found exception for the decorated function.
+    Retries boto3 not found exception for the decorated function, with the consistency waiter of the
+    current `request_scoped_consistency_waiter` function (or a new one outside of it).
     """
 
     @functools.wraps(func)
@@ -55,57 +163,154 @@ def retry_not_found_exceptions(func):
                     "Perhaps the decorator was added to a method that is not supported?"
                 )
                 return func(*args, **kwargs)
+        consistency_waiter = _consistency_waiter or ConsistencyWaiter()
+        if getattr(_existence_check_state, "is_active", False):
+            max_attempts = min(consistency_waiter.max_attempts, EXISTENCE_CHECK_MAX_ATTEMPTS)
+        else:
+            max_attempts = consistency_waiter.max_attempts
+        return consistency_waiter.call_with_max_attempts(
+            max_attempts, afd_client.exceptions.ResourceNotFoundException, func, *args, **kwargs
+        )
+
+    return retry_not_found_exceptions_wrapper
+
+
+@contextlib.contextmanager
+def existence_check():
+    """
+    Limits the `retry_not_found_exceptions` api calls made in the current thread within this context to
+    EXISTENCE_CHECK_MAX_ATTEMPTS attempts each. Meant for checks where a resource not found exception is an expected
+    result, rather than a read after a write that needs waiting for.
+    """
+    was_active = getattr(_existence_check_state, "is_active", False)
+    _existence_check_state.is_active = True
+    try:
+        yield
+    finally:
+        _existence_check_state.is_active = was_active
+
+
+def request_scoped_consistency_waiter(func):
+    """
+    Share one consistency waiter (and its wait budget) between all `retry_not_found_exceptions` api calls made
+    during the decorated function (e.g. a handler), and log its wait metrics when it finishes.
+    Nested uses reuse the waiter of the outermost function.
+    """
+
+    @functools.wraps(func)
+    def request_scoped_consistency_waiter_wrapper(*args, **kwargs):
+        global _consistency_waiter
+        with _consistency_waiter_lock:
+            if _consistency_waiter is not None:
+                is_outermost_scope = False
+            else:
+                is_outermost_scope = True
+                _consistency_waiter = ConsistencyWaiter()
+            consistency_waiter = _consistency_waiter
         try:
             return func(*args, **kwargs)
-        except afd_client.exceptions.ResourceNotFoundException:
-            LOG.warning(
-                f"caught a resource not found exception."
-                f" sleeping {CONSISTENCY_SLEEP_TIME} seconds and retrying api call for consistency..."
-            )
-            time.sleep(CONSISTENCY_SLEEP_TIME)
-            return func(*args, **kwargs)
+        finally:
+            if is_outermost_scope:
+                with _consistency_waiter_lock:
+                    _consistency_waiter = None
+                LOG.info(f"consistency waits for {func.__name__!r}: {consistency_waiter}")
 
-    return retry_not_found_exceptions_wrapper
+    return request_scoped_consistency_waiter_wrapper
+
+
+class PaginationBudgetExceeded(RuntimeError):
+    """
+    Raised when iterating a paginated API call runs out of pages before the API runs out of items.
+    `next_token` can be passed back to the paginated call (as `nextToken`) to continue where it stopped.
+    """
+
+    def __init__(self, item_to_collect: str, max_pages: int, next_token: str):
+        super().__init__(f"stopped collecting {item_to_collect} after {max_pages} pages, more pages remain")
+        self.item_to_collect = item_to_collect
+        self.max_pages = max_pages
+        self.next_token = next_token
 
 
 def paginated_api_call(
     item_to_collect,
-    criteria_to_keep=lambda x, y: True,
+    criteria_to_keep=None,
     max_pages=MAXIMUM_NUMBER_OF_PAGES,
+    max_results=None,
+    unique_key=None,
 ):
     """
     For a method that calls a paginated API (returns an object w/ 'nextToken' key),
     decorate with @paginated_api_call to get an exhaustive list returned,
-    stopping at the maximum number of pages
+    stopping at the maximum number of pages.
+    If pages remain when the maximum number of pages is reached, the returned response keeps its 'nextToken',
+    which can be passed back as `nextToken` to continue collecting items.
+    The decorated method also gets an `iterate` attribute, which yields items page by page so callers can stop early,
+    and raises PaginationBudgetExceeded instead of stopping silently when pages remain.
+    `iterate` calls the API directly, it is not affected by decorators applied on top of this one (caching, retries).
+    The decorated method also gets a `max_results` attribute, holding the requested page size.
+    The decorated method must accept `nextToken` and `maxResults` keyword arguments.
     :param item_to_collect: string representing the key of the object that should be accumulated
-    :param criteria_to_keep: function to determine if items should be kept - item_list, item -> bool
+    :param criteria_to_keep: function to determine if items should be kept - item_list, item -> bool (default keeps all)
     :param max_pages: maximum number of pages allowed
+    :param max_results: page size to request from the API, usually the largest one it allows (default is service's)
+    :param unique_key: function to get a hashable key of an item - items with a key already seen are dropped
     :return: an exhaustive list, containing the accumulated items from all pages from the API call
     """
 
     def paginated_api_call_decorator(func):
-        @functools.wraps(func)
-        def api_call_wrapper(*args, **kwargs):
-            collected_items = []
-            response = func(*args, **kwargs)
-
-            def collect_items_of_interest_from_current_response():
-                for item_of_interest in response.get(item_to_collect, []):
-                    if criteria_to_keep(collected_items, item_of_interest):
-                        collected_items.append(item_of_interest)
-
-            collect_items_of_interest_from_current_response()
+        def get_pages(*args, **kwargs):
+            next_token = kwargs.pop("nextToken", None)
+            if max_results is not None:
+                kwargs["maxResults"] = max_results
+            response = func(*args, nextToken=next_token, **kwargs)
+            yield response
             count = 1
-
             while "nextToken" in response and count < max_pages:
-                next_token = response["nextToken"]
-                response = func(*args, nextToken=next_token, **kwargs)
-                collect_items_of_interest_from_current_response()
+                response = func(*args, nextToken=response["nextToken"], **kwargs)
+                yield response
                 count += 1
 
+        def get_items_of_interest(response, collected_items, seen_keys):
+            for item_of_interest in response.get(item_to_collect, []):
+                if unique_key is not None:
+                    key = unique_key(item_of_interest)
+                    if key in seen_keys:
+                        continue
+                    seen_keys.add(key)
+                if criteria_to_keep is None or criteria_to_keep(collected_items, item_of_interest):
+                    yield item_of_interest
+
+        @functools.wraps(func)
+        def api_call_wrapper(*args, **kwargs):
+            collected_items = []
+            seen_keys = set()
+            response = {}
+            for response in get_pages(*args, **kwargs):
+                for item_of_interest in get_items_of_interest(response, collected_items, seen_keys):
+                    collected_items.append(item_of_interest)
+
+            if "nextToken" in response:
+                LOG.warning(f"stopped collecting {item_to_collect} after {max_pages} pages, more pages remain")
             response[item_to_collect] = collected_items
             return response
 
+        def iterate(*args, **kwargs):
+            # only hold on to the yielded items if criteria_to_keep needs to look at them
+            collected_items = []
+            seen_keys = set()
+            response = {}
+            for response in get_pages(*args, **kwargs):
+                for item_of_interest in get_items_of_interest(response, collected_items, seen_keys):
+                    if criteria_to_keep is not None:
+                        collected_items.append(item_of_interest)
+                    yield item_of_interest
+
+            if "nextToken" in response:
+                raise PaginationBudgetExceeded(item_to_collect, max_pages, response["nextToken"])
+
+        api_call_wrapper.iterate = iterate
+        # exposed so the page size can be checked against the limits of the API
+        api_call_wrapper.max_results = max_results
         return api_call_wrapper
 
     return paginated_api_call_decorator
@@ -147,15 +352,24 @@ def call_update_list(
     list_description: str,
     list_elements: List[str],
     list_tags: List[dict] = None,
+    update_mode: str = LIST_UPDATE_REPLACE,
 ):
-    elements = [] if list_elements is None else list_elements
+    """
+    Call update_list with the given frauddetector client and parameters.
+    :param update_mode: REPLACE (default) replaces all elements with list_elements, APPEND adds list_elements and
+            REMOVE removes list_elements. None leaves elements unchanged and only updates description/variable type.
+    """
+    if update_mode is None:
+        elements = None
+    else:
+        elements = [] if list_elements is None else list_elements
     args = {
         "name": list_name,
         "elements": elements,
         "variableType": list_variable_type,
         "description": list_description,
         "tags": list_tags,
-        "updateMode": LIST_UPDATE_REPLACE,
+        "updateMode": update_mode,
     }
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.update_list(**args)
@@ -165,23 +379,56 @@ def call_update_list(
 
 
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="lists")
+@paginated_api_call(item_to_collect="lists", max_results=50)
+@api_call_with_debug_logs
+def call_get_lists_metadata(frauddetector_client, list_name: str = None, nextToken: str = None, maxResults: int = None):
+    args = {"name": list_name, "nextToken": nextToken, "maxResults": maxResults}
+    validation_helpers.remove_none_arguments(args)
+    return frauddetector_client.get_lists_metadata(**args)
+
+
 @api_call_with_debug_logs
-def call_get_lists_metadata(frauddetector_client, list_name: str = None):
-    args = {"name": list_name}
+def call_get_lists_metadata_page(frauddetector_client, next_token: str = None, max_results: int = LISTS_PAGE_SIZE):
+    """
+    Call get_lists_metadata for a single page of lists with the given frauddetector client.
+    :param frauddetector_client: boto3 frauddetector client to use to make the call
+    :param next_token: token of the page to get, from a previous response (default is the first page)
+    :param max_results: maximum number of lists to return in the page
+    :return: a single page of lists, with a 'nextToken' if there are more pages
+    """
+    args = {"nextToken": next_token, "maxResults": max_results}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_lists_metadata(**args)
 
 
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="elements")
 @api_call_with_debug_logs
-def call_get_list_elements(frauddetector_client, list_name: str):
-    args = {"name": list_name}
+def call_get_list_elements(
+    frauddetector_client, list_name: str, nextToken: str = None, maxResults: int = LIST_ELEMENTS_PAGE_SIZE
+):
+    args = {"name": list_name, "nextToken": nextToken, "maxResults": maxResults}
     validation_helpers.remove_none_arguments(args)
     return frauddetector_client.get_list_elements(**args)
 
 
+def iterate_list_element_pages(frauddetector_client, list_name: str):
+    """
+    Yields the elements of a list one page at a time, following `nextToken` until the last page.
+    Unlike `paginated_api_call`, there is no page cap and pages are not accumulated, so callers only hold one page
+    of elements at a time. Each page call is retried on its own when it raises a resource not found exception.
+    :param frauddetector_client: afd boto3 client to use to make the requests
+    :param list_name: the name of the list to get the elements of
+    :return: a generator of lists of elements
+    """
+    next_token = None
+    while True:
+        response = call_get_list_elements(frauddetector_client, list_name, nextToken=next_token)
+        yield response.get("elements", [])
+        next_token = response.get("nextToken")
+        if not next_token:
+            return
+
+
 # Delete APIs
 
 
@@ -192,16 +439,18 @@ def call_delete_list(frauddetector_client, list_name: str):
 
 # Tagging
 @retry_not_found_exceptions
-@paginated_api_call(item_to_collect="tags")
+@paginated_api_call(item_to_collect="tags", max_results=50)
 @api_call_with_debug_logs
-def call_list_tags_for_resource(frauddetector_client, resource_arn: str):
+def call_list_tags_for_resource(frauddetector_client, resource_arn: str, nextToken: str = None, maxResults: int = None):
     """
     Call list_tags_for_resource for a given ARN with the given frauddetector client.
     :param frauddetector_client: boto3 frauddetector client to use to make the call
     :param resource_arn: ARN of the resource to get tags for
     :return: result has an exhaustive list of tags attached to the resource
     """
-    return frauddetector_client.list_tags_for_resource(resourceARN=resource_arn)
+    args = {"resourceARN": resource_arn, "nextToken": nextToken, "maxResults": maxResults}
+    validation_helpers.remove_none_arguments(args)
+    return frauddetector_client.list_tags_for_resource(**args)
 
 
 @retry_not_found_exceptions
@@ -2,32 +2,78 @@ from cloudformation_cli_python_lib import (
     OperationStatus,
     exceptions,
 )
+from functools import partial
 from typing import List
 from ..models import Tag
 from . import model_helpers, api_helpers
 
 import logging
+import time
 
 # Use this logger to forward log messages to CloudWatch Logs.
 LOG = logging.getLogger(__name__)
 
+# Maximum number of tags per tag_resource call, and of tag keys per untag_resource call
+TAG_RESOURCE_LIMIT = 200
+UNTAG_RESOURCE_LIMIT = 50
+
+# Maximum number of elements sent per APPEND/REMOVE update_list call
+LIST_ELEMENTS_CHUNK_SIZE = 10000
+
+# When more than this fraction of the desired elements changed, replace the whole list instead of APPEND/REMOVE
+LIST_REPLACE_DELTA_FRACTION = 0.5
+
+# Creates stop appending chunks after this many seconds and resume in a callback, as the handler times out at 180 s
+LIST_CREATE_TIME_BUDGET_SECONDS = 120
+LIST_CREATE_CALLBACK_DELAY_SECONDS = 1
+
+# Callback context key holding the offset of the first element a resumed create still has to append
+NEXT_ELEMENT_OFFSET = "nextElementOffset"
+
 # Lists
 
 
-def create_list_and_return_progress(frauddetector_client, model, progress):
+def create_list_and_return_progress(frauddetector_client, model, progress, callback_context=None, deadline=None):
+    """
+    Create the list with its first chunk of elements, then append the rest in chunks of LIST_ELEMENTS_CHUNK_SIZE.
+    Once `deadline` (a `time.monotonic()` timestamp) passes, the offset of the next chunk is checkpointed in the
+    callback context and IN_PROGRESS is returned, so that the next invocation resumes appending from there.
+    """
     try:
-        if hasattr(model, "Tags"):
-            tags = model_helpers.get_tags_from_tag_models(model.Tags)
-        else:
-            tags = None
-        api_helpers.call_create_list(
-            frauddetector_client,
-            list_name=model.Name,
-            list_tags=tags,
-            list_description=model.Description,
-            list_elements=model.Elements,
-            list_variable_type=model.VariableType,
-        )
+        elements = model.Elements or []
+        next_element_offset = (callback_context or {}).get(NEXT_ELEMENT_OFFSET, None)
+        if next_element_offset is None:
+            if hasattr(model, "Tags"):
+                tags = model_helpers.get_tags_from_tag_models(model.Tags)
+            else:
+                tags = None
+            api_helpers.call_create_list(
+                frauddetector_client,
+                list_name=model.Name,
+                list_tags=tags,
+                list_description=model.Description,
+                list_elements=elements[:LIST_ELEMENTS_CHUNK_SIZE],
+                list_variable_type=model.VariableType,
+            )
+            next_element_offset = LIST_ELEMENTS_CHUNK_SIZE
+
+        while next_element_offset < len(elements):
+            if deadline is not None and time.monotonic() >= deadline:
+                LOG.info(f"appended {next_element_offset} of {len(elements)} list elements, continuing in a callback")
+                progress.callbackContext = {NEXT_ELEMENT_OFFSET: next_element_offset}
+                progress.callbackDelaySeconds = LIST_CREATE_CALLBACK_DELAY_SECONDS
+                progress.status = OperationStatus.IN_PROGRESS
+                return progress
+            api_helpers.call_update_list(
+                frauddetector_client,
+                list_name=model.Name,
+                list_description=model.Description,
+                list_variable_type=model.VariableType,
+                list_elements=elements[next_element_offset : next_element_offset + LIST_ELEMENTS_CHUNK_SIZE],
+                update_mode=api_helpers.LIST_UPDATE_APPEND,
+            )
+            next_element_offset += LIST_ELEMENTS_CHUNK_SIZE
+
         _return_success(frauddetector_client, model, progress)
         LOG.info(f"just finished a create list call: {progress.resourceModel}")
     except RuntimeError as e:
@@ -36,15 +82,18 @@ def create_list_and_return_progress(frauddetector_client, model, progress):
     return progress
 
 
-def update_list_and_return_progress(frauddetector_client, model, progress):
+def update_list_and_return_progress(
+    frauddetector_client,
+    model,
+    progress,
+    previous_model=None,
+    replace_delta_fraction: float = LIST_REPLACE_DELTA_FRACTION,
+):
     try:
-        api_helpers.call_update_list(
-            frauddetector_client,
-            list_name=model.Name,
-            list_description=model.Description,
-            list_elements=model.Elements,
-            list_variable_type=model.VariableType,
-        )
+        if previous_model is None:
+            _replace_list_elements(frauddetector_client, model)
+        else:
+            _update_list_elements(frauddetector_client, model, previous_model, replace_delta_fraction)
         _return_success(frauddetector_client, model, progress)
         LOG.info(f"just finished an update list call: {progress.resourceModel}")
     except RuntimeError as e:
@@ -53,8 +102,61 @@ def update_list_and_return_progress(frauddetector_client, model, progress):
     return progress
 
 
+def _update_list_elements(frauddetector_client, model, previous_model, replace_delta_fraction: float):
+    # diff previous and desired elements as sets (element order does not matter for lists)
+    previous_elements = set(previous_model.Elements or [])
+    desired_elements = set(model.Elements or [])
+    elements_to_append = list(desired_elements - previous_elements)
+    elements_to_remove = list(previous_elements - desired_elements)
+
+    delta_size = len(elements_to_append) + len(elements_to_remove)
+    if delta_size > replace_delta_fraction * len(desired_elements):
+        LOG.info(f"{delta_size} of {len(desired_elements)} list elements changed, replacing list elements")
+        _replace_list_elements(frauddetector_client, model)
+        return
+
+    LOG.info(f"appending {len(elements_to_append)} and removing {len(elements_to_remove)} list elements")
+    update_list = partial(
+        api_helpers.call_update_list,
+        frauddetector_client,
+        list_name=model.Name,
+        list_description=model.Description,
+        list_variable_type=model.VariableType,
+    )
+    if not delta_size:
+        if model.Description != previous_model.Description or model.VariableType != previous_model.VariableType:
+            update_list(list_elements=None, update_mode=None)
+        return
+    for i in range(0, len(elements_to_append), LIST_ELEMENTS_CHUNK_SIZE):
+        update_list(
+            list_elements=elements_to_append[i : i + LIST_ELEMENTS_CHUNK_SIZE],
+            update_mode=api_helpers.LIST_UPDATE_APPEND,
+        )
+    for i in range(0, len(elements_to_remove), LIST_ELEMENTS_CHUNK_SIZE):
+        update_list(
+            list_elements=elements_to_remove[i : i + LIST_ELEMENTS_CHUNK_SIZE],
+            update_mode=api_helpers.LIST_UPDATE_REMOVE,
+        )
+
+
+def _replace_list_elements(frauddetector_client, model):
+    api_helpers.call_update_list(
+        frauddetector_client,
+        list_name=model.Name,
+        list_description=model.Description,
+        list_elements=model.Elements,
+        list_variable_type=model.VariableType,
+    )
+
+
 def _return_success(frauddetector_client, model, progress):
-    progress.resourceModel = model_helpers.get_lists_and_return_model_for_list(frauddetector_client, model.Name)
+    # update handlers sync tags before writing, so the model's tags and elements are exactly what the list holds
+    progress.resourceModel = model_helpers.get_lists_and_return_model_for_list(
+        frauddetector_client,
+        model.Name,
+        attached_tags=model_helpers.get_tags_from_tag_models(getattr(model, "Tags", None)) or [],
+        elements=list(model.Elements or []),
+    )
     progress.status = OperationStatus.SUCCESS
     return progress
 
@@ -62,22 +164,48 @@ def _return_success(frauddetector_client, model, progress):
 # Tags
 
 
-def update_tags(frauddetector_client, afd_resource_arn: str, new_tags: List[Tag] = None):
+def update_tags(
+    frauddetector_client,
+    afd_resource_arn: str,
+    new_tags: List[Tag] = None,
+    attached_tags: List[dict] = None,
+):
+    """
+    Reconcile the tags attached to the resource with the desired tags, writing only the delta:
+    added and changed tags are tagged first, then removed keys are untagged, so kept tags never go missing.
+    :param frauddetector_client: afd boto3 client to use to make the requests
+    :param afd_resource_arn: ARN of the resource to update tags for
+    :param new_tags: desired tags (default is None, no tags)
+    :param attached_tags: tags currently attached to the resource, if the caller already listed them
+    """
     try:
-        list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, afd_resource_arn)
-        attached_tags = list_tags_response.get("tags", [])
+        if attached_tags is None:
+            list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, afd_resource_arn)
+            attached_tags = list_tags_response.get("tags", [])
         attached_tags_dict = {tag.get("key", ""): tag.get("value", None) for tag in attached_tags}
 
-        tags_to_add = [model_helpers.get_tags_from_tag_models(new_tags), {}][new_tags is None]
-        tags_to_add_dict = {tag.get("key", ""): tag.get("value", None) for tag in tags_to_add}
+        desired_tags = [] if new_tags is None else model_helpers.get_tags_from_tag_models(new_tags)
+        desired_tags_dict = {tag.get("key", ""): tag.get("value", None) for tag in desired_tags}
 
-        if attached_tags_dict == tags_to_add_dict:
+        if attached_tags_dict == desired_tags_dict:
             return
 
-        if attached_tags:
-            api_helpers.call_untag_resource(frauddetector_client, afd_resource_arn, list(attached_tags_dict.keys()))
-        if tags_to_add_dict:
-            api_helpers.call_tag_resource(frauddetector_client, afd_resource_arn, tags_to_add)
+        tags_to_add = [
+            tag
+            for tag in desired_tags
+            if tag.get("key", "") not in attached_tags_dict
+            or attached_tags_dict[tag.get("key", "")] != tag.get("value", None)
+        ]
+        tag_keys_to_remove = [key for key in attached_tags_dict if key not in desired_tags_dict]
+
+        for i in range(0, len(tags_to_add), TAG_RESOURCE_LIMIT):
+            api_helpers.call_tag_resource(
+                frauddetector_client, afd_resource_arn, tags_to_add[i : i + TAG_RESOURCE_LIMIT]
+            )
+        for i in range(0, len(tag_keys_to_remove), UNTAG_RESOURCE_LIMIT):
+            api_helpers.call_untag_resource(
+                frauddetector_client, afd_resource_arn, tag_keys_to_remove[i : i + UNTAG_RESOURCE_LIMIT]
+            )
 
     except RuntimeError as e:
         raise exceptions.InternalFailure(f"Error occurred while updating tags: {e}")
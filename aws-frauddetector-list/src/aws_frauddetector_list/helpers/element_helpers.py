@@ -0,0 +1,106 @@
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List
+
+import heapq
+
+# Encoding of the element buffers, sorting encoded elements sorts them by code point like str does
+ELEMENT_ENCODING = "utf-8"
+
+
+class CompactStringList(Sequence):
+    """
+    Sorted sequence of unique strings, stored as one contiguous UTF-8 buffer and an array of offsets into it.
+    An element costs its encoded length plus 4 bytes, instead of a str object and a list slot.
+    Strings are only decoded when accessed, e.g. when the resource model gets serialized.
+    List elements are unordered in the schema (insertionOrder is false), so sorting them does not change the model.
+    """
+
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self, buffer: bytes = b"", offsets: array = None):
+        # element i is buffer[offsets[i]:offsets[i + 1]]
+        self._buffer = buffer
+        self._offsets = array("I", [0]) if offsets is None else offsets
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "CompactStringList":
+        return cls._from_sorted_encoded(sorted({string.encode(ELEMENT_ENCODING) for string in strings}))
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Iterable[str]]) -> "CompactStringList":
+        """
+        Build the sequence from pages of strings, compacting each page as it comes in and merging the sorted pages
+        at the end, so only one page of str objects is alive at a time.
+        """
+        compact_pages = [cls.from_strings(page) for page in pages]
+        return cls._from_sorted_encoded(heapq.merge(*[compact_page._iter_encoded() for compact_page in compact_pages]))
+
+    @classmethod
+    def _from_sorted_encoded(cls, sorted_encoded: Iterable[bytes]) -> "CompactStringList":
+        buffer = bytearray()
+        offsets = array("I", [0])
+        previous = None
+        for encoded in sorted_encoded:
+            if encoded == previous:
+                continue
+            buffer += encoded
+            offsets.append(len(buffer))
+            previous = encoded
+        return cls(buffer, offsets)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+    def _get_encoded(self, index: int) -> bytes:
+        return bytes(self._buffer[self._offsets[index] : self._offsets[index + 1]])
+
+    def _iter_encoded(self) -> Iterator[bytes]:
+        for index in range(len(self)):
+            yield self._get_encoded(index)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactStringList index out of range")
+        return self._get_encoded(index).decode(ELEMENT_ENCODING)
+
+    def __iter__(self) -> Iterator[str]:
+        for encoded in self._iter_encoded():
+            yield encoded.decode(ELEMENT_ENCODING)
+
+    def __contains__(self, string) -> bool:
+        if not isinstance(string, str):
+            return False
+        encoded = string.encode(ELEMENT_ENCODING)
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_encoded(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        return low < len(self) and self._get_encoded(low) == encoded
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompactStringList):
+            return self._offsets == other._offsets and self._buffer == other._buffer
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CompactStringList(<{len(self)} elements, {self.nbytes} bytes>)"
+
+    def _serialize(self) -> List[str]:
+        # called by the cloudformation json encoder, when the resource model holding this gets serialized
+        return list(self)
@@ -1,10 +1,10 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from cloudformation_cli_python_lib import (
     exceptions,
 )
 
 from ..models import ResourceModel, Tag
-from . import api_helpers
+from . import api_helpers, element_helpers, util
 
 import logging
 
@@ -37,12 +37,17 @@ def _get_tags_for_given_arn(frauddetector_client, arn):
 # Lists
 
 
-def get_model_for_list(frauddetector_client, list):
+def get_model_for_list(frauddetector_client, list, attached_tags=None, elements=None, include_elements=True):
     list_arn = list.get("arn", "")
     list_name = list.get("name", "")
-    list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=list_arn)
-    list_elements_response = api_helpers.call_get_list_elements(frauddetector_client, list_name)
-    attached_tags = list_tags_response.get("tags", [])
+    # tags and elements we just wrote are what the list holds, so only read them back when the caller does not know them
+    if attached_tags is None:
+        list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=list_arn)
+        attached_tags = list_tags_response.get("tags", [])
+    if elements is None and include_elements:
+        elements = element_helpers.CompactStringList.from_pages(
+            api_helpers.iterate_list_element_pages(frauddetector_client, list_name)
+        )
     tag_models = get_tag_models_from_tags(attached_tags)
     model_to_return = ResourceModel(
         Name=list_name,
@@ -52,19 +57,29 @@ def get_model_for_list(frauddetector_client, list):
         VariableType=list.get("variableType", None),
         CreatedTime=list.get("createdTime", ""),
         LastUpdatedTime=list.get("lastUpdatedTime", ""),
-        Elements=[],
+        Elements=elements,
     )
-    if list_elements_response:
-        model_to_return.Elements = list_elements_response.get("elements", [])
     return model_to_return
 
 
-def get_lists_and_return_model_for_list(frauddetector_client, list_name):
+def get_list_models_page(frauddetector_client, next_token: str = None) -> Tuple[List[ResourceModel], Optional[str]]:
+    # Return a single page of lists per invocation, so list stays bounded regardless of account size.
+    #   Elements are left out: a page of large lists would not fit in the response, and callers can get them with
+    #   the read handler and the primary identifier (Arn) of each model. Tags of the page are read concurrently.
+    get_lists_metadata_response = api_helpers.call_get_lists_metadata_page(frauddetector_client, next_token=next_token)
+    lists = get_lists_metadata_response.get("lists", [])
+    list_models = util.map_concurrently(
+        lambda list_metadata: get_model_for_list(frauddetector_client, list_metadata, include_elements=False), lists
+    )
+    return list_models, get_lists_metadata_response.get("nextToken", None)
+
+
+def get_lists_and_return_model_for_list(frauddetector_client, list_name, attached_tags=None, elements=None):
     try:
         get_lists_metadata_response = api_helpers.call_get_lists_metadata(frauddetector_client, list_name=list_name)
         lists = get_lists_metadata_response.get("lists", [])
         if lists:
-            return get_model_for_list(frauddetector_client, lists[0])
+            return get_model_for_list(frauddetector_client, lists[0], attached_tags, elements)
         # if get variables worked but did not return any variables, we have major problems
         error_msg = f"get_lists_metadata for {list_name} worked but did not return any lists!"
         LOG.error(error_msg)
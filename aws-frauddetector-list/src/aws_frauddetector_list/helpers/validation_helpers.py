@@ -1,3 +1,4 @@
+import functools
 import logging
 from cloudformation_cli_python_lib import (
     exceptions,
@@ -6,10 +7,47 @@ from typing import List
 
 from . import api_helpers
 
+import re
+
 # Use this logger to forward log messages to CloudWatch Logs.
 LOG = logging.getLogger(__name__)
 LOG.setLevel(logging.INFO)
 
+# Limits of list elements, from the resource schema
+LIST_ELEMENTS_MAX_ITEMS = 100000
+LIST_ELEMENT_MAX_LENGTH = 64
+
+# Number of list elements checked by a single regular expression match
+LIST_ELEMENTS_VALIDATION_CHUNK_SIZE = 10000
+
+# Any list element matches the schema's element pattern. None of the patterns match a newline, which is what lets
+# a chunk of elements be matched at once, joined by newlines.
+_LIST_ELEMENT_PATTERN = r"\S+(?: +\S+)*"
+
+# Variable types with a known element format are also held to it, loosely enough to not reject what AFD accepts
+_IPV4_PATTERN = (
+    r"(?:(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+)
+_IPV6_PATTERN = r"[0-9A-Fa-f]{0,4}(?::[0-9A-Fa-f]{0,4}){2,7}(?::" + _IPV4_PATTERN + ")?"
+_LIST_ELEMENT_PATTERNS_BY_VARIABLE_TYPE = {
+    "IP_ADDRESS": f"(?:{_IPV4_PATTERN}(?:/[0-9]{{1,2}})?|{_IPV6_PATTERN}(?:/[0-9]{{1,3}})?)",
+    "EMAIL_ADDRESS": r"[^\s@]+@[^\s@]+",
+    "PHONE_NUMBER": r"\+?[0-9().-]*[0-9][0-9().-]*(?: +[0-9().-]+)*",
+    "CARD_BIN": r"[0-9]{6,8}",
+}
+
+
+def _compile_list_element_matchers(pattern: str):
+    # (one element matcher, newline joined elements matcher)
+    return re.compile(pattern), re.compile(f"(?:{pattern})(?:\n(?:{pattern}))*")
+
+
+_LIST_ELEMENT_MATCHERS = _compile_list_element_matchers(_LIST_ELEMENT_PATTERN)
+_LIST_ELEMENT_MATCHERS_BY_VARIABLE_TYPE = {
+    variable_type: _compile_list_element_matchers(pattern)
+    for variable_type, pattern in _LIST_ELEMENT_PATTERNS_BY_VARIABLE_TYPE.items()
+}
+
 
 def remove_none_arguments(args):
     keys_to_remove = {key for key, value in args.items() if value is None}
@@ -18,6 +56,21 @@ def remove_none_arguments(args):
     return args
 
 
+def _existence_check(func):
+    """
+    Runs the decorated check within `api_helpers.existence_check`, as a resource not found exception is one of its
+    expected results.
+    """
+
+    @functools.wraps(func)
+    def existence_check_wrapper(*args, **kwargs):
+        with api_helpers.existence_check():
+            return func(*args, **kwargs)
+
+    return existence_check_wrapper
+
+
+@_existence_check
 def check_if_get_lists_metadata_succeeds(frauddetector_client, list_name):
     """
     This calls get_lists_metadata and returns True if it worked, along with the API response (True, response)
@@ -32,3 +85,79 @@ def check_if_get_lists_metadata_succeeds(frauddetector_client, list_name):
     except frauddetector_client.exceptions.ResourceNotFoundException as RNF:
         LOG.warning(f"Error getting list {list_name}: {RNF}")
         return False, None
+
+
+def validate_list_elements(elements: List[str], variable_type: str = None):
+    """
+    Checks list elements against the schema limits and the format of the list's variable type before they get sent
+    to AFD, which otherwise fails the whole create_list/update_list call on the first malformed element.
+    :param elements: the elements of the list
+    :param variable_type: the variable type of the list, elements of types without a known format are not checked
+    for one
+    :raises InvalidRequest: listing every offending element index
+    """
+    if not elements:
+        return
+    if len(elements) > LIST_ELEMENTS_MAX_ITEMS:
+        raise exceptions.InvalidRequest(
+            f"Error occurred: a list can hold at most {LIST_ELEMENTS_MAX_ITEMS} elements, got {len(elements)}."
+        )
+    invalid_indices = get_invalid_list_element_indices(elements, variable_type)
+    if invalid_indices:
+        valid_elements = f"valid {variable_type} elements" if variable_type else "valid elements"
+        raise exceptions.InvalidRequest(
+            f"Error occurred: {len(invalid_indices)} list elements are not {valid_elements} "
+            f"(1 to {LIST_ELEMENT_MAX_LENGTH} characters), at indices: {_format_index_ranges(invalid_indices)}."
+        )
+
+
+def get_invalid_list_element_indices(elements: List[str], variable_type: str = None) -> List[int]:
+    """
+    Gets the indices of the elements that are not valid for a list of the given variable type.
+    Elements are checked a chunk at a time with one match over the chunk joined by newlines, and only the elements
+    of a chunk that fails are checked one by one.
+    """
+    element_matcher, chunk_matcher = _LIST_ELEMENT_MATCHERS_BY_VARIABLE_TYPE.get(variable_type, _LIST_ELEMENT_MATCHERS)
+    invalid_indices = []
+    for start in range(0, len(elements), LIST_ELEMENTS_VALIDATION_CHUNK_SIZE):
+        chunk = elements[start : start + LIST_ELEMENTS_VALIDATION_CHUNK_SIZE]
+        if _list_element_chunk_is_valid(chunk, chunk_matcher):
+            continue
+        invalid_indices.extend(
+            start + index for index, element in enumerate(chunk) if not _list_element_is_valid(element, element_matcher)
+        )
+    return invalid_indices
+
+
+def _list_element_chunk_is_valid(chunk: List[str], chunk_matcher) -> bool:
+    try:
+        joined_chunk = "\n".join(chunk)
+    except TypeError:
+        return False
+    # an element holding a newline would pass as two elements, so the chunk must hold exactly the joining newlines
+    return (
+        max(map(len, chunk)) <= LIST_ELEMENT_MAX_LENGTH
+        and joined_chunk.count("\n") == len(chunk) - 1
+        and chunk_matcher.fullmatch(joined_chunk) is not None
+    )
+
+
+def _list_element_is_valid(element, element_matcher) -> bool:
+    return (
+        isinstance(element, str)
+        and len(element) <= LIST_ELEMENT_MAX_LENGTH
+        and element_matcher.fullmatch(element) is not None
+    )
+
+
+def _format_index_ranges(indices: List[int]) -> str:
+    # collapse runs of consecutive indices, so a whole bad chunk does not spell out every index
+    ranges = []
+    range_start = previous = indices[0]
+    for index in indices[1:] + [None]:
+        if index is not None and index == previous + 1:
+            previous = index
+            continue
+        ranges.append(str(range_start) if range_start == previous else f"{range_start}-{previous}")
+        range_start = previous = index
+    return ", ".join(ranges)
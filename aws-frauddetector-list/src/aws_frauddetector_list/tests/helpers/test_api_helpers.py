@@ -3,6 +3,8 @@ from .. import unit_test_utils
 from unittest.mock import MagicMock
 from botocore.exceptions import ClientError
 
+import botocore.session
+
 NUMBER_OF_ITEMS_PER_PAGE = 2
 MAX_PAGES = 10
 
@@ -67,6 +69,102 @@ def test_retry_not_found_exceptions_decorator_multi_page():
     assert mock_afd_client.get_labels.call_count == MAX_PAGES + 1
 
 
+def test_consistency_waiter_gives_up_after_max_attempts():
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.exceptions.ResourceNotFoundException = ClientError
+    mock_afd_client.get_labels = MagicMock(side_effect=ClientError({"Code": "", "Message": ""}, "get_labels"))
+    consistency_waiter = api_helpers.ConsistencyWaiter(base_delay=0, max_attempts=3)
+
+    try:
+        consistency_waiter.call(ClientError, mock_afd_client.get_labels)
+        raise AssertionError("expected ClientError")
+    except ClientError:
+        pass
+
+    assert mock_afd_client.get_labels.call_count == 3
+    assert consistency_waiter.wait_count == 1
+    assert consistency_waiter.give_up_count == 1
+
+
+def test_consistency_waiter_does_not_sleep_past_wait_budget(monkeypatch):
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_labels = MagicMock(side_effect=ClientError({"Code": "", "Message": ""}, "get_labels"))
+    mock_sleep = MagicMock()
+    monkeypatch.setattr(api_helpers.time, "sleep", mock_sleep)
+    consistency_waiter = api_helpers.ConsistencyWaiter(wait_budget=1)
+    consistency_waiter.get_delay = MagicMock(return_value=0.6)
+
+    try:
+        consistency_waiter.call(ClientError, mock_afd_client.get_labels)
+        raise AssertionError("expected ClientError")
+    except ClientError:
+        pass
+
+    # the first retry fits in the budget, the second one does not
+    assert mock_afd_client.get_labels.call_count == 2
+    assert mock_sleep.call_count == 1
+    assert consistency_waiter.give_up_count == 1
+
+
+def test_consistency_waiter_always_allows_first_retry(monkeypatch):
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_labels = MagicMock(
+        side_effect=[ClientError({"Code": "", "Message": ""}, "get_labels"), {"labels": []}]
+    )
+    monkeypatch.setattr(api_helpers.time, "sleep", MagicMock())
+    consistency_waiter = api_helpers.ConsistencyWaiter(wait_budget=0)
+
+    response = consistency_waiter.call(ClientError, mock_afd_client.get_labels)
+
+    assert response == {"labels": []}
+    assert consistency_waiter.give_up_count == 0
+
+
+def test_existence_check_limits_retries_of_not_found_exceptions(monkeypatch):
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.exceptions.ResourceNotFoundException = ClientError
+    mock_afd_client.get_labels = MagicMock(side_effect=ClientError({"Code": "", "Message": ""}, "get_labels"))
+    monkeypatch.setattr(api_helpers.time, "sleep", MagicMock())
+
+    @api_helpers.retry_not_found_exceptions
+    def call_get_labels(frauddetector_client):
+        return frauddetector_client.get_labels()
+
+    with api_helpers.existence_check():
+        try:
+            call_get_labels(mock_afd_client)
+            raise AssertionError("expected ClientError")
+        except ClientError:
+            pass
+
+    assert mock_afd_client.get_labels.call_count == api_helpers.EXISTENCE_CHECK_MAX_ATTEMPTS
+
+
+def test_request_scoped_consistency_waiter_records_waits():
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.exceptions.ResourceNotFoundException = ClientError
+    mock_afd_client.get_labels = MagicMock(
+        side_effect=[ClientError({"Code": "", "Message": ""}, "get_labels"), {"labels": []}, {"labels": []}]
+    )
+
+    @api_helpers.retry_not_found_exceptions
+    def call_get_labels(frauddetector_client):
+        return frauddetector_client.get_labels()
+
+    @api_helpers.request_scoped_consistency_waiter
+    def handler_work():
+        call_get_labels(mock_afd_client)
+        call_get_labels(mock_afd_client)
+        return api_helpers._consistency_waiter
+
+    consistency_waiter = handler_work()
+
+    assert mock_afd_client.get_labels.call_count == 3
+    assert consistency_waiter.wait_count == 1
+    assert consistency_waiter.give_up_count == 0
+    assert api_helpers._consistency_waiter is None
+
+
 def test_paginated_api_call_not_infinite_loop():
     test_fn = MagicMock()
     test_fn.side_effect = [
@@ -113,6 +211,95 @@ def test_paginated_api_call_matches_criteria():
     assert test_fn.call_count == MAX_PAGES
 
 
+def test_paginated_api_call_requests_max_results_and_keeps_next_token_when_pages_remain():
+    test_fn = MagicMock()
+    test_fn.side_effect = [
+        {
+            "nextToken": f"token{i}",
+            "someThings": [{"someAttribute": f"{i}.{j}"} for j in range(NUMBER_OF_ITEMS_PER_PAGE)],
+        }
+        for i in range(MAX_PAGES * 2)
+    ]
+
+    @api_helpers.paginated_api_call("someThings", max_pages=MAX_PAGES, max_results=NUMBER_OF_ITEMS_PER_PAGE)
+    def call_test_fn(nextToken=None, maxResults=None):
+        return test_fn(nextToken=nextToken, maxResults=maxResults)
+
+    response = call_test_fn()
+
+    assert len(response["someThings"]) == NUMBER_OF_ITEMS_PER_PAGE * MAX_PAGES
+    assert response["nextToken"] == f"token{MAX_PAGES - 1}"
+    assert test_fn.call_args_list[0][1] == {"nextToken": None, "maxResults": NUMBER_OF_ITEMS_PER_PAGE}
+    assert test_fn.call_args_list[1][1] == {"nextToken": "token0", "maxResults": NUMBER_OF_ITEMS_PER_PAGE}
+
+    # the continuation token picks up where the budget ran out
+    continued_response = call_test_fn(nextToken=response["nextToken"])
+    assert test_fn.call_args_list[MAX_PAGES][1]["nextToken"] == f"token{MAX_PAGES - 1}"
+    assert continued_response["someThings"][0]["someAttribute"] == f"{MAX_PAGES}.0"
+
+
+def test_paginated_api_call_iterate_stops_early():
+    test_fn = MagicMock()
+    test_fn.side_effect = [
+        {
+            "nextToken": "notNone",
+            "someThings": [{"someAttribute": f"{i}.{j}"} for j in range(NUMBER_OF_ITEMS_PER_PAGE)],
+        }
+        for i in range(MAX_PAGES)
+    ]
+
+    @api_helpers.paginated_api_call("someThings", max_pages=MAX_PAGES)
+    def call_test_fn(nextToken=None):
+        return test_fn(nextToken)
+
+    found = next(item for item in call_test_fn.iterate() if item["someAttribute"] == "1.0")
+
+    assert found == {"someAttribute": "1.0"}
+    assert test_fn.call_count == 2
+
+
+def test_paginated_api_call_iterate_raises_when_pages_remain():
+    test_fn = MagicMock()
+    test_fn.side_effect = [
+        {
+            "nextToken": f"token{i}",
+            "someThings": [{"someAttribute": f"{i}.{j}"} for j in range(NUMBER_OF_ITEMS_PER_PAGE)],
+        }
+        for i in range(MAX_PAGES + 10)
+    ]
+
+    @api_helpers.paginated_api_call("someThings", max_pages=MAX_PAGES)
+    def call_test_fn(nextToken=None):
+        return test_fn(nextToken)
+
+    collected_items = []
+    try:
+        for item in call_test_fn.iterate():
+            collected_items.append(item)
+        raise AssertionError("expected PaginationBudgetExceeded")
+    except api_helpers.PaginationBudgetExceeded as e:
+        assert e.next_token == f"token{MAX_PAGES - 1}"
+
+    assert len(collected_items) == NUMBER_OF_ITEMS_PER_PAGE * MAX_PAGES
+    assert test_fn.call_count == MAX_PAGES
+
+
+def test_paginated_api_call_drops_items_with_duplicate_unique_key():
+    test_fn = MagicMock()
+    test_fn.side_effect = [
+        {"nextToken": "notNone", "someThings": [{"name": "a"}, {"name": "b"}]},
+        {"someThings": [{"name": "b"}, {"name": "c"}]},
+    ]
+
+    @api_helpers.paginated_api_call("someThings", unique_key=lambda item: item["name"])
+    def call_test_fn(nextToken=None):
+        return test_fn(nextToken)
+
+    response = call_test_fn()
+
+    assert [item["name"] for item in response["someThings"]] == ["a", "b", "c"]
+
+
 def test_get_calls(monkeypatch):
     required_arguments = [
         {
@@ -211,3 +398,27 @@ def _test_api_helper_call(
     if should_check_validation_helper:
         mock_remove_none_arguments.assert_called_once()
     mock_api_call.assert_called_once()
+
+
+def _is_within_max_results_limits(operation_name: str, max_results: int) -> bool:
+    # botocore only checks the minimum on the client, the service rejects page sizes above the maximum
+    service_model = botocore.session.get_session().get_service_model("frauddetector")
+    limits = service_model.operation_model(operation_name).input_shape.members["maxResults"].metadata
+    return limits["min"] <= max_results <= limits["max"]
+
+
+def test_paginated_api_calls_request_page_sizes_within_api_limits():
+    # Arrange - call_<operation> functions call the <operation> API
+    paginated_calls = {
+        name: func
+        for name, func in vars(api_helpers).items()
+        if name.startswith("call_") and getattr(func, "max_results", None) is not None
+    }
+
+    # Assert
+    assert "call_list_tags_for_resource" in paginated_calls
+    for name, func in paginated_calls.items():
+        operation_name = "".join(word.capitalize() for word in name[len("call_") :].split("_"))
+        assert _is_within_max_results_limits(operation_name, func.max_results), name
+    assert _is_within_max_results_limits("GetListsMetadata", api_helpers.LISTS_PAGE_SIZE)
+    assert _is_within_max_results_limits("GetListElements", api_helpers.LIST_ELEMENTS_PAGE_SIZE)
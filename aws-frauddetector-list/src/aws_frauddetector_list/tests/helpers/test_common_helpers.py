@@ -29,6 +29,34 @@ def test_create_list_and_return_progress_no_tags_attribute_success():
     _act_and_assert_create_list_for_given_model(mock_afd_client, input_model, output_model, progress)
 
 
+def test_create_list_and_return_progress_appends_chunks_and_checkpoints_after_deadline(monkeypatch):
+    # Arrange
+    mock_afd_client, input_model, output_model, progress = _setup_list_test()
+    mock_afd_client.update_list = MagicMock()
+    monkeypatch.setattr(common_helpers, "LIST_ELEMENTS_CHUNK_SIZE", 2)
+    input_model.Elements = [f"element_{i}" for i in range(5)]
+
+    # Act
+    first_result: ProgressEvent = common_helpers.create_list_and_return_progress(
+        mock_afd_client, input_model, progress, deadline=0
+    )
+    callback_context = first_result.callbackContext
+    second_result: ProgressEvent = common_helpers.create_list_and_return_progress(
+        mock_afd_client, input_model, unit_test_utils.create_in_progress_progress(input_model), callback_context
+    )
+
+    # Assert
+    assert first_result.status == OperationStatus.IN_PROGRESS
+    assert callback_context == {common_helpers.NEXT_ELEMENT_OFFSET: 2}
+    assert mock_afd_client.create_list.call_args[1]["elements"] == ["element_0", "element_1"]
+    assert mock_afd_client.create_list.call_count == 1  # a resumed create only appends
+    assert [call[1]["elements"] for call in mock_afd_client.update_list.call_args_list] == [
+        ["element_2", "element_3"],
+        ["element_4"],
+    ]
+    assert second_result.status == OperationStatus.SUCCESS
+
+
 def test_update_list_and_return_progress_success():
     # Arrange
     mock_afd_client, input_model, output_model, progress = _setup_list_test()
@@ -49,10 +77,65 @@ def test_update_list_and_return_progress_no_tags_attribute_success():
     _act_and_assert_update_list_for_given_model(mock_afd_client, input_model, output_model, progress)
 
 
+def test_update_list_and_return_progress_small_delta_appends_and_removes_elements(monkeypatch):
+    # Arrange
+    mock_afd_client, input_model, output_model, progress = _setup_list_test()
+    mock_afd_client.update_list = MagicMock()
+    monkeypatch.setattr(common_helpers, "LIST_ELEMENTS_CHUNK_SIZE", 2)
+    previous_model = unit_test_utils.create_fake_model()
+    previous_model.Elements = [f"10.0.0.{i}" for i in range(10)]
+    input_model.Elements = previous_model.Elements[1:] + ["10.0.1.0", "10.0.1.1", "10.0.1.2"]
+
+    # Act
+    result = common_helpers.update_list_and_return_progress(mock_afd_client, input_model, progress, previous_model)
+
+    # Assert
+    assert result.status == OperationStatus.SUCCESS
+    update_modes = [call[1].get("updateMode") for call in mock_afd_client.update_list.call_args_list]
+    assert update_modes == ["APPEND", "APPEND", "REMOVE"]
+    appended_elements = {
+        element
+        for call in mock_afd_client.update_list.call_args_list
+        if call[1].get("updateMode") == "APPEND"
+        for element in call[1].get("elements")
+    }
+    assert appended_elements == {"10.0.1.0", "10.0.1.1", "10.0.1.2"}
+    assert mock_afd_client.update_list.call_args_list[-1][1].get("elements") == ["10.0.0.0"]
+
+
+def test_update_list_and_return_progress_large_delta_replaces_elements():
+    # Arrange
+    mock_afd_client, input_model, output_model, progress = _setup_list_test()
+    mock_afd_client.update_list = MagicMock()
+    previous_model = unit_test_utils.create_fake_model()
+    previous_model.Elements = ["10.0.0.1", "10.0.0.2"]
+    input_model.Elements = ["10.0.1.1", "10.0.1.2"]
+
+    # Act
+    common_helpers.update_list_and_return_progress(mock_afd_client, input_model, progress, previous_model)
+
+    # Assert
+    mock_afd_client.update_list.assert_called_once()
+    assert mock_afd_client.update_list.call_args[1].get("updateMode") == "REPLACE"
+    assert mock_afd_client.update_list.call_args[1].get("elements") == input_model.Elements
+
+
+def test_update_list_and_return_progress_no_changes_does_not_update_list():
+    # Arrange
+    mock_afd_client, input_model, output_model, progress = _setup_list_test()
+    mock_afd_client.update_list = MagicMock()
+    previous_model = unit_test_utils.create_fake_model()
+
+    # Act
+    common_helpers.update_list_and_return_progress(mock_afd_client, input_model, progress, previous_model)
+
+    # Assert
+    mock_afd_client.update_list.assert_not_called()
+
+
 def test_update_tags():
     # Arrange
     list_tags_response = {"tags": unit_test_utils.FAKE_TAGS}
-    fake_tag_keys = [tag.get("key", "") for tag in unit_test_utils.FAKE_TAGS]
 
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.list_tags_for_resource = MagicMock(return_value=list_tags_response)
@@ -67,12 +150,35 @@ def test_update_tags():
     )
 
     # Assert
-    mock_afd_client.untag_resource.assert_called_once_with(resourceARN=unit_test_utils.FAKE_ARN, tagKeys=fake_tag_keys)
+    mock_afd_client.untag_resource.assert_not_called()  # no keys were removed, changed keys are tagged over
     mock_afd_client.tag_resource.assert_called_once_with(
         resourceARN=unit_test_utils.FAKE_ARN, tags=unit_test_utils.FAKE_TAGS_DIFFERENT
     )
 
 
+def test_update_tags_with_attached_tags_untags_only_removed_keys():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.list_tags_for_resource = MagicMock()
+    mock_afd_client.tag_resource = MagicMock()
+    mock_afd_client.untag_resource = MagicMock()
+
+    # Act
+    common_helpers.update_tags(
+        mock_afd_client,
+        unit_test_utils.FAKE_ARN,
+        unit_test_utils.FAKE_TAG_MODELS,
+        attached_tags=unit_test_utils.FAKE_TAGS_DIFFERENT,
+    )
+
+    # Assert
+    mock_afd_client.list_tags_for_resource.assert_not_called()
+    mock_afd_client.tag_resource.assert_called_once_with(
+        resourceARN=unit_test_utils.FAKE_ARN, tags=unit_test_utils.FAKE_TAGS
+    )
+    mock_afd_client.untag_resource.assert_called_once_with(resourceARN=unit_test_utils.FAKE_ARN, tagKeys=["new_key"])
+
+
 def test_update_tags_no_tag_difference_dont_call_apis():
     # Arrange
     list_tags_response = {"tags": unit_test_utils.FAKE_TAGS}
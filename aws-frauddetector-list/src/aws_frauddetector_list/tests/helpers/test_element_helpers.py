@@ -0,0 +1,47 @@
+from ...helpers import element_helpers
+
+import json
+
+from cloudformation_cli_python_lib.utils import KitchenSinkEncoder
+
+
+def test_compact_string_list_from_pages_sorts_and_deduplicates_across_pages():
+    # Arrange
+    pages = [["b", "a", "é"], ["c", "a"], []]
+
+    # Act
+    compact_elements = element_helpers.CompactStringList.from_pages(pages)
+
+    # Assert
+    assert len(compact_elements) == 4
+    assert compact_elements == ["a", "b", "c", "é"]
+    assert compact_elements[-1] == "é"
+    assert compact_elements[1:3] == ["b", "c"]
+    assert "c" in compact_elements
+    assert "d" not in compact_elements
+    assert compact_elements == element_helpers.CompactStringList.from_strings(["é", "c", "b", "a"])
+
+
+def test_compact_string_list_is_empty_and_serializes_to_a_list_of_strings():
+    # Arrange
+    empty_elements = element_helpers.CompactStringList.from_pages([])
+    compact_elements = element_helpers.CompactStringList.from_strings(["2", "1"])
+
+    # Act
+    serialized = json.dumps({"Elements": compact_elements}, cls=KitchenSinkEncoder)
+
+    # Assert
+    assert not empty_elements
+    assert empty_elements == []
+    assert json.loads(serialized) == {"Elements": ["1", "2"]}
+
+
+def test_compact_string_list_stores_elements_in_one_buffer_and_offsets():
+    # Arrange
+    strings = [f"element_{i:06d}" for i in range(1000)]
+
+    # Act
+    compact_elements = element_helpers.CompactStringList.from_strings(strings)
+
+    # Assert
+    assert compact_elements.nbytes == sum(len(string) for string in strings) + 4 * (len(strings) + 1)
@@ -18,3 +18,61 @@ def test_get_model_for_list():
     # Assert
     assert mock_afd_client.list_tags_for_resource.call_count == 1
     assert model_for_list == unit_test_utils.create_fake_model(is_output_model=True)
+
+
+def test_get_model_for_list_with_written_tags_and_elements_skips_reads():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.list_tags_for_resource = MagicMock()
+    mock_afd_client.get_list_elements = MagicMock()
+
+    # Act
+    model_for_list = model_helpers.get_model_for_list(
+        mock_afd_client, unit_test_utils.FAKE_LIST, attached_tags=unit_test_utils.FAKE_TAGS, elements=[]
+    )
+
+    # Assert
+    assert mock_afd_client.list_tags_for_resource.call_count == 0
+    assert mock_afd_client.get_list_elements.call_count == 0
+    assert model_for_list == unit_test_utils.create_fake_model(is_output_model=True)
+
+
+def test_get_model_for_list_reads_every_page_of_elements():
+    # Arrange
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.list_tags_for_resource = MagicMock(return_value={"tags": unit_test_utils.FAKE_TAGS})
+    mock_afd_client.get_list_elements = MagicMock(
+        side_effect=[
+            {"elements": ["b", "a"], "nextToken": "page_2"},
+            {"elements": ["c", "a"], "nextToken": "page_3"},
+            {"elements": ["d"]},
+        ]
+    )
+
+    # Act
+    model_for_list = model_helpers.get_model_for_list(mock_afd_client, unit_test_utils.FAKE_LIST)
+
+    # Assert
+    assert mock_afd_client.get_list_elements.call_count == 3
+    assert mock_afd_client.get_list_elements.call_args[1]["nextToken"] == "page_3"
+    assert model_for_list.Elements == ["a", "b", "c", "d"]
+
+
+def test_get_list_models_page_returns_page_without_elements_and_next_token():
+    # Arrange
+    lists = [dict(unit_test_utils.FAKE_LIST, name=f"list_{i}", arn=f"{unit_test_utils.FAKE_ARN}_{i}") for i in range(3)]
+    mock_afd_client = unit_test_utils.create_mock_afd_client()
+    mock_afd_client.get_lists_metadata = MagicMock(return_value={"lists": lists, "nextToken": "page_2"})
+    mock_afd_client.list_tags_for_resource = MagicMock(return_value={"tags": unit_test_utils.FAKE_TAGS})
+    mock_afd_client.get_list_elements = MagicMock()
+
+    # Act
+    list_models, next_token = model_helpers.get_list_models_page(mock_afd_client, "page_1")
+
+    # Assert
+    mock_afd_client.get_lists_metadata.assert_called_once_with(nextToken="page_1", maxResults=20)
+    assert mock_afd_client.list_tags_for_resource.call_count == 3
+    assert mock_afd_client.get_list_elements.call_count == 0
+    assert [list_model.Name for list_model in list_models] == ["list_0", "list_1", "list_2"]
+    assert all(list_model.Elements is None for list_model in list_models)
+    assert next_token == "page_2"
@@ -0,0 +1,35 @@
+from ...helpers import util
+from cloudformation_cli_python_lib import exceptions
+
+import time
+
+
+def test_map_concurrently_preserves_order():
+    # Arrange - later items finish first
+    def slow_identity(item):
+        time.sleep(0.01 * (5 - item))
+        return item
+
+    # Act
+    result = util.map_concurrently(slow_identity, range(5), max_workers=5)
+
+    # Assert
+    assert result == [0, 1, 2, 3, 4]
+
+
+def test_run_concurrently_propagates_first_exception():
+    # Arrange
+    def raise_not_found():
+        raise exceptions.NotFound("list", "list")
+
+    tasks = [lambda: 1, raise_not_found, lambda: 3]
+
+    # Act
+    caught_exception = None
+    try:
+        util.run_concurrently(tasks)
+    except exceptions.NotFound as exception:
+        caught_exception = exception
+
+    # Assert
+    assert caught_exception is not None
@@ -1,19 +1,19 @@
 from ...helpers import validation_helpers
 from botocore.exceptions import ClientError
+from cloudformation_cli_python_lib import exceptions
 from unittest.mock import MagicMock
 from .. import unit_test_utils
 
+import pytest
+
 
 def test_check_if_get_lists_metadata_succeeds_client_error_returns_false():
     # Arrange
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.get_lists_metadata = MagicMock()
     mock_afd_client.exceptions.ResourceNotFoundException = ClientError
-    # We retry NotFound (for consistency), so return not found twice
-    mock_afd_client.get_lists_metadata.side_effect = [
-        ClientError({"Code": "", "Message": ""}, "get_lists_metadata"),
-        ClientError({"Code": "", "Message": ""}, "get_lists_metadata"),
-    ]
+    # We retry NotFound (for consistency), so return not found on every attempt
+    mock_afd_client.get_lists_metadata.side_effect = ClientError({"Code": "", "Message": ""}, "get_lists_metadata")
 
     # Act
     result = validation_helpers.check_if_get_lists_metadata_succeeds(mock_afd_client, unit_test_utils.FAKE_NAME)
@@ -38,3 +38,71 @@ def test_check_if_get_lists_metadata_succeeds_client_success_returns_true_and_re
     assert len(result) == 2
     assert result[0] is True
     assert result[1] is get_lists_metadata_response
+
+
+def test_validate_list_elements_valid_elements_of_each_variable_type_pass():
+    # Arrange
+    elements_by_variable_type = {
+        "IP_ADDRESS": ["192.0.2.1", "10.0.0.0/8", "2001:db8::ff00:42:8329", "::1"],
+        "EMAIL_ADDRESS": ["fake.user@example.com"],
+        "PHONE_NUMBER": ["+1 (555) 010-0100", "5550100"],
+        "CARD_BIN": ["411111", "41111111"],
+        None: ["any element", "with single spaces"],
+    }
+
+    # Act
+    for variable_type, elements in elements_by_variable_type.items():
+        validation_helpers.validate_list_elements(elements, variable_type)
+
+
+def test_get_invalid_list_element_indices_finds_every_invalid_element_across_chunks():
+    # Arrange
+    elements = ["192.0.2.1"] * (validation_helpers.LIST_ELEMENTS_VALIDATION_CHUNK_SIZE * 3)
+    invalid_elements = {3: "256.0.0.1", 4: "192.0.2.1\n192.0.2.2", 5: "", 6: "1" * 65, 7: 192, 25001: "not an ip"}
+    for index, invalid_element in invalid_elements.items():
+        elements[index] = invalid_element
+
+    # Act
+    invalid_indices = validation_helpers.get_invalid_list_element_indices(elements, "IP_ADDRESS")
+
+    # Assert
+    assert invalid_indices == sorted(invalid_elements.keys())
+
+
+def test_validate_list_elements_raises_invalid_request_with_every_offending_index():
+    # Arrange
+    elements = ["411111", "4111", "41x111", "411111", "4"]
+
+    # Act
+    with pytest.raises(exceptions.InvalidRequest) as excinfo:
+        validation_helpers.validate_list_elements(elements, "CARD_BIN")
+
+    # Assert
+    assert "not valid CARD_BIN elements" in str(excinfo.value)
+    assert "3 list elements" in str(excinfo.value)
+    assert "indices: 1-2, 4." in str(excinfo.value)
+
+
+def test_validate_list_elements_without_variable_type_raises_invalid_request():
+    # Arrange
+    elements = ["element", "", "element"]
+
+    # Act
+    with pytest.raises(exceptions.InvalidRequest) as excinfo:
+        validation_helpers.validate_list_elements(elements)
+
+    # Assert
+    assert "1 list elements are not valid elements (" in str(excinfo.value)
+    assert "indices: 1." in str(excinfo.value)
+
+
+def test_validate_list_elements_too_many_elements_raises_invalid_request():
+    # Arrange
+    elements = ["element"] * (validation_helpers.LIST_ELEMENTS_MAX_ITEMS + 1)
+
+    # Act
+    with pytest.raises(exceptions.InvalidRequest) as excinfo:
+        validation_helpers.validate_list_elements(elements)
+
+    # Assert
+    assert str(validation_helpers.LIST_ELEMENTS_MAX_ITEMS) in str(excinfo.value)
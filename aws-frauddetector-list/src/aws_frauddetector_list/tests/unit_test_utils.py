@@ -162,5 +162,9 @@ def create_mock_afd_client():
 def create_mock_session():
     mock_session_impl = MagicMock(name="mock_session_impl")
     mock_session_impl.client = MagicMock(return_value=MagicMock(name="mock_afd_client"))
+    mock_frozen_credentials = mock_session_impl.get_credentials().get_frozen_credentials()
+    mock_frozen_credentials.access_key = "access_key"
+    mock_frozen_credentials.secret_key = "secret_key"
+    mock_frozen_credentials.token = "token"
     mock_session = SessionProxy(session=mock_session_impl)
     return mock_session
@@ -34,10 +34,12 @@ def _get_tags_for_given_arn(frauddetector_client, arn):
 # Outcomes
 
 
-def get_model_for_outcome(frauddetector_client, outcome):
+def get_model_for_outcome(frauddetector_client, outcome, attached_tags=None):
     outcome_arn = outcome.get("arn", "")
-    list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=outcome_arn)
-    attached_tags = list_tags_response.get("tags", [])
+    # tags we just wrote are what is attached, so only read them back when the caller does not know them
+    if attached_tags is None:
+        list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=outcome_arn)
+        attached_tags = list_tags_response.get("tags", [])
     tag_models = get_tag_models_from_tags(attached_tags)
     return ResourceModel(
         Name=outcome.get("name", ""),
@@ -49,12 +51,12 @@ def get_model_for_outcome(frauddetector_client, outcome):
     )
 
 
-def get_outcomes_and_return_model_for_outcome(frauddetector_client, outcome_name):
+def get_outcomes_and_return_model_for_outcome(frauddetector_client, outcome_name, attached_tags=None):
     try:
         get_outcomes_response = api_helpers.call_get_outcomes(frauddetector_client, outcome_name=outcome_name)
         outcomes = get_outcomes_response.get("outcomes", [])
         if outcomes:
-            return get_model_for_outcome(frauddetector_client, outcomes[0])
+            return get_model_for_outcome(frauddetector_client, outcomes[0], attached_tags)
         # if get outcomes worked but did not return any outcomes, we have major problems
         error_msg = f"get_outcomes for {outcome_name} worked but did not return any outcomes!"
         LOG.error(error_msg)
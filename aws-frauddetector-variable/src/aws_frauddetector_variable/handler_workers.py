@@ -17,6 +17,7 @@ from .models import ResourceModel
 LOG = logging.getLogger(__name__)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_create_variable_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -37,6 +38,7 @@ def execute_create_variable_handler_work(session, model, progress):
     return common_helpers.create_variable_and_return_progress(afd_client, model, progress)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_update_variable_handler_work(session, model, progress, request):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -67,6 +69,7 @@ def execute_update_variable_handler_work(session, model, progress, request):
     return common_helpers.update_variable_and_return_progress(afd_client, model, progress)
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_delete_variable_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -85,6 +88,7 @@ def execute_delete_variable_handler_work(session, model, progress):
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_read_variable_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
     # read requests only include primary identifier (Arn). Extract Name from Arn
@@ -110,6 +114,7 @@ def execute_read_variable_handler_work(session, model, progress):
     return progress
 
 
+@api_helpers.request_scoped_consistency_waiter
 def execute_list_variable_handler_work(session, model, progress):
     afd_client = client_helpers.get_afd_client(session)
 
@@ -11,26 +11,61 @@ import logging
 # Use this logger to forward log messages to CloudWatch Logs.
 LOG = logging.getLogger(__name__)
 
+# Maximum number of tags per tag_resource call, and of tag keys per untag_resource call
+TAG_RESOURCE_LIMIT = 200
+UNTAG_RESOURCE_LIMIT = 50
+
 
 # Tags
 
 
-def update_tags(frauddetector_client, afd_resource_arn: str, new_tags: List[Tag] = None):
+def _get_written_tags(model):
+    # update handlers sync tags before writing, so the model's tags are exactly what is attached
+    return model_helpers.get_tags_from_tag_models(getattr(model, "Tags", None)) or []
+
+
+def update_tags(
+    frauddetector_client,
+    afd_resource_arn: str,
+    new_tags: List[Tag] = None,
+    attached_tags: List[dict] = None,
+):
+    """
+    Reconcile the tags attached to the resource with the desired tags, writing only the delta:
+    added and changed tags are tagged first, then removed keys are untagged, so kept tags never go missing.
+    :param frauddetector_client: afd boto3 client to use to make the requests
+    :param afd_resource_arn: ARN of the resource to update tags for
+    :param new_tags: desired tags (default is None, no tags)
+    :param attached_tags: tags currently attached to the resource, if the caller already listed them
+    """
     try:
-        list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, afd_resource_arn)
-        attached_tags = list_tags_response.get("tags", [])
+        if attached_tags is None:
+            list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, afd_resource_arn)
+            attached_tags = list_tags_response.get("tags", [])
         attached_tags_dict = {tag.get("key", ""): tag.get("value", None) for tag in attached_tags}
 
-        tags_to_add = [model_helpers.get_tags_from_tag_models(new_tags), {}][new_tags is None]
-        tags_to_add_dict = {tag.get("key", ""): tag.get("value", None) for tag in tags_to_add}
+        desired_tags = [] if new_tags is None else model_helpers.get_tags_from_tag_models(new_tags)
+        desired_tags_dict = {tag.get("key", ""): tag.get("value", None) for tag in desired_tags}
 
-        if attached_tags_dict == tags_to_add_dict:
+        if attached_tags_dict == desired_tags_dict:
             return
 
-        if attached_tags:
-            api_helpers.call_untag_resource(frauddetector_client, afd_resource_arn, list(attached_tags_dict.keys()))
-        if tags_to_add_dict:
-            api_helpers.call_tag_resource(frauddetector_client, afd_resource_arn, tags_to_add)
+        tags_to_add = [
+            tag
+            for tag in desired_tags
+            if tag.get("key", "") not in attached_tags_dict
+            or attached_tags_dict[tag.get("key", "")] != tag.get("value", None)
+        ]
+        tag_keys_to_remove = [key for key in attached_tags_dict if key not in desired_tags_dict]
+
+        for i in range(0, len(tags_to_add), TAG_RESOURCE_LIMIT):
+            api_helpers.call_tag_resource(
+                frauddetector_client, afd_resource_arn, tags_to_add[i : i + TAG_RESOURCE_LIMIT]
+            )
+        for i in range(0, len(tag_keys_to_remove), UNTAG_RESOURCE_LIMIT):
+            api_helpers.call_untag_resource(
+                frauddetector_client, afd_resource_arn, tag_keys_to_remove[i : i + UNTAG_RESOURCE_LIMIT]
+            )
 
     except RuntimeError as e:
         raise exceptions.InternalFailure(f"Error occurred while updating tags: {e}")
@@ -56,7 +91,7 @@ def create_variable_and_return_progress(frauddetector_client, model, progress):
             variable_description=model.Description,
         )
         progress.resourceModel = model_helpers.get_variables_and_return_model_for_variable(
-            frauddetector_client, model.Name
+            frauddetector_client, model.Name, _get_written_tags(model)
         )
         progress.status = OperationStatus.SUCCESS
         LOG.info(f"just finished a create variable call: {progress.resourceModel}")
@@ -74,7 +109,7 @@ def update_variable_and_return_progress(frauddetector_client, model, progress):
             variable_description=model.Description,
         )
         progress.resourceModel = model_helpers.get_variables_and_return_model_for_variable(
-            frauddetector_client, model.Name
+            frauddetector_client, model.Name, _get_written_tags(model)
         )
         progress.status = OperationStatus.SUCCESS
         LOG.info(f"just finished an update variable call: {progress.resourceModel}")
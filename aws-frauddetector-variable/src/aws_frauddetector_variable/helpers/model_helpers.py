@@ -37,10 +37,12 @@ def _get_tags_for_given_arn(frauddetector_client, arn):
 # Variables
 
 
-def get_model_for_variable(frauddetector_client, variable):
+def get_model_for_variable(frauddetector_client, variable, attached_tags=None):
     variable_arn = variable.get("arn", "")
-    list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=variable_arn)
-    attached_tags = list_tags_response.get("tags", [])
+    # tags we just wrote are what is attached, so only read them back when the caller does not know them
+    if attached_tags is None:
+        list_tags_response = api_helpers.call_list_tags_for_resource(frauddetector_client, resource_arn=variable_arn)
+        attached_tags = list_tags_response.get("tags", [])
     tag_models = get_tag_models_from_tags(attached_tags)
     return ResourceModel(
         Name=variable.get("name", ""),
@@ -56,12 +58,12 @@ def get_model_for_variable(frauddetector_client, variable):
     )
 
 
-def get_variables_and_return_model_for_variable(frauddetector_client, variable_name):
+def get_variables_and_return_model_for_variable(frauddetector_client, variable_name, attached_tags=None):
     try:
         get_variables_response = api_helpers.call_get_variables(frauddetector_client, variable_name=variable_name)
         variables = get_variables_response.get("variables", [])
         if variables:
-            return get_model_for_variable(frauddetector_client, variables[0])
+            return get_model_for_variable(frauddetector_client, variables[0], attached_tags)
         # if get variables worked but did not return any variables, we have major problems
         error_msg = f"get_variables for {variable_name} worked but did not return any variables!"
         LOG.error(error_msg)
@@ -1,3 +1,4 @@
+import functools
 import logging
 from cloudformation_cli_python_lib import (
     exceptions,
@@ -18,6 +19,21 @@ def remove_none_arguments(args):
     return args
 
 
+def _existence_check(func):
+    """
+    Runs the decorated check within `api_helpers.existence_check`, as a resource not found exception is one of its
+    expected results.
+    """
+
+    @functools.wraps(func)
+    def existence_check_wrapper(*args, **kwargs):
+        with api_helpers.existence_check():
+            return func(*args, **kwargs)
+
+    return existence_check_wrapper
+
+
+@_existence_check
 def check_if_get_outcomes_succeeds(frauddetector_client, outcome_name):
     """
     This calls get_outcomes and returns True if it worked, along with the API response (True, response)
@@ -34,6 +50,7 @@ def check_if_get_outcomes_succeeds(frauddetector_client, outcome_name):
         return False, None
 
 
+@_existence_check
 def check_if_get_variables_succeeds(frauddetector_client, variable_name):
     """
     This calls get_variables and returns True if it worked, along with the API response (True, response)
@@ -50,6 +67,7 @@ def check_if_get_variables_succeeds(frauddetector_client, variable_name):
         return False, None
 
 
+@_existence_check
 def check_if_get_entity_types_succeeds(frauddetector_client, entity_type_name):
     """
     This calls get_entity_types and returns True if it worked, along with the API response (True, response)
@@ -66,6 +84,7 @@ def check_if_get_entity_types_succeeds(frauddetector_client, entity_type_name):
         return False, None
 
 
+@_existence_check
 def check_if_get_labels_succeeds(frauddetector_client, label_name):
     """
     This calls get_labels and returns True if it worked, along with the API response (True, response)
@@ -1,20 +1,131 @@
 from ...helpers import client_helpers
 from .. import unit_test_utils
 
+import pytest
+from unittest.mock import MagicMock
+from cloudformation_cli_python_lib.exceptions import InternalFailure
 
-def test_get_singleton_afd_client_always_same_client():
+
+def test_get_afd_client_returns_unique_client():
+    # Arrange
+    mock_session_1 = unit_test_utils.create_mock_session(MagicMock(name="mock_afd_client_1"))
+    mock_session_2 = unit_test_utils.create_mock_session(MagicMock(name="mock_afd_client_2"))
+
+    # Act
+    afd_client_1 = client_helpers.get_afd_client(mock_session_1)
+    afd_client_2 = client_helpers.get_afd_client(mock_session_2)
+
+    # Assert
+    assert mock_session_1 is not mock_session_2
+    assert afd_client_1 is not afd_client_2
+
+
+def test_get_afd_client_throws_internal_failure_exception():
+    with pytest.raises(InternalFailure):
+        client_helpers.get_afd_client("")
+
+
+def test_get_afd_client_reuses_client_for_same_credentials():
+    # Arrange
+    mock_session = unit_test_utils.create_mock_session(MagicMock(name="mock_afd_client"))
+
+    # Act
+    afd_client_1 = client_helpers.get_afd_client(mock_session)
+    afd_client_2 = client_helpers.get_afd_client(mock_session)
+
+    # Assert
+    assert afd_client_1 is afd_client_2
+    mock_session.session.client.assert_called_once()
+
+
+def test_get_afd_client_gets_new_client_when_credentials_rotate():
+    # Arrange
+    mock_session = unit_test_utils.create_mock_session(MagicMock(name="mock_afd_client"))
+    mock_session.session.get_credentials().get_frozen_credentials().token = "first_token"
+    afd_client_1 = client_helpers.get_afd_client(mock_session)
+    mock_session.session.client.return_value = MagicMock(name="rotated_afd_client")
+
+    # Act
+    mock_session.session.get_credentials().get_frozen_credentials().token = "rotated_token"
+    afd_client_2 = client_helpers.get_afd_client(mock_session)
+
+    # Assert
+    assert afd_client_1 is not afd_client_2
+    assert mock_session.session.client.call_count == 2
+
+
+def test_get_client_key_does_not_hold_secrets():
+    # Arrange
+    mock_session = unit_test_utils.create_mock_session(MagicMock(name="mock_afd_client"))
+
+    # Act
+    client_key = client_helpers._get_client_key(mock_session)
+
+    # Assert
+    assert "access_key" in client_key
+    assert "secret_key" not in client_key
+    assert "token" not in client_key
+
+
+def test_get_afd_client_keeps_most_recent_clients():
+    # Arrange
+    mock_sessions = [
+        unit_test_utils.create_mock_session(MagicMock(name="mock_afd_client"))
+        for _ in range(client_helpers.MAX_CACHED_CLIENTS + 1)
+    ]
+
+    # Act
+    for mock_session in mock_sessions:
+        client_helpers.get_afd_client(mock_session)
+    client_helpers.get_afd_client(mock_sessions[0])
+    client_helpers.get_afd_client(mock_sessions[-1])
+
+    # Assert
+    assert mock_sessions[0].session.client.call_count == 2
+    assert mock_sessions[-1].session.client.call_count == 1
+
+
+def test_get_afd_client_registers_rate_limiter():
+    # Arrange
+    mock_session = unit_test_utils.create_mock_session(MagicMock(name="mock_afd_client"))
+
+    # Act
+    afd_client = client_helpers.get_afd_client(mock_session)
+
+    # Assert
+    registered_events = [call[0][0] for call in afd_client.meta.events.register.call_args_list]
+    assert "before-sign.frauddetector" in registered_events
+    assert "needs-retry.frauddetector" in registered_events
+
+
+def test_token_bucket_waits_once_burst_is_used_up():
+    # Arrange
+    token_bucket = client_helpers.TokenBucket(rate_limit=10)
+
+    # Act
+    burst_wait_times = [token_bucket.acquire() for _ in range(10)]
+    wait_time = token_bucket.acquire()
+
+    # Assert
+    assert sum(burst_wait_times) < 0.1
+    assert 0.05 < wait_time <= 0.1
+
+
+def test_api_rate_limiter_slows_down_after_throttling_and_recovers():
     # Arrange
-    mock_afd_client = unit_test_utils.create_mock_afd_client()
-    mock_session = unit_test_utils.create_mock_session(mock_afd_client)
-    mock_session_2 = unit_test_utils.create_mock_session(mock_afd_client)
+    api_rate_limiter = client_helpers.ApiRateLimiter(rate_limits={"GetRules": 10})
+    operation = MagicMock()
+    operation.name = "GetRules"
+    throttled_response = (MagicMock(), {"Error": {"Code": "ThrottlingException"}})
+    successful_response = (MagicMock(), {"ruleDetails": []})
 
     # Act
-    returned_afd_client = client_helpers.get_singleton_afd_client(mock_session)
-    returned_afd_client_2 = client_helpers.get_singleton_afd_client(mock_session_2)
-    returned_afd_client_3 = client_helpers.get_singleton_afd_client(mock_session)
+    api_rate_limiter._on_response(response=throttled_response, operation=operation)
+    throttled_rate = api_rate_limiter.get_bucket("GetRules").rate
+    api_rate_limiter._on_response(response=successful_response, operation=operation)
+    recovered_rate = api_rate_limiter.get_bucket("GetRules").rate
 
     # Assert
-    assert mock_session is not mock_session_2
-    assert mock_afd_client is returned_afd_client
-    assert returned_afd_client is returned_afd_client_2
-    assert returned_afd_client_2 is returned_afd_client_3
+    assert throttled_rate == 10 * client_helpers.THROTTLED_RATE_FACTOR
+    assert throttled_rate < recovered_rate <= 10
+    assert api_rate_limiter.get_bucket("GetOutcomes").rate_limit == client_helpers.DEFAULT_API_RATE_LIMIT
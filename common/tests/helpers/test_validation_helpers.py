@@ -9,11 +9,8 @@ def test_check_if_get_outcomes_succeeds_client_error_returns_false():
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.get_outcomes = MagicMock()
     mock_afd_client.exceptions.ResourceNotFoundException = ClientError
-    # We retry NotFound (for consistency), so return not found twice
-    mock_afd_client.get_outcomes.side_effect = [
-        ClientError({"Code": "", "Message": ""}, "get_outcomes"),
-        ClientError({"Code": "", "Message": ""}, "get_outcomes"),
-    ]
+    # We retry NotFound (for consistency), so return not found on every attempt
+    mock_afd_client.get_outcomes.side_effect = ClientError({"Code": "", "Message": ""}, "get_outcomes")
 
     # Act
     result = validation_helpers.check_if_get_outcomes_succeeds(mock_afd_client, unit_test_utils.FAKE_NAME)
@@ -45,11 +42,8 @@ def test_check_if_get_entity_types_succeeds_client_error_returns_false():
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.get_entity_types = MagicMock()
     mock_afd_client.exceptions.ResourceNotFoundException = ClientError
-    # We retry NotFound (for consistency), so return not found twice
-    mock_afd_client.get_entity_types.side_effect = [
-        ClientError({"Code": "", "Message": ""}, "get_entity_types"),
-        ClientError({"Code": "", "Message": ""}, "get_entity_types"),
-    ]
+    # We retry NotFound (for consistency), so return not found on every attempt
+    mock_afd_client.get_entity_types.side_effect = ClientError({"Code": "", "Message": ""}, "get_entity_types")
 
     # Act
     result = validation_helpers.check_if_get_entity_types_succeeds(mock_afd_client, unit_test_utils.FAKE_NAME)
@@ -81,11 +75,8 @@ def test_check_if_get_labels_succeeds_client_error_returns_false():
     mock_afd_client = unit_test_utils.create_mock_afd_client()
     mock_afd_client.get_labels = MagicMock()
     mock_afd_client.exceptions.ResourceNotFoundException = ClientError
-    # We retry NotFound (for consistency), so return not found twice
-    mock_afd_client.get_labels.side_effect = [
-        ClientError({"Code": "", "Message": ""}, "get_labels"),
-        ClientError({"Code": "", "Message": ""}, "get_labels"),
-    ]
+    # We retry NotFound (for consistency), so return not found on every attempt
+    mock_afd_client.get_labels.side_effect = ClientError({"Code": "", "Message": ""}, "get_labels")
 
     # Act
     result = validation_helpers.check_if_get_labels_succeeds(mock_afd_client, unit_test_utils.FAKE_NAME)